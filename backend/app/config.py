@@ -21,11 +21,64 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "nfra_compliance"
+    MONGODB_BULK_BATCH_SIZE: int = 1000  # documents per unordered insert_many
     CHROMA_PERSIST_DIR: str = "./chroma_db"
     CHROMA_COLLECTION_REGULATIONS: str = "regulatory_frameworks"
     CHROMA_COLLECTION_DOCUMENTS: str = "financial_documents"
+    VECTOR_STORE_BACKEND: str = "chroma"  # chroma | numpy
+    VECTOR_INDEX_DIR: str = "./vector_index"
+    VECTOR_IVF_THRESHOLD: int = 50_000
+    VECTOR_IVF_NPROBE: int = 16
+    VECTOR_QUANTIZATION: str = "none"  # none | int8 | pq (numpy backend)
+    VECTOR_RERANK_FACTOR: int = 16  # exact re-rank depth = factor * top_k
+    VECTOR_PQ_SUBVECTORS: int = 0  # bytes per PQ code; 0 = dim / 4
+    VECTOR_SEARCH_TIMEOUT: float = 10.0  # seconds per collection; 0 = no limit
+    VECTOR_SEARCH_CONCURRENCY: int = 4  # collections queried at once; 0 = all
+    VECTOR_DOCUMENT_PARTITIONS: bool = False  # per-document docpart_* collections
+    RETRIEVAL_CACHE_BACKEND: str = "memory"  # none | memory (own writes only) | sqlite (shared)
+    RETRIEVAL_CACHE_PATH: str = "./cache/retrieval.sqlite3"
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = 10_000
+    RETRIEVAL_CACHE_TTL: float = 600.0  # seconds; 0 = until invalidated
+    KEYWORD_INDEX_ENABLED: bool = True  # BM25 index for keyword / hybrid search
+    KEYWORD_INDEX_PATH: str = "./cache/bm25.sqlite3"
+    EMBEDDING_BACKEND: str = "openai"  # openai | local | hashing
     EMBEDDING_MODEL: str = "text-embedding-3-large"
+    EMBEDDING_DIMENSIONS: int = 0  # 0 = model's native size
+    EMBEDDING_DTYPE: str = "float32"  # float32 | float16
+    EMBEDDING_LOCAL_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_LOCAL_WORKERS: int = 2
+    EMBEDDING_LOCAL_DEVICE: str = "cpu"
+    EMBEDDING_LOCAL_THREADS: int = 0
+    EMBEDDING_HASHING_DIMENSIONS: int = 384
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 3_000
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1_000_000
+    EMBEDDING_MAX_BATCH_TOKENS: int = 100_000
+    PARTITION_WORKERS: int = 0  # local partitioning processes; 0 = CPU count
+    PARTITION_MAX_TASKS_PER_CHILD: int = 8  # recycle a worker after N files; 0 = never
+    PARTITION_MEMORY_LIMIT_MB: int = 0  # address-space cap per worker; 0 = none
+    PARTITION_PAGES_PER_TASK: int = 16  # max pages per worker when a PDF is split
+    PARTITION_SPLIT_MIN_PAGES: int = 32  # split local PDFs this long; 0 = never
+    PARTITION_STRATEGY: str = "tiered"  # tiered | hi_res
+    PARTITION_FAST_MIN_CHARS: int = 200  # fewer text-layer chars on a page → hi_res
+    PARTITION_FAST_MAX_NUMERIC_RATIO: float = 0.3  # more numeric tokens (a table) → hi_res
+    PARTITION_CACHE_ENABLED: bool = True
+    PARTITION_CACHE_PATH: str = "./cache/partitions.sqlite3"
+    PARTITION_CACHE_MAX_MB: int = 2048  # compressed size cap; LRU eviction; 0 = none
+    INGEST_CONCURRENCY: int = 0  # files ingested at once; 0 = PARTITION_WORKERS
+    INGEST_STREAMING: bool = False  # chunk/embed/store page ranges as they are partitioned
+    INGEST_STREAM_BATCH_SIZE: int = 256  # chunks per embed/store batch when streaming
+    INGEST_STREAM_QUEUE_DEPTH: int = 2  # batches buffered between streaming stages
     LLM_MODEL: str = "gpt-4.1"
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_PER_HOST_CONCURRENCY: int = 32
+    HTTP_TIMEOUT: float = 120.0
     BACKEND_HOST: str = "0.0.0.0"
     BACKEND_PORT: int = 8888
     AUTO_INDEX_ON_STARTUP: bool = True
@@ -27,10 +27,11 @@ from app.services.compliance_engine import ComplianceEngine
 from app.services.document_processor import DocumentProcessor
 from app.services.embedding_service import EmbeddingService
 from app.services.examination_tool import ExaminationTool
+from app.services.http_client import build_async_http_client
 from app.services.llm_service import LLMService
 from app.services.mongo_service import MongoService
 from app.services.report_generator import ReportGenerator
-from app.services.vector_store import VectorStoreService
+from app.services.vector_store import VectorStoreService, create_vector_store
 from app.pipelines.compliance_pipeline import CompliancePipeline
 from app.pipelines.ingest_pipeline import IngestPipeline
 from app.utils.chunking import ComplianceChunker
@@ -113,7 +114,7 @@ async def _auto_index_compliance_rules(
 
     try:
         from scripts.index_compliance_rules import index_all
-        await index_all()
+        await index_all(vector_store=vector_store, embedder=embedding_service)
         new_stats = vector_store.get_all_stats()
         new_count = sum(s["count"] for s in new_stats)
         logger.info(
@@ -157,33 +158,32 @@ async def lifespan(app: FastAPI):
         pass
 
     # ── MongoService ────────────────────────────────────────────────────
-    mongo_service = MongoService(db)
+    mongo_service = MongoService(db, bulk_batch_size=settings.MONGODB_BULK_BATCH_SIZE)
     app.state.mongo_service = mongo_service
     await mongo_service.ensure_indexes()
 
-    # ── VectorStoreService (ChromaDB) ───────────────────────────────────
-    vector_store = VectorStoreService(persist_dir=settings.CHROMA_PERSIST_DIR)
+    # ── Shared async HTTP pool (all OpenAI traffic) ─────────────────────
+    http_client = build_async_http_client(settings)
+    app.state.http_client = http_client
+
+    # ── Vector store (ChromaDB or in-process NumPy index) ───────────────
+    vector_store = create_vector_store(settings)
     app.state.vector_store = vector_store
 
-    # ── EmbeddingService (OpenAI) ───────────────────────────────────────
-    embedding_service = EmbeddingService(
-        model=settings.EMBEDDING_MODEL,
-        api_key=settings.OPENAI_API_KEY,
-    )
+    # ── EmbeddingService (OpenAI + cache + rate-limited dispatch) ───────
+    embedding_service = EmbeddingService.from_settings(settings, http_client=http_client)
     app.state.embedding_service = embedding_service
 
     # ── LLMService (LangChain ChatOpenAI) ───────────────────────────────
     llm_service = LLMService(
         model=settings.LLM_MODEL,
         api_key=settings.OPENAI_API_KEY,
+        http_client=http_client,
     )
     app.state.llm_service = llm_service
 
     # ── DocumentProcessor (Unstructured) ────────────────────────────────
-    document_processor = DocumentProcessor(
-        api_key=settings.UNSTRUCTURED_API_KEY,
-        api_url=settings.UNSTRUCTURED_API_URL,
-    )
+    document_processor = DocumentProcessor.from_settings(settings)
     app.state.document_processor = document_processor
 
     # ── IngestPipeline (processor → chunker → embeddings → store) ───────
@@ -193,6 +193,10 @@ async def lifespan(app: FastAPI):
         vector_store=vector_store,
         mongo_service=mongo_service,
         chunker=ComplianceChunker(),
+        max_concurrency=settings.INGEST_CONCURRENCY or None,
+        streaming=settings.INGEST_STREAMING,
+        stream_batch_size=settings.INGEST_STREAM_BATCH_SIZE,
+        stream_queue_depth=settings.INGEST_STREAM_QUEUE_DEPTH,
     )
 
     # ── ComplianceEngine (vector_store + embeddings + llm + mongo) ──────
@@ -220,6 +224,7 @@ async def lifespan(app: FastAPI):
         mongo_service=mongo_service,
         api_key=settings.OPENAI_API_KEY,
         model=settings.LLM_MODEL,
+        http_client=http_client,
     )
 
     # ── ExaminationTool (preliminary examination) ────────────────────
@@ -229,11 +234,20 @@ async def lifespan(app: FastAPI):
         embedding_service=embedding_service,
         api_key=settings.OPENAI_API_KEY,
         model=settings.LLM_MODEL,
+        http_client=http_client,
     )
 
     # ── Auto-index compliance rules if collections are empty ────────
     await _auto_index_compliance_rules(settings, vector_store, embedding_service, document_processor)
 
+    # ── BM25 keyword index: pick up chunks stored before it existed ──
+    try:
+        backfilled = await vector_store.backfill_keyword_index()
+        if backfilled:
+            logger.info("Keyword index backfilled with %d chunks", backfilled)
+    except Exception:
+        logger.exception("Keyword index backfill failed; keyword search may be incomplete")
+
     # Start background keep-alive ping to prevent Atlas connection going cold
     async def _keepalive():
         while True:
@@ -249,6 +263,9 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     keepalive_task.cancel()
+    embedding_service.close()
+    document_processor.close()
+    await http_client.aclose()
     mongo_client.close()
 
 
@@ -343,6 +360,9 @@ async def dashboard_stats() -> dict:
         "compliance_checks": reports_count,
         "average_score": avg_score,
         "active_frameworks": fw_count,
+        "embeddings": app.state.embedding_service.stats(),
+        "retrieval_cache": vs.retrieval_cache_stats(),
+        "partition_cache": app.state.document_processor.partition_cache_stats(),
     }
 
     _dashboard_cache = result_data
@@ -103,6 +103,9 @@ class ExtractedTable(BaseModel):
     plain_text: str = ""
     column_headers: list[str] = Field(default_factory=list)
     row_labels: list[str] = Field(default_factory=list)
+    # Span-expanded cell grid (numbers typed) and its leading header-row count
+    cells: list[list[str | int | float | None]] = Field(default_factory=list)
+    header_rows: int = 0
     financial_statement_type: str | None = None
     element_id: str = ""
 
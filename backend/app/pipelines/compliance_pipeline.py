@@ -52,7 +52,7 @@ class CompliancePipeline:
             Optional async callable(step: str, pct: int) for progress updates.
         """
         # Check document exists
-        doc = await self.mongo.find_by_id("documents", document_id)
+        doc = await self.mongo.find_by_id("documents", document_id, {"status": 1})
         if not doc:
             raise ValueError(f"Document not found: {document_id}")
 
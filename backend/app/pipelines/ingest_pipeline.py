@@ -9,18 +9,32 @@ Orchestrates:
 3. Chunk elements with ``ComplianceChunker``.
 4. Generate embeddings with ``EmbeddingService``.
 5. Store embedded chunks in the appropriate ChromaDB collection.
-6. Persist per-chunk records and update the document record in MongoDB.
+6. Persist per-chunk, per-element and per-table records (replacing any
+   from a previous run, in bulk) and update the document record in MongoDB.
 7. Return a summary dict.
+
+At most ``max_concurrency`` files are ingested at once across every
+caller (uploads, ``/batch``, ``run_batch``); further files wait for a slot.
+
+With ``streaming`` on, steps 2–6 run as concurrent stages connected by
+bounded queues: elements arrive page range by page range
+(``DocumentProcessor.iter_elements``), are chunked, embedded and stored
+in batches of ``stream_batch_size`` chunks, so the first pages of a long
+document are searchable while later ones are still being partitioned.
+A full queue blocks the stage feeding it, which bounds memory.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+import uuid
+from pathlib import Path
 from typing import Any
 
-from app.models.document import ProcessedDocument
-from app.services.document_processor import DocumentProcessor
+from app.models.document import ExtractedTable, ProcessedDocument, ProcessedElement
+from app.services.document_processor import DocumentProcessor, SectionTreeBuilder
 from app.services.embedding_service import EmbeddingService
 from app.services.mongo_service import MongoService
 from app.services.vector_store import VectorStoreService
@@ -64,6 +78,17 @@ class IngestPipeline:
     chunker:
         Optional ``ComplianceChunker`` instance.  A default one is created
         if not provided.
+    max_concurrency:
+        Files ingested at once, globally (default: one per partition
+        worker of *document_processor*).
+    streaming:
+        Run extraction, chunking, embedding and storage as a streaming
+        pipeline instead of one step after the other.
+    stream_batch_size:
+        Chunks embedded and stored per batch in streaming mode.
+    stream_queue_depth:
+        Batches buffered between two streaming stages before the upstream
+        stage waits.
     """
 
     def __init__(
@@ -73,12 +98,21 @@ class IngestPipeline:
         vector_store: VectorStoreService,
         mongo_service: MongoService,
         chunker: ComplianceChunker | None = None,
+        max_concurrency: int | None = None,
+        streaming: bool = False,
+        stream_batch_size: int = 256,
+        stream_queue_depth: int = 2,
     ) -> None:
         self.processor = document_processor
         self.embeddings = embedding_service
         self.vector_store = vector_store
         self.mongo = mongo_service
         self.chunker = chunker or ComplianceChunker()
+        self.max_concurrency = max_concurrency or document_processor.partition_workers
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.streaming = streaming
+        self.stream_batch_size = max(1, stream_batch_size)
+        self.stream_queue_depth = max(1, stream_queue_depth)
 
     # ------------------------------------------------------------------
     # Public API
@@ -115,6 +149,25 @@ class IngestPipeline:
             Summary with ``document_id``, ``chunks_created``,
             ``collection``, ``processing_time``, ``status``.
         """
+        run = self._run_streaming if self.streaming else self._run
+        async with self._slots:
+            return await run(
+                file_path,
+                document_id,
+                doc_type=doc_type,
+                framework_tags=framework_tags,
+                extra_metadata=extra_metadata,
+            )
+
+    async def _run(
+        self,
+        file_path: str,
+        document_id: str,
+        *,
+        doc_type: str,
+        framework_tags: list[str] | None,
+        extra_metadata: dict[str, Any] | None,
+    ) -> dict[str, Any]:
         t0 = time.perf_counter()
         collection_name = _resolve_collection(doc_type)
         tags = framework_tags or []
@@ -138,6 +191,9 @@ class IngestPipeline:
             chunk_meta = {"framework_tags": ",".join(tags)} if tags else {}
             if extra_metadata:
                 chunk_meta.update(extra_metadata)
+            # Key chunks by the Mongo document ID (not the processor's run ID)
+            # so per-document filters, partitions and deletes can find them
+            chunk_meta["document_id"] = document_id
 
             chunks = self.chunker.chunk_processed_document(
                 processed,
@@ -161,11 +217,7 @@ class IngestPipeline:
             # 4 ── Embed ───────────────────────────────────────────────
             texts = [c["text"] for c in chunks]
             logger.info("Pipeline: generating embeddings for %d chunks", len(texts))
-            embeddings = await self.embeddings.embed_batch(texts)
-
-            # Attach embeddings to chunk dicts
-            for chunk, emb in zip(chunks, embeddings):
-                chunk["embedding"] = emb
+            embeddings = await self.embeddings.embed_matrix(texts)
 
             # 5 ── Store in ChromaDB ───────────────────────────────────
             logger.info(
@@ -173,21 +225,22 @@ class IngestPipeline:
                 len(chunks),
                 collection_name,
             )
-            await self.vector_store.add_documents(collection_name, chunks)
+            # Re-ingest replaces the document's previous chunks and partition
+            await self.vector_store.drop_document(document_id, collection_name)
+            await self.vector_store.add_documents(
+                collection_name, chunks, embeddings=embeddings
+            )
+            if collection_name == "financial_documents":
+                await self.vector_store.write_document_partition(
+                    document_id, chunks, embeddings=embeddings
+                )
 
             # 6 ── Persist chunks + update doc record in Mongo ─────────
-            for idx, chunk in enumerate(chunks):
-                chunk_doc = {
-                    "chunk_id": chunk["id"],
-                    "document_id": document_id,
-                    "text": chunk["text"],
-                    "chunk_index": idx,
-                    "element_type": chunk["metadata"].get("element_type", ""),
-                    "page_number": chunk["metadata"].get("page_number", 0),
-                    "metadata": chunk["metadata"],
-                    "collection_name": collection_name,
-                }
-                await self.mongo.insert_document(_CHUNKS_COL, chunk_doc)
+            await self.mongo.delete_many(_CHUNKS_COL, {"document_id": document_id})
+            await self.mongo.insert_many(_CHUNKS_COL, [
+                self._chunk_record(chunk, idx, document_id, collection_name)
+                for idx, chunk in enumerate(chunks)
+            ])
 
             # Build section summary for the doc record
             def _sec(node: Any) -> dict[str, Any]:
@@ -200,46 +253,29 @@ class IngestPipeline:
 
             sections = [_sec(s) for s in processed.sections]
 
-            # Serialise tables for analytics module
-            tables_data = [
-                {
-                    "table_id": t.table_id,
-                    "page_number": t.page_number,
-                    "html": t.html,
-                    "plain_text": t.plain_text,
-                    "column_headers": t.column_headers,
-                    "row_labels": t.row_labels,
-                    "financial_statement_type": t.financial_statement_type,
-                    "element_id": getattr(t, "element_id", ""),
-                }
-                for t in processed.tables
-            ]
-
-            # Serialise elements for compliance engine + analytics
-            elements_data = [
-                {
-                    "element_id": e.element_id,
-                    "element_type": e.element_type,
-                    "text": e.text[:3000],
-                    "html": e.html,
-                    "page_number": e.page_number,
-                    "metadata": e.metadata,
-                }
-                for e in processed.elements
-            ]
+            # Elements (compliance engine + analytics) and tables (analytics)
+            # go to their own collections, keeping the doc record small
+            await self.mongo.delete_document_content(document_id)
+            await self.mongo.insert_document_content(
+                document_id,
+                [self._element_record(e) for e in processed.elements],
+                [self._table_record(t) for t in processed.tables],
+            )
 
             await self.mongo.update_by_id(_DOCS_COL, document_id, {
-                "status": "processed",
-                "chunks_count": len(chunks),
-                "elements_count": len(processed.elements),
-                "tables_count": len(processed.tables),
-                "total_pages": processed.total_pages,
-                "processing_time": processed.processing_time,
-                "sections": sections,
-                "tables": tables_data,
-                "elements": elements_data,
-                "metadata.page_count": processed.total_pages,
-                "metadata.framework_tags": tags,
+                "$set": {
+                    "status": "processed",
+                    "chunks_count": len(chunks),
+                    "elements_count": len(processed.elements),
+                    "tables_count": len(processed.tables),
+                    "total_pages": processed.total_pages,
+                    "processing_time": processed.processing_time,
+                    "sections": sections,
+                    "metadata.page_count": processed.total_pages,
+                    "metadata.framework_tags": tags,
+                },
+                # Inline copies written before content had its own collections
+                "$unset": {"elements": "", "tables": ""},
             })
 
             elapsed = time.perf_counter() - t0
@@ -260,6 +296,156 @@ class IngestPipeline:
                 document_id, 0, collection_name, time.perf_counter() - t0, "failed"
             )
 
+    async def _run_streaming(
+        self,
+        file_path: str,
+        document_id: str,
+        *,
+        doc_type: str,
+        framework_tags: list[str] | None,
+        extra_metadata: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        """``_run`` as three concurrent stages joined by bounded queues.
+
+        *produce* partitions, stores element / table records and chunks;
+        *embed* embeds each chunk batch; *store* writes it to ChromaDB and
+        Mongo.  The document's previous chunks are dropped up front, since
+        its new chunks become visible batch by batch.
+        """
+        t0 = time.perf_counter()
+        collection_name = _resolve_collection(doc_type)
+        tags = framework_tags or []
+
+        chunk_meta = {"framework_tags": ",".join(tags)} if tags else {}
+        if extra_metadata:
+            chunk_meta.update(extra_metadata)
+        chunk_meta["document_id"] = document_id
+        chunk_stream = self.chunker.stream(
+            filename=Path(file_path).name,
+            document_id=str(uuid.uuid4()),
+            collection_type=collection_name,
+            extra_metadata=chunk_meta,
+        )
+        sections = SectionTreeBuilder(keep_elements=False)
+
+        chunk_batches: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(
+            self.stream_queue_depth
+        )
+        embedded_batches: asyncio.Queue[
+            tuple[list[dict[str, Any]], Any] | None
+        ] = asyncio.Queue(self.stream_queue_depth)
+
+        n_elements = n_tables = n_chunks = total_pages = 0
+
+        async def produce() -> None:
+            nonlocal n_elements, n_tables, total_pages
+            pending: list[dict[str, Any]] = []
+            async for elements in self.processor.iter_elements(file_path):
+                tables = self.processor.tables_from_elements(elements)
+                sections.add(elements)
+                n_elements += len(elements)
+                n_tables += len(tables)
+                total_pages = max(
+                    total_pages, max((e.page_number for e in elements), default=0)
+                )
+                await self.mongo.insert_document_content(
+                    document_id,
+                    [self._element_record(e) for e in elements],
+                    [self._table_record(t) for t in tables],
+                    element_start=n_elements - len(elements),
+                    table_start=n_tables - len(tables),
+                )
+                await self.mongo.update_by_id(_DOCS_COL, document_id, {
+                    "elements_count": n_elements,
+                    "tables_count": n_tables,
+                })
+                pending.extend(chunk_stream.feed(elements))
+                while len(pending) >= self.stream_batch_size:
+                    await chunk_batches.put(pending[: self.stream_batch_size])
+                    pending = pending[self.stream_batch_size :]
+            if pending:
+                await chunk_batches.put(pending)
+            await chunk_batches.put(None)
+
+        async def embed() -> None:
+            while (chunks := await chunk_batches.get()) is not None:
+                embeddings = await self.embeddings.embed_matrix([c["text"] for c in chunks])
+                await embedded_batches.put((chunks, embeddings))
+            await embedded_batches.put(None)
+
+        async def store() -> None:
+            nonlocal n_chunks
+            while (item := await embedded_batches.get()) is not None:
+                chunks, embeddings = item
+                await self.vector_store.add_documents(
+                    collection_name, chunks, embeddings=embeddings
+                )
+                if collection_name == "financial_documents":
+                    await self.vector_store.append_document_partition(
+                        document_id, chunks, embeddings=embeddings
+                    )
+                await self.mongo.insert_many(_CHUNKS_COL, [
+                    self._chunk_record(chunk, n_chunks + i, document_id, collection_name)
+                    for i, chunk in enumerate(chunks)
+                ])
+                n_chunks += len(chunks)
+                await self.mongo.update_by_id(
+                    _DOCS_COL, document_id, {"chunks_count": n_chunks}
+                )
+                logger.info(
+                    "Pipeline: stored %d chunks of %s so far", n_chunks, file_path
+                )
+
+        try:
+            await self.mongo.update_by_id(_DOCS_COL, document_id, {
+                "$set": {
+                    "status": "processing",
+                    "sections": [],
+                    "elements_count": 0,
+                    "tables_count": 0,
+                    "chunks_count": 0,
+                },
+                "$unset": {"elements": "", "tables": ""},
+            })
+            # Re-ingest replaces the document's previous chunks, partition and content
+            await self.vector_store.drop_document(document_id, collection_name)
+            await self.mongo.delete_many(_CHUNKS_COL, {"document_id": document_id})
+            await self.mongo.delete_document_content(document_id)
+
+            logger.info("Pipeline: streaming %s", file_path)
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(produce())
+                tg.create_task(embed())
+                tg.create_task(store())
+
+            elapsed = time.perf_counter() - t0
+            status = "processed" if n_elements else "failed"
+            await self.mongo.update_by_id(_DOCS_COL, document_id, {
+                "status": status,
+                "chunks_count": n_chunks,
+                "elements_count": n_elements,
+                "tables_count": n_tables,
+                "total_pages": total_pages,
+                "processing_time": elapsed,
+                "sections": sections.summary(),
+                "metadata.page_count": total_pages,
+                "metadata.framework_tags": tags,
+            })
+            logger.info(
+                "Pipeline complete for %s — %d chunks in %.2fs (streaming)",
+                file_path,
+                n_chunks,
+                elapsed,
+            )
+            return self._summary(document_id, n_chunks, collection_name, elapsed, status)
+
+        except Exception:
+            logger.exception("Ingest pipeline failed for document %s", document_id)
+            await self.mongo.update_by_id(_DOCS_COL, document_id, {"status": "failed"})
+            return self._summary(
+                document_id, 0, collection_name, time.perf_counter() - t0, "failed"
+            )
+
     # ------------------------------------------------------------------
     # Batch
     # ------------------------------------------------------------------
@@ -270,18 +456,21 @@ class IngestPipeline:
         *,
         on_progress: Any | None = None,
     ) -> list[dict[str, Any]]:
-        """Process multiple files through the pipeline.
+        """Process multiple files through the pipeline concurrently.
 
         *items* is a list of dicts, each containing at least ``file_path``
         and ``document_id``.  Optional keys: ``doc_type``,
-        ``framework_tags``, ``extra_metadata``.
+        ``framework_tags``, ``extra_metadata``.  Files share the pipeline's
+        global concurrency limit; *on_progress* receives the number of
+        completed files as its index.
 
-        Returns a list of per-file summary dicts.
+        Returns a list of per-file summary dicts, in input order.
         """
-        results: list[dict[str, Any]] = []
         total = len(items)
+        done = 0
 
-        for idx, item in enumerate(items, 1):
+        async def _one(item: dict[str, Any]) -> dict[str, Any]:
+            nonlocal done
             summary = await self.run(
                 file_path=item["file_path"],
                 document_id=item["document_id"],
@@ -289,17 +478,59 @@ class IngestPipeline:
                 framework_tags=item.get("framework_tags"),
                 extra_metadata=item.get("extra_metadata"),
             )
-            results.append(summary)
-
+            done += 1
             if on_progress is not None:
-                await on_progress(idx, total, item["file_path"], summary["status"])
+                await on_progress(done, total, item["file_path"], summary["status"])
+            return summary
 
-        return results
+        return list(await asyncio.gather(*(_one(item) for item in items)))
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _chunk_record(
+        chunk: dict[str, Any], index: int, document_id: str, collection_name: str
+    ) -> dict[str, Any]:
+        """Mongo ``document_chunks`` record for *chunk*."""
+        return {
+            "chunk_id": chunk["id"],
+            "document_id": document_id,
+            "text": chunk["text"],
+            "chunk_index": index,
+            "element_type": chunk["metadata"].get("element_type", ""),
+            "page_number": chunk["metadata"].get("page_number", 0),
+            "metadata": chunk["metadata"],
+            "collection_name": collection_name,
+        }
+
+    @staticmethod
+    def _table_record(t: ExtractedTable) -> dict[str, Any]:
+        return {
+            "table_id": t.table_id,
+            "page_number": t.page_number,
+            "html": t.html,
+            "plain_text": t.plain_text,
+            "column_headers": t.column_headers,
+            "row_labels": t.row_labels,
+            "cells": t.cells,
+            "header_rows": t.header_rows,
+            "financial_statement_type": t.financial_statement_type,
+            "element_id": getattr(t, "element_id", ""),
+        }
+
+    @staticmethod
+    def _element_record(e: ProcessedElement) -> dict[str, Any]:
+        return {
+            "element_id": e.element_id,
+            "element_type": e.element_type,
+            "text": e.text[:3000],
+            "html": e.html,
+            "page_number": e.page_number,
+            "metadata": e.metadata,
+        }
+
     @staticmethod
     def _summary(
         document_id: str,
@@ -11,11 +11,13 @@ DELETE /sessions/{session_id}  Delete a chat session.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
 from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, File, Form
 from pydantic import BaseModel, Field
 
@@ -26,6 +28,7 @@ from app.models.chat import (
     ChatSession,
     ChatSource,
 )
+from app.services.vector_store import merge_hits, mmr_rerank, reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +36,8 @@ router = APIRouter(tags=["Chat"])
 
 _RELEVANCE_THRESHOLD = 0.15
 _TOP_K_PER_COLLECTION = 10
+_MMR_LAMBDA = 0.7  # relevance vs. diversity when assembling chat context
+_MMR_REDUNDANCY_CUTOFF = 0.95  # cosine above which a chunk is a near-duplicate
 
 
 # ---------------------------------------------------------------------------
@@ -118,7 +123,7 @@ async def _resolve_doc_filenames(
     """
     filenames: list[str] = []
     for doc_id in document_ids:
-        doc = await mongo.find_by_id("documents", doc_id)
+        doc = await mongo.find_by_id("documents", doc_id, {"filename": 1})
         if doc:
             filenames.append(doc.get("filename", ""))
     return [f for f in filenames if f]
@@ -153,47 +158,72 @@ async def _retrieve_with_expansion(
     where_filter: dict[str, Any] | None = None,
     top_k: int = _TOP_K_PER_COLLECTION,
 ) -> list[dict[str, Any]]:
-    """Run vector search for each query across collections and deduplicate results."""
-    seen_texts: set[str] = set()
-    all_chunks: list[dict[str, Any]] = []
-
-    for query_text in queries:
-        query_emb = await emb.embed_single(query_text)
-        if not query_emb:
-            continue
-
-        for col_name in collections:
-            try:
-                raw = await vs.query(
-                    collection_name=col_name,
-                    query_embedding=query_emb,
-                    n_results=top_k,
-                    where=where_filter if col_name == "financial_documents" else None,
-                )
-                docs = raw.get("documents", [[]])[0]
-                metas = raw.get("metadatas", [[]])[0]
-                dists = raw.get("distances", [[]])[0]
-
-                for text, meta, dist in zip(docs, metas, dists):
-                    relevance = max(0.0, 1.0 - dist)
-                    if relevance < _RELEVANCE_THRESHOLD:
-                        continue
-                    text_key = (text or "")[:100]
-                    if text_key in seen_texts:
-                        continue
-                    seen_texts.add(text_key)
-                    all_chunks.append({
-                        "text": text,
-                        "metadata": meta,
-                        "distance": dist,
-                        "collection": col_name,
-                        "relevance": relevance,
-                    })
-            except Exception:
-                logger.warning("Chat retrieval failed on '%s'", col_name, exc_info=True)
-
-    all_chunks.sort(key=lambda x: x["relevance"], reverse=True)
-    return all_chunks
+    """Hybrid retrieval: vector search for all queries + BM25 for the original.
+
+    Vector hits from every query are deduplicated and relevance-filtered;
+    BM25 hits for the user's own wording (exact standard / paragraph
+    references such as "Ind AS 116 para 22") bypass the relevance floor.
+    The two rankings are fused with reciprocal rank fusion, then ordered
+    by maximal marginal relevance (fused score vs. similarity to chunks
+    already chosen) so the context window covers distinct passages.
+    """
+    queries = [q for q in queries if q and q.strip()]
+    if not queries:
+        return []
+
+    # One embeddings request; one vector query per collection for all queries
+    query_matrix = await emb.embed_matrix(queries)
+    where_by_collection = {
+        name: (where_filter if name == "financial_documents" else None)
+        for name in collections
+    }
+    per_query, keyword_hits = await asyncio.gather(
+        vs.query_many(
+            collections,
+            query_matrix,
+            n_results=top_k,
+            where_by_collection=where_by_collection,
+        ),
+        vs.keyword_hits(
+            collections,
+            queries[0],
+            n_results=top_k,
+            where_by_collection=where_by_collection,
+            query_embedding=query_matrix[0],
+        ),
+    )
+
+    dedup_key = lambda h: (h["text"] or "")[:100]  # noqa: E731
+    vector_hits = [
+        hit for hit in merge_hits(per_query, key=dedup_key)
+        if 1.0 - hit["distance"] >= _RELEVANCE_THRESHOLD
+    ]
+
+    fused = reciprocal_rank_fusion([vector_hits, keyword_hits], key=dedup_key)
+    if fused:
+        try:
+            embeddings = await vs.fetch_embeddings(fused)
+            scores = np.asarray([h["rrf_score"] for h in fused], dtype=np.float32)
+            fused = mmr_rerank(
+                fused,
+                embeddings,
+                lambda_=_MMR_LAMBDA,
+                relevance=scores / scores.max(),
+                redundancy_cutoff=_MMR_REDUNDANCY_CUTOFF,
+            )
+        except Exception:
+            logger.warning("MMR re-ranking failed — keeping fused order", exc_info=True)
+
+    return [
+        {
+            "text": hit["text"],
+            "metadata": hit["metadata"],
+            "distance": hit["distance"],
+            "collection": hit["collection"],
+            "relevance": max(0.0, 1.0 - hit["distance"]),
+        }
+        for hit in fused
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -212,7 +242,7 @@ async def send_message(body: ChatRequest, request: Request) -> ChatResponse:
         1. Load or create a chat session.
         2. Resolve document context (filenames for ChromaDB filter).
         3. Expand the user query into multiple search queries.
-        4. Retrieve relevant chunks from ChromaDB with dedup + relevance filter.
+        4. Retrieve relevant chunks (vector + BM25, fused) with dedup + relevance filter.
         5. Pass context + history to the LLM for answer generation.
         6. Store both user and assistant messages in MongoDB.
         7. Return the assistant response with source citations.
@@ -251,7 +281,7 @@ async def send_message(body: ChatRequest, request: Request) -> ChatResponse:
     expanded = await _expand_query(llm, body.message)
     search_queries.extend(expanded)
 
-    # 4. Retrieve with expansion + dedup + relevance filtering
+    # 4. Hybrid retrieval with expansion + dedup + relevance filtering
     collections = vs.list_collections()
     all_chunks = await _retrieve_with_expansion(
         vs, emb, search_queries, collections, where_filter
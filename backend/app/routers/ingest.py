@@ -82,6 +82,21 @@ async def _process_document_task(
             pass
 
 
+async def _process_batch_task(items: list[dict[str, Any]], pipeline: Any) -> None:
+    """Background task that ingests a whole batch concurrently.
+
+    Starlette runs background tasks one after another, so a batch is queued
+    as a single task; ``IngestPipeline.run_batch`` then processes its files
+    in parallel under the pipeline's global concurrency limit.
+    """
+    try:
+        summaries = await pipeline.run_batch(items)
+        processed = sum(1 for s in summaries if s["status"] == "processed")
+        logger.info("Batch of %d documents finished — %d processed", len(items), processed)
+    except Exception:
+        logger.exception("Background batch processing failed")
+
+
 # ---------------------------------------------------------------------------
 # POST /upload — single or multiple file upload
 # ---------------------------------------------------------------------------
@@ -172,7 +187,7 @@ async def batch_upload(
     body: BatchUploadRequest,
     background_tasks: BackgroundTasks,
 ) -> BatchUploadResponse:
-    """Scan *directory_path* for PDFs and queue them all for processing."""
+    """Scan *directory_path* for PDFs and queue them for concurrent processing."""
     dir_path = Path(body.directory_path)
     if not dir_path.is_dir():
         raise HTTPException(status_code=400, detail=f"Directory not found: {body.directory_path}")
@@ -186,6 +201,7 @@ async def batch_upload(
 
     accepted_ids: list[str] = []
     rejected: list[str] = []
+    items: list[dict[str, Any]] = []
 
     for pdf_path in pdf_files:
         filename = pdf_path.name
@@ -210,18 +226,18 @@ async def batch_upload(
 
             doc_id = await mongo.insert_document(DOCUMENTS_COLLECTION, doc_data)
             accepted_ids.append(doc_id)
-
-            background_tasks.add_task(
-                _process_document_task,
-                doc_id,
-                str(pdf_path),
-                body.framework_tags,
-                pipeline,
-            )
+            items.append({
+                "file_path": str(pdf_path),
+                "document_id": doc_id,
+                "framework_tags": body.framework_tags,
+            })
         except Exception as exc:
             logger.exception("Failed to queue %s", filename)
             rejected.append(f"{filename} ({exc})")
 
+    if items:
+        background_tasks.add_task(_process_batch_task, items, pipeline)
+
     return BatchUploadResponse(
         total_files=len(pdf_files),
         accepted=len(accepted_ids),
@@ -235,6 +251,16 @@ async def batch_upload(
 # GET /status/{document_id}
 # ---------------------------------------------------------------------------
 
+_STATUS_PROJECTION = {
+    "filename": 1,
+    "status": 1,
+    "elements_count": 1,
+    "tables_count": 1,
+    "total_pages": 1,
+    "processing_time": 1,
+}
+
+
 @router.get(
     "/status/{document_id}",
     response_model=ProcessingStatusResponse,
@@ -246,7 +272,7 @@ async def get_processing_status(
 ) -> ProcessingStatusResponse:
     """Return the current processing status of a document."""
     mongo = _mongo(request)
-    doc = await mongo.find_by_id(DOCUMENTS_COLLECTION, document_id)
+    doc = await mongo.find_by_id(DOCUMENTS_COLLECTION, document_id, _STATUS_PROJECTION)
 
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -323,7 +349,11 @@ async def get_document(
 ) -> dict[str, Any]:
     """Retrieve a single document record by its ``_id``."""
     mongo = _mongo(request)
-    doc = await mongo.find_by_id(DOCUMENTS_COLLECTION, document_id)
+    # Inline elements / tables only exist on records ingested before they
+    # moved to their own collections
+    doc = await mongo.find_by_id(
+        DOCUMENTS_COLLECTION, document_id, {"elements": 0, "tables": 0}
+    )
 
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -349,7 +379,10 @@ async def reindex_document(
     in both MongoDB and ChromaDB for compliance checking.
     """
     mongo = _mongo(request)
-    doc = await mongo.find_by_id(DOCUMENTS_COLLECTION, document_id)
+    doc = await mongo.find_by_id(
+        DOCUMENTS_COLLECTION, document_id,
+        {"filename": 1, "file_path": 1, "metadata.framework_tags": 1},
+    )
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -397,15 +430,22 @@ async def delete_document(
     request: Request,
     document_id: str,
 ) -> None:
-    """Remove a document record, its stored chunks, and the uploaded file."""
+    """Remove a document record, its stored chunks and vectors, and the uploaded file."""
     mongo = _mongo(request)
-    doc = await mongo.find_by_id(DOCUMENTS_COLLECTION, document_id)
+    doc = await mongo.find_by_id(DOCUMENTS_COLLECTION, document_id, {"file_path": 1})
 
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Delete chunks
+    # Delete chunks, elements and tables
     await mongo.delete_many(CHUNKS_COLLECTION, {"document_id": document_id})
+    await mongo.delete_document_content(document_id)
+
+    # Delete vectors (and the document's partition, if any)
+    try:
+        await request.app.state.vector_store.drop_document(document_id)
+    except Exception:
+        logger.warning("Failed to delete vectors of document %s", document_id, exc_info=True)
 
     # Delete the physical file
     file_path = doc.get("file_path")
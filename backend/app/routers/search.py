@@ -10,6 +10,7 @@ GET  /collections List available ChromaDB collections with stats.
 from __future__ import annotations
 
 import logging
+from itertools import islice
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request
@@ -87,6 +88,15 @@ def _embedding_service(request: Request) -> Any:
     return request.app.state.embedding_service
 
 
+def _to_result(hit: dict[str, Any]) -> SearchResult:
+    return SearchResult(
+        text=hit["text"] or "",
+        score=round(max(0.0, 1.0 - hit["distance"]), 4),
+        metadata=hit["metadata"],
+        collection=hit["collection"],
+    )
+
+
 # ---------------------------------------------------------------------------
 # POST /query
 # ---------------------------------------------------------------------------
@@ -102,8 +112,9 @@ async def search_query(
 ) -> list[SearchResult]:
     """Embed the query text, then run a similarity search on ChromaDB.
 
-    If no *collection* is specified, all three default collections are
-    searched and results are merged and sorted by score.
+    If no *collection* is specified, all collections are searched
+    concurrently and their results merged by score.  A collection that
+    fails or exceeds the store's per-collection timeout is skipped.
     """
     vs = _vector_store(request)
     emb = _embedding_service(request)
@@ -117,38 +128,14 @@ async def search_query(
     else:
         collections = vs.list_collections()
 
-    all_results: list[SearchResult] = []
-
-    for col_name in collections:
-        try:
-            raw = await vs.query(
-                collection_name=col_name,
-                query_embedding=query_embedding,
-                n_results=body.top_k,
-                where=body.where,
-            )
-        except Exception:
-            logger.warning("Search failed on collection '%s'", col_name, exc_info=True)
-            continue
-
-        ids = raw.get("ids", [[]])[0]
-        docs = raw.get("documents", [[]])[0]
-        metas = raw.get("metadatas", [[]])[0]
-        distances = raw.get("distances", [[]])[0]
-
-        for doc_text, meta, dist in zip(docs, metas, distances):
-            similarity = max(0.0, 1.0 - dist)
-            all_results.append(
-                SearchResult(
-                    text=doc_text or "",
-                    score=round(similarity, 4),
-                    metadata=meta or {},
-                    collection=col_name,
-                )
-            )
-
-    all_results.sort(key=lambda r: r.score, reverse=True)
-    return all_results[: body.top_k]
+    per_query = await vs.query_many(
+        collections,
+        [query_embedding],
+        n_results=body.top_k,
+        where=body.where,
+        limit=body.top_k,
+    )
+    return [_to_result(hit) for hit in per_query[0]]
 
 
 # ---------------------------------------------------------------------------
@@ -166,7 +153,8 @@ async def find_similar(
 ) -> list[SearchResult]:
     """Embed the provided section text and find similar chunks.
 
-    Optionally excludes chunks belonging to the same document.
+    Optionally excludes chunks belonging to the same document.  Collections
+    are searched concurrently, as for ``/query``.
     """
     vs = _vector_store(request)
     emb = _embedding_service(request)
@@ -183,39 +171,12 @@ async def find_similar(
     # Fetch extra results so we can filter and still return top_k
     fetch_k = body.top_k * 3 if body.exclude_same_document else body.top_k
 
-    all_results: list[SearchResult] = []
-
-    for col_name in collections:
-        try:
-            raw = await vs.query(
-                collection_name=col_name,
-                query_embedding=query_embedding,
-                n_results=fetch_k,
-            )
-        except Exception:
-            logger.warning("Similar search failed on '%s'", col_name, exc_info=True)
-            continue
-
-        docs = raw.get("documents", [[]])[0]
-        metas = raw.get("metadatas", [[]])[0]
-        distances = raw.get("distances", [[]])[0]
-
-        for doc_text, meta, dist in zip(docs, metas, distances):
-            if body.exclude_same_document:
-                if (meta or {}).get("document_id") == body.document_id:
-                    continue
-            similarity = max(0.0, 1.0 - dist)
-            all_results.append(
-                SearchResult(
-                    text=doc_text or "",
-                    score=round(similarity, 4),
-                    metadata=meta or {},
-                    collection=col_name,
-                )
-            )
-
-    all_results.sort(key=lambda r: r.score, reverse=True)
-    return all_results[: body.top_k]
+    per_query = await vs.query_many(collections, [query_embedding], n_results=fetch_k)
+
+    hits = iter(per_query[0])  # already merged closest-first
+    if body.exclude_same_document:
+        hits = (h for h in hits if h["metadata"].get("document_id") != body.document_id)
+    return [_to_result(hit) for hit in islice(hits, body.top_k)]
 
 
 # ---------------------------------------------------------------------------
@@ -35,6 +35,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Literal, Sequence
 
+import httpx
 import pandas as pd
 from langchain_core.messages import (
     AIMessage,
@@ -222,6 +223,26 @@ def _html_table_to_dataframe(html: str) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+def _cells_to_dataframe(cells: list[list[Any]], header_rows: int = 0) -> pd.DataFrame:
+    """Build a DataFrame from a stored cell grid (see ``app.utils.html_table``).
+
+    Header rows are joined per column (``"Year 2024"``); without headers
+    columns are numbered like ``pd.read_html`` does.
+    """
+    if not cells:
+        return pd.DataFrame()
+    width = max(len(r) for r in cells)
+    rows = [list(r) + [None] * (width - len(r)) for r in cells]
+    if not header_rows:
+        return pd.DataFrame(rows)
+
+    columns = []
+    for j in range(width):
+        parts = dict.fromkeys(str(r[j]) for r in rows[:header_rows] if r[j] not in (None, ""))
+        columns.append(" ".join(parts) or f"Unnamed: {j}")
+    return pd.DataFrame(rows[header_rows:], columns=columns)
+
+
 def _plain_text_table_to_dataframe(text: str) -> pd.DataFrame:
     """Best-effort parse of a plain-text table into a DataFrame."""
     lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
@@ -261,6 +282,8 @@ class AnalyticsEngine:
         OpenAI API key.
     model:
         LLM model name.
+    http_client:
+        Shared ``httpx.AsyncClient`` connection pool (optional).
     """
 
     _MAX_TABLES = 15
@@ -277,6 +300,7 @@ class AnalyticsEngine:
         mongo_service: Any,
         api_key: str = "",
         model: str = "gpt-4.1-mini",
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
         self._vs = vector_store
         self._emb = embedding_service
@@ -286,6 +310,7 @@ class AnalyticsEngine:
             temperature=0.1,
             api_key=api_key,
             max_tokens=4096,
+            http_async_client=http_client,
         )
         self._dataframes: dict[str, list[pd.DataFrame]] = {}
 
@@ -400,10 +425,14 @@ class AnalyticsEngine:
         self, document_id: str
     ) -> list[dict[str, Any]]:
         """Return table metadata for a single document."""
-        doc = await self._mongo.find_by_id("documents", document_id)
-        if not doc:
-            return []
-        tables = doc.get("tables", [])
+        tables = await self._mongo.document_tables(document_id, projection={
+            "table_id": 1,
+            "page_number": 1,
+            "financial_statement_type": 1,
+            "column_headers": 1,
+            "row_labels": 1,
+            "html": 1,
+        })
         return [
             {
                 "table_id": t.get("table_id", f"table_{i}"),
@@ -429,7 +458,9 @@ class AnalyticsEngine:
         document_id: str,
     ) -> list[dict[str, Any]]:
         """Scan a document for risk indicators using the LLM."""
-        doc = await self._mongo.find_by_id("documents", document_id)
+        doc = await self._mongo.find_by_id(
+            "documents", document_id, {"filename": 1, "sections": 1}
+        )
         if not doc:
             return []
 
@@ -480,7 +511,9 @@ class AnalyticsEngine:
         """Extract a metric across multiple documents for trend analysis."""
         results: list[dict[str, Any]] = []
         for doc_id in document_ids:
-            doc = await self._mongo.find_by_id("documents", doc_id)
+            doc = await self._mongo.find_by_id(
+                "documents", doc_id, {"filename": 1, "metadata.fiscal_year": 1}
+            )
             if not doc:
                 continue
             tables = await self._load_tables([doc_id])
@@ -899,20 +932,28 @@ class AnalyticsEngine:
         else:
             query["tables_count"] = {"$gt": 0}
 
-        docs = await self._mongo.find_many("documents", query, limit=10)
+        docs = await self._mongo.find_many(
+            "documents", query, limit=10, projection={"filename": 1}
+        )
 
         all_tables: list[dict[str, Any]] = []
         for doc in docs:
             doc_id = doc.get("_id", "")
             filename = doc.get("filename", "Unknown")
-            tables = doc.get("tables", [])
+            tables = await self._mongo.document_tables(doc_id)
+
+            # Element-level copies of the same tables reuse these frames
+            frames_by_element: dict[str, pd.DataFrame] = {}
 
             for i, t in enumerate(tables):
                 html = t.get("html", "")
                 plain = t.get("plain_text", "")
 
                 df = pd.DataFrame()
-                if html:
+                if t.get("cells"):
+                    df = _cells_to_dataframe(t["cells"], t.get("header_rows", 0))
+                elif html:
+                    # Records ingested before cell grids were stored
                     df = _html_table_to_dataframe(html)
                 if df.empty and plain:
                     df = _plain_text_table_to_dataframe(plain)
@@ -924,6 +965,9 @@ class AnalyticsEngine:
                     except Exception:
                         pass
 
+                if t.get("element_id"):
+                    frames_by_element[t["element_id"]] = df
+
                 all_tables.append({
                     "document_id": str(doc_id),
                     "source_file": filename,
@@ -938,13 +982,18 @@ class AnalyticsEngine:
                 })
 
             # Also parse inline tables from elements
-            elements = doc.get("elements", [])
+            elements = await self._mongo.document_elements(
+                doc_id, query={"element_type": "Table"}
+            )
             for elem in elements:
                 if elem.get("element_type") == "Table":
                     html = elem.get("html", "")
                     text = elem.get("text", "")
                     df = pd.DataFrame()
-                    if html:
+                    known = frames_by_element.get(elem.get("element_id", ""))
+                    if known is not None:
+                        df = known.copy()
+                    elif html:
                         df = _html_table_to_dataframe(html)
                     if df.empty and text:
                         df = _plain_text_table_to_dataframe(text)
@@ -0,0 +1,237 @@
+"""Persistent BM25 inverted index over vector-store chunks.
+
+Built at ingest time over the same chunk IDs as the vector collections so
+keyword and vector results can be fused (see ``hybrid_query`` in
+``vector_store``).  Postings live in a single SQLite file — like the
+embedding cache — so several uvicorn workers share one index.
+
+Tokenisation is tuned for regulatory text: besides lower-cased words and
+dotted section numbers (``4.2.1``), standard references are folded into
+single compound terms so that "Ind AS 116", "IndAS-116" and "ind as 116"
+all index as ``indas_116``; likewise ``schedule_iii``, ``sa_700``,
+``section_135``, ``regulation_33`` and ``para_22``.  An exact standard or
+paragraph lookup therefore matches one rare, high-IDF term instead of a
+handful of common words.  The prefix and number must be separated
+(whitespace, ``.``, ``-`` or ``–``), and bare ``AS`` / ``SA`` only count
+in upper case, so "such as 5 items" or "sail boat" add no reference.
+
+All methods are synchronous and thread-safe; the vector store calls them
+from the default executor.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Standard BM25 parameters
+_K1 = 1.5
+_B = 0.75
+
+# SQLite host-parameter limit headroom (see embedding_cache)
+_LOOKUP_CHUNK = 500
+
+_WORD_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)*[a-z]?")
+
+# Matched on the original text: bare "AS" / "SA" are case-sensitive
+_REFERENCE_RE = re.compile(
+    r"\b((?i:ind\s*-?\s*as)|AS|SA|(?i:sre|sae|schedule|section|sec|regulation|reg|"
+    r"paragraph|para|rule|clause|note|annexure|appendix))"
+    r"[\s.\-–]+"
+    r"((?i:\d+[a-z]?(?:\.\d+)*|[ivxlc]+))\b"
+)
+
+_PREFIX_ALIASES = {
+    "sec": "section",
+    "reg": "regulation",
+    "paragraph": "para",
+}
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were which with shall be been any all such other".split()
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    collection  TEXT    NOT NULL,
+    chunk_id    TEXT    NOT NULL,
+    length      INTEGER NOT NULL,
+    PRIMARY KEY (collection, chunk_id)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    collection  TEXT    NOT NULL,
+    term        TEXT    NOT NULL,
+    chunk_id    TEXT    NOT NULL,
+    tf          INTEGER NOT NULL,
+    PRIMARY KEY (collection, term, chunk_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings (collection, chunk_id);
+"""
+
+
+def _normalise_word(word: str) -> str:
+    # Light plural folding — "provisions" → "provision", "leases" → "lease";
+    # "basis", "status" and "indas" are left alone
+    if len(word) > 4 and word.isalpha() and word.endswith("s") and word[-2] not in "aisu":
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Split *text* into BM25 terms (words, section numbers, references)."""
+    lowered = text.lower()
+    terms = [
+        _normalise_word(w)
+        for w in _WORD_RE.findall(lowered)
+        if w not in _STOPWORDS
+    ]
+    for prefix, number in _REFERENCE_RE.findall(text):
+        key = re.sub(r"[\s\-]", "", prefix.lower())
+        terms.append(f"{_PREFIX_ALIASES.get(key, key)}_{number.lower()}")
+    return terms
+
+
+class BM25Index:
+    """SQLite-backed BM25 index, partitioned by collection name.
+
+    Parameters
+    ----------
+    path:
+        Filesystem path of the SQLite database.  Parent directories are
+        created if needed.
+    """
+
+    def __init__(self, path: str = "./cache/bm25.sqlite3") -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        logger.info("BM25 index opened at %s", self._path)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, collection: str, ids: list[str], texts: list[str]) -> None:
+        """Index (or re-index) chunks *ids* with their *texts*."""
+        if not ids:
+            return
+        docs = []
+        postings = []
+        for chunk_id, text in zip(ids, texts):
+            counts = Counter(tokenize(text or ""))
+            docs.append((collection, chunk_id, sum(counts.values())))
+            postings.extend((collection, term, chunk_id, tf) for term, tf in counts.items())
+
+        with self._lock:
+            self._delete_locked(collection, ids)
+            self._conn.executemany(
+                "INSERT INTO docs (collection, chunk_id, length) VALUES (?, ?, ?)", docs
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (collection, term, chunk_id, tf) VALUES (?, ?, ?, ?)",
+                postings,
+            )
+            self._conn.commit()
+
+    def remove(self, collection: str, ids: list[str]) -> None:
+        """Drop chunks *ids* from the index."""
+        if not ids:
+            return
+        with self._lock:
+            self._delete_locked(collection, ids)
+            self._conn.commit()
+
+    def _delete_locked(self, collection: str, ids: list[str]) -> None:
+        for start in range(0, len(ids), _LOOKUP_CHUNK):
+            part = ids[start : start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(part))
+            for table in ("postings", "docs"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE collection = ? AND chunk_id IN ({placeholders})",
+                    (collection, *part),
+                )
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, collection: str, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """Return up to *k* ``(chunk_id, bm25_score)`` pairs, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            n_docs, total_len = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs WHERE collection = ?",
+                (collection,),
+            ).fetchone()
+            if not n_docs:
+                return []
+            rows = self._conn.execute(
+                "SELECT p.term, p.chunk_id, p.tf, d.length FROM postings p "
+                "JOIN docs d ON d.collection = p.collection AND d.chunk_id = p.chunk_id "
+                f"WHERE p.collection = ? AND p.term IN ({placeholders})",
+                (collection, *terms),
+            ).fetchall()
+
+        df = Counter(term for term, _, _, _ in rows)
+        avg_len = total_len / n_docs
+        scores: dict[str, float] = {}
+        for term, chunk_id, tf, length in rows:
+            idf = math.log(1.0 + (n_docs - df[term] + 0.5) / (df[term] + 0.5))
+            norm = tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * length / avg_len))
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+    # ------------------------------------------------------------------
+    # Utility
+    # ------------------------------------------------------------------
+
+    def count(self, collection: str) -> int:
+        """Number of indexed chunks in *collection*."""
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM docs WHERE collection = ?", (collection,)
+            ).fetchone()
+        return n
+
+    def stats(self) -> dict[str, Any]:
+        """Return per-collection chunk and posting counts."""
+        with self._lock:
+            docs = dict(self._conn.execute(
+                "SELECT collection, COUNT(*) FROM docs GROUP BY collection"
+            ).fetchall())
+            terms = dict(self._conn.execute(
+                "SELECT collection, COUNT(*) FROM postings GROUP BY collection"
+            ).fetchall())
+        return {
+            "path": str(self._path),
+            "collections": {
+                name: {"chunks": n, "postings": terms.get(name, 0)}
+                for name, n in docs.items()
+            },
+        }
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -14,7 +14,9 @@ Phase 2 — Query Decomposition (LLM-powered)
 
 Phase 3 — Iterative Retrieval
     For each generated query, search ChromaDB for the most relevant
-    regulatory rules.  Deduplicate across queries.  Rank by relevance.
+    regulatory rules.  Deduplicate across queries.  Rank by maximal
+    marginal relevance, so near-duplicate chunks do not use up the
+    per-framework assessment budget.
 
 Phase 4 — Chain-of-Thought Assessment
     For each rule-document pair, use the LLM with explicit chain-of-thought
@@ -43,7 +45,7 @@ from app.models.compliance import (
 from app.services.embedding_service import EmbeddingService
 from app.services.llm_service import LLMService
 from app.services.mongo_service import MongoService
-from app.services.vector_store import VectorStoreService
+from app.services.vector_store import VectorStoreService, merge_hits, mmr_rerank
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,8 @@ _MAX_CONCURRENT = 2  # Keep low to avoid TPM rate limits
 _TOP_K_PER_QUERY = 8
 _MAX_SECTION_TEXT = 6000  # Shorter to stay under TPM limits
 _MAX_RULES_PER_FRAMEWORK = 15  # Focus on most relevant rules
+_MMR_LAMBDA = 0.7  # relevance vs. diversity when ranking retrieved rules
+_MMR_REDUNDANCY_CUTOFF = 0.95  # cosine above which a rule is a near-duplicate
 
 
 class ComplianceEngine:
@@ -108,7 +112,7 @@ class ComplianceEngine:
         await _progress("Phase 1: Decomposing document structure...", 5)
         doc = await self._load_document(document_id)
         doc_text_sections = await self._decompose_document(doc)
-        doc_tables = self._collect_tables(doc)
+        doc_tables = await self._collect_tables(doc)
         document_name = doc.get("filename", "unknown")
         company_name = doc.get("metadata", {}).get("company")
         fiscal_year = doc.get("metadata", {}).get("fiscal_year")
@@ -296,19 +300,31 @@ class ComplianceEngine:
     # ==================================================================
 
     async def _load_document(self, document_id: str) -> dict[str, Any]:
-        doc = await self.mongo.find_by_id("documents", document_id)
+        # Elements / tables are loaded on demand (``_document_tables``)
+        doc = await self.mongo.find_by_id(
+            "documents", document_id, {"elements": 0, "tables": 0}
+        )
         if not doc:
             raise ValueError(f"Document not found: {document_id}")
         return doc
 
+    async def _document_tables(self, doc: dict[str, Any]) -> list[dict[str, Any]]:
+        """Tables of *doc*, loaded once and kept on the record."""
+        if "tables" not in doc:
+            doc["tables"] = await self.mongo.document_tables(doc.get("_id", ""))
+        return doc["tables"]
+
     async def _decompose_document(
         self, doc: dict[str, Any]
     ) -> list[dict[str, Any]]:
         """Reconstruct actual text sections from stored elements/chunks."""
         sections: list[dict[str, Any]] = []
 
-        # First try: use stored elements array (has actual text)
-        elements = doc.get("elements", [])
+        # First try: use stored elements (have actual text)
+        elements = await self.mongo.document_elements(
+            doc.get("_id", ""),
+            projection={"element_type": 1, "text": 1, "page_number": 1},
+        )
         if elements:
             current_section = {"name": "(Preamble)", "text_parts": [], "pages": set()}
             for elem in elements:
@@ -397,7 +413,7 @@ class ComplianceEngine:
                 return sections
 
         # Third try: reconstruct from tables (plain_text)
-        tables = doc.get("tables", [])
+        tables = await self._document_tables(doc)
         if tables:
             table_parts = []
             for t in tables:
@@ -422,9 +438,9 @@ class ComplianceEngine:
 
         return []
 
-    def _collect_tables(self, doc: dict[str, Any]) -> list[dict[str, Any]]:
-        """Collect all tables from the document record."""
-        tables = doc.get("tables", [])
+    async def _collect_tables(self, doc: dict[str, Any]) -> list[dict[str, Any]]:
+        """Collect all tables of the document."""
+        tables = await self._document_tables(doc)
         return [t for t in tables if t.get("html") or t.get("plain_text")]
 
     @staticmethod
@@ -572,8 +588,12 @@ Example: ["Does the document disclose accounting policies as required by Ind AS
         framework: str,
         collection: str,
     ) -> list[dict[str, Any]]:
-        """For each query, search ChromaDB and deduplicate results."""
-        seen_hashes: set[str] = set()
+        """Search ChromaDB with every query at once, deduplicate and diversify.
+
+        Exact duplicates are collapsed by text; the rest are ordered by
+        maximal marginal relevance over their stored embeddings, dropping
+        near-duplicates (overlapping sub-chunks of one paragraph).
+        """
         all_rules: list[dict[str, Any]] = []
 
         where_filter: dict[str, Any] | None = None
@@ -581,56 +601,53 @@ Example: ["Does the document disclose accounting policies as required by Ind AS
             # Only apply framework filter if the collection has the metadata
             where_filter = {"framework": framework}
 
-        for query in queries:
-            emb = await self.emb.embed_single(query)
-            if not emb:
-                continue
-
-            try:
-                raw = await self.vs.query(
-                    collection_name=collection,
-                    query_embedding=emb,
-                    n_results=_TOP_K_PER_QUERY,
-                    where=where_filter,
-                )
-            except Exception:
-                # Try without where filter (metadata might not match)
-                try:
-                    raw = await self.vs.query(
-                        collection_name=collection,
-                        query_embedding=emb,
-                        n_results=_TOP_K_PER_QUERY,
-                    )
-                except Exception:
-                    logger.warning("Query failed for: %s", query[:80], exc_info=True)
-                    continue
-
-            # Parse and deduplicate
-            ids = raw.get("ids", [[]])[0]
-            docs = raw.get("documents", [[]])[0]
-            metas = raw.get("metadatas", [[]])[0]
-            dists = raw.get("distances", [[]])[0]
-
-            for rule_id, text, meta, dist in zip(ids, docs, metas, dists):
-                if not text:
-                    continue
-                text_hash = hashlib.md5(text[:500].encode()).hexdigest()
-                if text_hash in seen_hashes:
-                    continue
-                seen_hashes.add(text_hash)
-
-                source = self._build_source_label(meta, framework)
-                all_rules.append({
-                    "rule_id": rule_id,
-                    "rule_text": text,
-                    "rule_source": source,
-                    "framework": meta.get("framework", framework),
-                    "distance": dist,
-                    "query": query,
-                })
+        queries = [q for q in queries if q and q.strip()]
+        if not queries:
+            return []
+
+        # One embeddings request and one vector search for all queries
+        query_matrix = await self.emb.embed_matrix(queries)
+        per_query = await self.vs.query_many(
+            [collection],
+            query_matrix,
+            n_results=_TOP_K_PER_QUERY,
+            where=where_filter,
+            fallback_unfiltered=True,
+        )
 
-        # Sort by distance (lower = more relevant) and deduplicate
-        all_rules.sort(key=lambda r: r["distance"])
+        # Parse and deduplicate (closest hit wins for identical text)
+        hits = [
+            hit
+            for hit in merge_hits(
+                per_query,
+                key=lambda h: hashlib.md5((h["text"] or "")[:500].encode()).hexdigest(),
+            )
+            if hit["text"]
+        ]
+        try:
+            embeddings = await self.vs.fetch_embeddings(hits)
+            hits = mmr_rerank(
+                hits,
+                embeddings,
+                lambda_=_MMR_LAMBDA,
+                redundancy_cutoff=_MMR_REDUNDANCY_CUTOFF,
+            )
+        except Exception:
+            logger.warning("MMR re-ranking failed — keeping distance order", exc_info=True)
+
+        for hit in hits:
+            meta = hit["metadata"]
+            source = self._build_source_label(meta, framework)
+            all_rules.append({
+                "rule_id": hit["id"],
+                "rule_text": hit["text"],
+                "rule_source": source,
+                "framework": meta.get("framework", framework),
+                "distance": hit["distance"],
+                "query": queries[hit["query_index"]],
+            })
+
+        # Most relevant first, each rule adding ground the earlier ones don't cover
         return all_rules
 
     @staticmethod
@@ -749,7 +766,11 @@ Example: ["Does the document disclose accounting policies as required by Ind AS
 
         Uses semantic search to find the most relevant chunks from the
         uploaded financial document, so the LLM sees the right context
-        for each specific rule being checked.
+        for each specific rule being checked.  The document's own chunks
+        are searched first (its partition when ``VECTOR_DOCUMENT_PARTITIONS``
+        is on); the source-file filter is the fallback for chunks indexed
+        without the document's ID.  A filter that matches nothing yields no
+        context rather than another document's chunks.
         """
         try:
             stats = self.vs.get_collection_stats("financial_documents")
@@ -763,25 +784,31 @@ Example: ["Does the document disclose accounting policies as required by Ind AS
         if not emb:
             return ""
 
-        # Try to filter by source_file if available
-        where_filter = None
-        if source_file:
-            where_filter = {"source_file": {"$contains": source_file.replace(".pdf", "")}}
+        # The document's own chunks: its partition, or a document_id filter
+        raw: dict[str, Any] | None = None
+        if document_id:
+            try:
+                raw = await self.vs.query_document(document_id, emb, n_results=8)
+            except Exception:
+                logger.debug("Per-document search failed for %s", document_id, exc_info=True)
+            if raw is not None and not raw.get("ids", [[]])[0]:
+                raw = None  # chunks stored before document_id keying
+
+        if raw is None:
+            # Try to filter by source_file if available; a known document
+            # never widens to an unfiltered search over every upload
+            where_filter = None
+            if source_file:
+                where_filter = {"source_file": {"$contains": source_file.replace(".pdf", "")}}
+            elif document_id:
+                return ""
 
-        try:
-            raw = await self.vs.query(
-                collection_name="financial_documents",
-                query_embedding=emb,
-                n_results=8,
-                where=where_filter,
-            )
-        except Exception:
-            # Fallback: no filter
             try:
                 raw = await self.vs.query(
                     collection_name="financial_documents",
                     query_embedding=emb,
                     n_results=8,
+                    where=where_filter,
                 )
             except Exception:
                 return ""
@@ -4,17 +4,34 @@ Extracts text, tables, and financial data from PDF documents (scanned and
 digital).  Produces a fully structured ``ProcessedDocument`` with:
   • A flat list of ``ProcessedElement`` objects
   • A hierarchical section tree built from header elements
-  • Extracted tables with HTML + plain‑text representations
+  • Extracted tables with HTML, plain‑text and typed cell‑grid representations
   • Financial‑data annotations (currencies, percentages, dates)
+
+Local (``unstructured`` library) partitioning runs in a ``PartitionPool``
+of worker processes so it never blocks the event loop; large PDFs are
+split into page ranges partitioned in parallel and stitched back in page
+order (``iter_elements`` streams them range by range).  By default only
+pages without a usable text layer, or that look like tables, go through
+``hi_res`` layout detection and OCR (see ``partition_pool``).  Raw
+partition output is cached on disk by file content hash
+(``PartitionCache``), so re-ingesting identical bytes skips
+partitioning.  ``process_batch`` processes several files concurrently.
 """
 
 from __future__ import annotations
 
+import asyncio
+import importlib.metadata
+import importlib.util
 import logging
-import re
+import multiprocessing
+import os
+import threading
 import time
 import uuid
-from html.parser import HTMLParser
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -25,6 +42,10 @@ from app.models.document import (
     ProcessedElement,
     SectionNode,
 )
+from app.services.partition_cache import PartitionCache, file_hash, partition_key
+from app.services.partition_pool import PartitionPool, link_range_parents, pdf_page_count
+from app.utils.financial_extract import extract_financial_fields_batch
+from app.utils.html_table import parse_html_table
 
 logger = logging.getLogger(__name__)
 
@@ -60,25 +81,12 @@ _FINANCIAL_STATEMENT_PATTERNS: dict[str, list[str]] = {
     ],
 }
 
-# Regex helpers for financial‑data extraction
-_RE_INR = re.compile(
-    r"""(?:₹|Rs\.?|INR)\s*([0-9,]+(?:\.[0-9]+)?)"""
-    r"""|([0-9,]+(?:\.[0-9]+)?)\s*(?:crore|lakh|thousand|million|billion)s?""",
-    re.IGNORECASE,
-)
-_RE_USD = re.compile(
-    r"""\$\s*([0-9,]+(?:\.[0-9]+)?)"""
-    r"""|USD\s*([0-9,]+(?:\.[0-9]+)?)""",
-    re.IGNORECASE,
-)
-_RE_PERCENT = re.compile(r"([0-9]+(?:\.[0-9]+)?)\s*%")
-_RE_DATE = re.compile(
-    r"\b(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})\b"
-    r"|(?:FY\s*\d{4}(?:\s*[-–]\s*\d{2,4})?)"
-    r"|(?:Q[1-4]\s*\d{4})",
-    re.IGNORECASE,
-)
-_RE_XBRL = re.compile(r"\b(in-gaap:[A-Za-z0-9_]+)\b")
+# Documents with at least this many elements have their financial data
+# extracted in parallel batches on a small pool of its own, so the batches
+# neither queue behind hi_res jobs nor count towards partition-worker
+# recycling; smaller documents are extracted on a thread
+_PARALLEL_EXTRACT_MIN_ELEMENTS = 20_000
+_EXTRACT_MAX_WORKERS = 4
 
 # Header‑level heuristic based on element type names returned by Unstructured
 _HEADER_LEVEL_MAP: dict[str, int] = {
@@ -88,87 +96,75 @@ _HEADER_LEVEL_MAP: dict[str, int] = {
 
 
 # ---------------------------------------------------------------------------
-# Utility — strip HTML to plain text
+# Section tree
 # ---------------------------------------------------------------------------
 
-class _HTMLTextExtractor(HTMLParser):
-    """Minimal HTML → plain‑text converter for table HTML."""
-
-    def __init__(self) -> None:
-        super().__init__()
-        self._parts: list[str] = []
-        self._in_cell = False
-
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        if tag in {"td", "th"}:
-            self._in_cell = True
-
-    def handle_endtag(self, tag: str) -> None:
-        if tag in {"td", "th"}:
-            self._parts.append("\t")
-            self._in_cell = False
-        elif tag == "tr":
-            self._parts.append("\n")
-
-    def handle_data(self, data: str) -> None:
-        if self._in_cell:
-            self._parts.append(data.strip())
-
-    def get_text(self) -> str:
-        return "".join(self._parts).strip()
-
-
-def _html_to_plain(html: str) -> str:
-    """Convert simple HTML table to tab‑separated plain text."""
-    extractor = _HTMLTextExtractor()
-    extractor.feed(html)
-    return extractor.get_text()
-
-
-def _extract_column_headers(html: str) -> list[str]:
-    """Pull <th> values from the first <thead> or first <tr>."""
-    headers: list[str] = []
-    th_pattern = re.compile(r"<th[^>]*>(.*?)</th>", re.IGNORECASE | re.DOTALL)
-    # Try thead first
-    thead_match = re.search(
-        r"<thead[^>]*>(.*?)</thead>", html, re.IGNORECASE | re.DOTALL
-    )
-    search_area = thead_match.group(1) if thead_match else html
-    for m in th_pattern.finditer(search_area):
-        text = re.sub(r"<[^>]+>", "", m.group(1)).strip()
-        if text:
-            headers.append(text)
-    # Fallback — first <tr> td values
-    if not headers:
-        first_tr = re.search(r"<tr[^>]*>(.*?)</tr>", html, re.IGNORECASE | re.DOTALL)
-        if first_tr:
-            for m in re.finditer(
-                r"<t[dh][^>]*>(.*?)</t[dh]>",
-                first_tr.group(1),
-                re.IGNORECASE | re.DOTALL,
-            ):
-                text = re.sub(r"<[^>]+>", "", m.group(1)).strip()
-                if text:
-                    headers.append(text)
-    return headers
-
-
-def _extract_row_labels(html: str) -> list[str]:
-    """Pull the first cell of every <tr> as a row label."""
-    labels: list[str] = []
-    for tr_match in re.finditer(
-        r"<tr[^>]*>(.*?)</tr>", html, re.IGNORECASE | re.DOTALL
-    ):
-        first_cell = re.search(
-            r"<t[dh][^>]*>(.*?)</t[dh]>",
-            tr_match.group(1),
-            re.IGNORECASE | re.DOTALL,
-        )
-        if first_cell:
-            text = re.sub(r"<[^>]+>", "", first_cell.group(1)).strip()
-            if text:
-                labels.append(text)
-    return labels
+class SectionTreeBuilder:
+    """Incremental section tree (see ``DocumentProcessor._build_section_tree``).
+
+    Elements may be added in consecutive batches.  With
+    ``keep_elements=False`` nodes only count their elements, so streaming
+    ingest does not hold on to them.
+    """
+
+    def __init__(self, keep_elements: bool = True) -> None:
+        self.roots: list[SectionNode] = []
+        self._stack: list[SectionNode] = []  # ancestor stack; stack[0] is current root
+        self._keep = keep_elements
+        self._counts: dict[int, int] = {}
+
+    def add(self, elements: list[ProcessedElement]) -> None:
+        """Add the next elements (in document order)."""
+        for elem in elements:
+            level = _HEADER_LEVEL_MAP.get(elem.element_type, 0)
+
+            if level > 0:
+                # It's a header — create a new section node
+                node = SectionNode(title=elem.text, level=level)
+
+                if not self._stack:
+                    # First header ever — becomes a root
+                    self.roots.append(node)
+                    self._stack = [node]
+                elif level <= self._stack[-1].level:
+                    # Pop back to find the correct parent
+                    while self._stack and self._stack[-1].level >= level:
+                        self._stack.pop()
+                    if self._stack:
+                        self._stack[-1].children.append(node)
+                    else:
+                        self.roots.append(node)
+                    self._stack.append(node)
+                else:
+                    # Deeper header — child of current
+                    self._stack[-1].children.append(node)
+                    self._stack.append(node)
+            else:
+                # Non‑header element → attach to the current section
+                if not self._stack:
+                    # Elements before any header: create an implicit root
+                    implicit = SectionNode(title="(Preamble)", level=0)
+                    self.roots.append(implicit)
+                    self._stack = [implicit]
+                self._attach(self._stack[-1], elem)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Title / level / element count of every node, as nested dicts."""
+
+        def _sec(node: SectionNode) -> dict[str, Any]:
+            return {
+                "title": node.title,
+                "level": node.level,
+                "elements_count": self._counts.get(id(node), 0),
+                "children": [_sec(c) for c in node.children],
+            }
+
+        return [_sec(root) for root in self.roots]
+
+    def _attach(self, node: SectionNode, elem: ProcessedElement) -> None:
+        if self._keep:
+            node.elements.append(elem)
+        self._counts[id(node)] = self._counts.get(id(node), 0) + 1
 
 
 # ---------------------------------------------------------------------------
@@ -188,6 +184,12 @@ class DocumentProcessor:
         If *True* (default) attempt the cloud API first; fall back to
         local ``unstructured`` library if the API call fails or if
         *use_api* is *False*.
+    partition_pool:
+        Worker pool for local partitioning.  A default one (one worker per
+        CPU, started on first use) is created if not provided.
+    partition_cache:
+        Optional on-disk cache of raw partition output keyed by file
+        content hash and partition parameters.
     """
 
     def __init__(
@@ -196,10 +198,46 @@ class DocumentProcessor:
         api_url: str = "https://api.unstructuredapp.io/general/v0/general",
         *,
         use_api: bool = True,
+        partition_pool: PartitionPool | None = None,
+        partition_cache: PartitionCache | None = None,
     ) -> None:
         self._api_key = api_key
         self._api_url = api_url
         self._use_api = use_api and bool(api_key)
+        self._pool = partition_pool or PartitionPool()
+        self._cache = partition_cache
+        self._extract_workers = min(_EXTRACT_MAX_WORKERS, os.cpu_count() or 1)
+        self._extract_pool: ProcessPoolExecutor | None = None
+        self._extract_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> DocumentProcessor:
+        """Build a processor (pool and cache included) from application ``Settings``."""
+        return cls(
+            api_key=settings.UNSTRUCTURED_API_KEY,
+            api_url=settings.UNSTRUCTURED_API_URL,
+            partition_pool=PartitionPool.from_settings(settings),
+            partition_cache=PartitionCache.from_settings(settings),
+        )
+
+    @property
+    def partition_workers(self) -> int:
+        """Worker processes available for local partitioning."""
+        return self._pool.workers
+
+    def partition_cache_stats(self) -> dict[str, Any] | None:
+        """Partition cache counters (``None`` when caching is disabled)."""
+        return self._cache.stats() if self._cache is not None else None
+
+    def close(self) -> None:
+        """Stop the partitioning and extraction workers and close the partition cache."""
+        self._pool.close()
+        with self._extract_lock:
+            pool, self._extract_pool = self._extract_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._cache is not None:
+            self._cache.close()
 
     # ------------------------------------------------------------------
     # Public API
@@ -239,12 +277,8 @@ class DocumentProcessor:
                 metadata={"error": "No elements extracted from document"},
             )
 
-        # Step 2 — normalise
-        elements = self._normalise_elements(raw_elements, filename)
-
-        # Step 3 — financial data
-        for elem in elements:
-            elem.financial_data = self._extract_financial_data(elem.text)
+        # Steps 2–3 — normalise, financial data
+        elements = await self._prepare_elements(raw_elements, filename)
 
         # Step 4 — section tree
         sections = self._build_section_tree(elements)
@@ -257,6 +291,13 @@ class DocumentProcessor:
             (e.page_number for e in elements if e.page_number), default=0
         )
 
+        # Pages per local partition strategy (tiered mode)
+        page_strategies: dict[int, str] = {
+            e.page_number: e.metadata["partition_strategy"]
+            for e in elements
+            if e.page_number and e.metadata.get("partition_strategy")
+        }
+
         elapsed = time.perf_counter() - t0
         logger.info(
             "Processed %s → %d elements, %d tables, %d pages in %.2fs",
@@ -279,6 +320,10 @@ class DocumentProcessor:
                 "doc_type": doc_type,
                 "file_path": filepath,
                 "extraction_mode": "api" if self._use_api else "local",
+                "page_strategies": {
+                    name: sum(1 for s in page_strategies.values() if s == name)
+                    for name in sorted(set(page_strategies.values()))
+                },
             },
             processing_time=elapsed,
             processing_status="success",
@@ -289,8 +334,9 @@ class DocumentProcessor:
         filepaths: list[str],
         *,
         on_progress: Any | None = None,
+        max_concurrency: int | None = None,
     ) -> list[ProcessedDocument]:
-        """Process multiple files sequentially with optional progress callback.
+        """Process multiple files concurrently with optional progress callback.
 
         Parameters
         ----------
@@ -298,40 +344,114 @@ class DocumentProcessor:
             List of file paths to process.
         on_progress:
             Optional ``async callable(index, total, filename, status)`` invoked
-            after each file finishes.
+            after each file finishes; *index* counts completed files.
+        max_concurrency:
+            Files processed at once (default: one per partition worker).
+
+        Returns results in input order.
         """
-        results: list[ProcessedDocument] = []
         total = len(filepaths)
-        for idx, fp in enumerate(filepaths, start=1):
+        semaphore = asyncio.Semaphore(max_concurrency or self.partition_workers)
+        done = 0
+
+        async def _one(fp: str) -> ProcessedDocument:
+            nonlocal done
             fname = Path(fp).name
-            logger.info("Batch %d/%d — processing %s", idx, total, fname)
-            try:
-                doc = await self.process_document(fp)
-                results.append(doc)
-                status = doc.processing_status
-            except Exception:
-                logger.exception("Failed to process %s", fname)
-                results.append(
-                    ProcessedDocument(
+            async with semaphore:
+                logger.info("Batch — processing %s", fname)
+                try:
+                    doc = await self.process_document(fp)
+                except Exception:
+                    logger.exception("Failed to process %s", fname)
+                    doc = ProcessedDocument(
                         document_id=str(uuid.uuid4()),
                         filename=fname,
                         file_type=Path(fp).suffix.lstrip(".") or "pdf",
                         processing_status="failed",
                         metadata={"error": f"Exception during processing of {fname}"},
                     )
-                )
-                status = "failed"
 
+            done += 1
+            logger.info("Batch %d/%d — %s %s", done, total, fname, doc.processing_status)
             if on_progress is not None:
-                await on_progress(idx, total, fname, status)
+                await on_progress(done, total, fname, doc.processing_status)
+            return doc
 
-        return results
+        return list(await asyncio.gather(*(_one(fp) for fp in filepaths)))
 
     async def extract_tables_only(self, filepath: str) -> list[ExtractedTable]:
         """Convenience — process file and return only table objects."""
         doc = await self.process_document(filepath)
         return doc.tables
 
+    async def iter_elements(self, filepath: str) -> AsyncIterator[list[ProcessedElement]]:
+        """Yield the normalised, annotated elements of *filepath* in document order.
+
+        When a large PDF is partitioned locally in page ranges, each range
+        is yielded as soon as it and every earlier range are done; at most
+        one range per partition worker is in flight or waiting to be
+        consumed, so a slow consumer throttles partitioning.  Unlike
+        ``process_document``, a failing range raises instead of falling back
+        to the whole file, since earlier ranges were already yielded.  API
+        results and small documents arrive as a single batch.  Build the section
+        tree with ``SectionTreeBuilder`` and tables with
+        ``tables_from_elements``.
+        """
+        filename = Path(filepath).name
+        digest = await self._file_digest(filepath)
+
+        raw: list[Any] = []
+        if self._use_api:
+            raw = await self._partition_cached(
+                filepath, digest, self._api_params(),
+                lambda: self._partition_api(filepath, filename),
+            )
+
+        ranges: list[tuple[int, int]] = []
+        if not raw and importlib.util.find_spec("unstructured") is not None:
+            loop = asyncio.get_running_loop()
+            n_pages = await loop.run_in_executor(None, pdf_page_count, filepath)
+            ranges = self._pool.page_ranges(n_pages)
+
+        if raw or len(ranges) <= 1:
+            if not raw:
+                raw = await self._partition_cached(
+                    filepath, digest, self._local_params(),
+                    lambda: self._partition_local(filepath),
+                )
+            if raw:
+                yield await self._prepare_elements(raw, filename)
+            return
+
+        async def _range(first: int, last: int) -> list[Any]:
+            params = {**self._local_params(), "pages": [first, last]}
+            return await self._partition_cached(
+                filepath, digest, params,
+                lambda: self._pool.partition(filepath, first, last),
+            )
+
+        pending = iter(ranges)
+        last_title: str | None = None
+        window = min(len(ranges), self.partition_workers)
+        in_flight: deque[asyncio.Task[list[Any]]] = deque(
+            asyncio.ensure_future(_range(*next(pending))) for _ in range(window)
+        )
+        try:
+            while in_flight:
+                part = await in_flight.popleft()
+                nxt = next(pending, None)
+                if nxt is not None:
+                    in_flight.append(asyncio.ensure_future(_range(*nxt)))
+                last_title = link_range_parents(part, last_title)
+                yield await self._prepare_elements(part, filename)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    def tables_from_elements(self, elements: list[ProcessedElement]) -> list[ExtractedTable]:
+        """``ExtractedTable`` objects for the Table elements among *elements*."""
+        return self._extract_tables([], elements)
+
     # ------------------------------------------------------------------
     # Partitioning — API mode
     # ------------------------------------------------------------------
@@ -389,29 +509,61 @@ class DocumentProcessor:
     # ------------------------------------------------------------------
 
     async def _partition_local(self, filepath: str) -> list[Any]:
-        """Use the open‑source ``unstructured`` library directly."""
-        try:
-            from unstructured.partition.pdf import partition_pdf
-        except ImportError:
+        """Use the open‑source ``unstructured`` library in a worker process."""
+        # Only check availability here — the heavy import happens in the workers
+        if importlib.util.find_spec("unstructured") is None:
             logger.error(
                 "Neither unstructured-client nor unstructured local library "
                 "is available.  Cannot process document."
             )
             return []
 
+        loop = asyncio.get_running_loop()
+        n_pages = await loop.run_in_executor(None, pdf_page_count, filepath)
+        ranges = self._pool.page_ranges(n_pages)
+        if len(ranges) > 1:
+            elements = await self._partition_local_pages(filepath, ranges)
+            if elements is not None:
+                return elements
+
         try:
-            elements = partition_pdf(
-                filename=filepath,
-                strategy="hi_res",
-                infer_table_structure=True,
-                languages=["eng"],
-                include_page_breaks=True,
-            )
-            return list(elements)
+            return await self._pool.partition(filepath)
         except Exception:
             logger.exception("Local partition failed for %s", filepath)
             return []
 
+    async def _partition_local_pages(
+        self, filepath: str, ranges: list[tuple[int, int]]
+    ) -> list[Any] | None:
+        """Partition page *ranges* in parallel and concatenate them in page order.
+
+        Returns ``None`` if any range fails, so the caller can fall back to
+        partitioning the whole file.
+        """
+        t0 = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._pool.partition(filepath, first, last) for first, last in ranges),
+            return_exceptions=True,
+        )
+        failed = [r for r, res in zip(ranges, results) if isinstance(res, BaseException)]
+        if failed:
+            logger.error(
+                "Local partition failed for pages %s of %s — retrying the whole file",
+                ", ".join(f"{a}-{b}" for a, b in failed), filepath,
+            )
+            return None
+
+        elements: list[Any] = []
+        last_title: str | None = None
+        for part in results:
+            last_title = link_range_parents(part, last_title)
+            elements.extend(part)
+        logger.info(
+            "Partitioned %s locally in %d page ranges → %d elements in %.1fs",
+            Path(filepath).name, len(ranges), len(elements), time.perf_counter() - t0,
+        )
+        return elements
+
     # ------------------------------------------------------------------
     # Partition dispatcher
     # ------------------------------------------------------------------
@@ -420,8 +572,13 @@ class DocumentProcessor:
         self, filepath: str, filename: str
     ) -> list[Any]:
         """Try API mode first; fall back to local if it fails or is disabled."""
+        digest = await self._file_digest(filepath)
+
         if self._use_api:
-            elems = await self._partition_api(filepath, filename)
+            elems = await self._partition_cached(
+                filepath, digest, self._api_params(),
+                lambda: self._partition_api(filepath, filename),
+            )
             if elems:
                 return elems
             logger.warning(
@@ -429,7 +586,71 @@ class DocumentProcessor:
                 filename,
             )
 
-        return await self._partition_local(filepath)
+        return await self._partition_cached(
+            filepath, digest, self._local_params(),
+            lambda: self._partition_local(filepath),
+        )
+
+    # ------------------------------------------------------------------
+    # Partition cache
+    # ------------------------------------------------------------------
+
+    async def _file_digest(self, filepath: str) -> str | None:
+        """Content hash of *filepath* for the cache (``None`` when caching is off)."""
+        if self._cache is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, file_hash, filepath)
+
+    async def _partition_cached(
+        self,
+        filepath: str,
+        digest: str | None,
+        params: dict[str, Any],
+        partition: Callable[[], Awaitable[list[Any]]],
+    ) -> list[Any]:
+        """Serve *filepath*'s elements from the cache, or run *partition* and store them."""
+        if self._cache is None or digest is None:
+            return await partition()
+
+        loop = asyncio.get_running_loop()
+        key = partition_key(digest, params)
+        cached = await loop.run_in_executor(None, self._cache.get, key)
+        if cached is not None:
+            logger.info(
+                "Partition cache hit for %s (%s, %d elements)",
+                Path(filepath).name, params["mode"], len(cached),
+            )
+            return self._rebind_source(cached, filepath)
+
+        elements = await partition()
+        if elements and all(isinstance(e, dict) for e in elements):
+            await loop.run_in_executor(None, self._cache.put, key, digest, elements)
+        return elements
+
+    def _api_params(self) -> dict[str, Any]:
+        return {"mode": "api", "url": self._api_url, "strategy": "hi_res", "tables": True}
+
+    def _local_params(self) -> dict[str, Any]:
+        try:
+            version = importlib.metadata.version("unstructured")
+        except importlib.metadata.PackageNotFoundError:
+            version = ""
+        return {"mode": "local", "unstructured": version, **self._pool.cache_params()}
+
+    @staticmethod
+    def _rebind_source(elements: list[dict[str, Any]], filepath: str) -> list[dict[str, Any]]:
+        """Point cached elements at *filepath* (the same bytes may arrive under a new name)."""
+        path = Path(filepath)
+        for element in elements:
+            meta = element.get("metadata")
+            if not isinstance(meta, dict):
+                continue
+            if "filename" in meta:
+                meta["filename"] = path.name
+            if "file_directory" in meta:
+                meta["file_directory"] = str(path.parent)
+        return elements
 
     # ------------------------------------------------------------------
     # Element normalisation
@@ -471,6 +692,7 @@ class DocumentProcessor:
                 "filename": raw_meta.get("filename", source_filename),
                 "filetype": raw_meta.get("filetype", ""),
                 "languages": raw_meta.get("languages", ["eng"]),
+                "partition_strategy": raw_meta.get("partition_strategy", ""),
             }
 
             results.append(
@@ -491,42 +713,62 @@ class DocumentProcessor:
     # Financial‑data extraction
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _extract_financial_data(text: str) -> FinancialDataExtract | None:
-        """Run regex extractors over *text* and return structured findings."""
-        if not text:
-            return None
-
-        currency_amounts: list[dict[str, Any]] = []
-        for m in _RE_INR.finditer(text):
-            val = m.group(1) or m.group(2) or ""
-            currency_amounts.append(
-                {"value": val.replace(",", ""), "currency": "INR", "raw_text": m.group(0).strip()}
-            )
-        for m in _RE_USD.finditer(text):
-            val = m.group(1) or m.group(2) or ""
-            currency_amounts.append(
-                {"value": val.replace(",", ""), "currency": "USD", "raw_text": m.group(0).strip()}
-            )
+    async def _prepare_elements(
+        self, raw_elements: list[Any], filename: str
+    ) -> list[ProcessedElement]:
+        """Normalise raw partition output and annotate its financial data."""
+        elements = self._normalise_elements(raw_elements, filename)
+        await self._annotate_financial_data(elements)
+        return elements
+
+    def _extract_executor(self) -> ProcessPoolExecutor:
+        with self._extract_lock:
+            if self._extract_pool is None:
+                # spawn: forking a process with live event-loop threads is unsafe
+                self._extract_pool = ProcessPoolExecutor(
+                    max_workers=self._extract_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._extract_pool
 
-        percentages: list[dict[str, Any]] = [
-            {"value": m.group(1), "raw_text": m.group(0).strip()}
-            for m in _RE_PERCENT.finditer(text)
-        ]
+    def _discard_extract_executor(self, pool: ProcessPoolExecutor) -> None:
+        with self._extract_lock:
+            if self._extract_pool is pool:
+                self._extract_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
 
-        dates: list[str] = [m.group(0).strip() for m in _RE_DATE.finditer(text)]
+    async def _annotate_financial_data(self, elements: list[ProcessedElement]) -> None:
+        """Set ``financial_data`` on every element.
 
-        xbrl: list[str] = _RE_XBRL.findall(text)
+        Large documents are split into one batch per extraction worker and
+        extracted in parallel; otherwise (or if the pool fails) on a thread.
+        Neither path runs on the event loop or the partition pool.
+        """
+        texts = [elem.text for elem in elements]
+        results: list[dict[str, Any] | None] | None = None
+        loop = asyncio.get_running_loop()
+
+        workers = self._extract_workers
+        if len(texts) >= _PARALLEL_EXTRACT_MIN_ELEMENTS and workers > 1:
+            pool = self._extract_executor()
+            size = -(-len(texts) // workers)
+            try:
+                parts = await asyncio.gather(*(
+                    loop.run_in_executor(
+                        pool, extract_financial_fields_batch, texts[i : i + size]
+                    )
+                    for i in range(0, len(texts), size)
+                ))
+                results = [fields for part in parts for fields in part]
+            except Exception:
+                logger.warning("Parallel financial-data extraction failed", exc_info=True)
+                self._discard_extract_executor(pool)
 
-        if not (currency_amounts or percentages or dates or xbrl):
-            return None
+        if results is None:
+            results = await loop.run_in_executor(None, extract_financial_fields_batch, texts)
 
-        return FinancialDataExtract(
-            currency_amounts=currency_amounts,
-            percentages=percentages,
-            dates=dates,
-            xbrl_elements=xbrl,
-        )
+        for elem, fields in zip(elements, results):
+            elem.financial_data = FinancialDataExtract(**fields) if fields else None
 
     # ------------------------------------------------------------------
     # Section tree builder
@@ -539,46 +781,9 @@ class DocumentProcessor:
         Header elements (Title → level 1, Header → level 2) form tree nodes.
         All other elements are grouped under their nearest preceding header.
         """
-        roots: list[SectionNode] = []
-        stack: list[SectionNode] = []  # ancestor stack; stack[0] is current root
-
-        for elem in elements:
-            level = _HEADER_LEVEL_MAP.get(elem.element_type, 0)
-
-            if level > 0:
-                # It's a header — create a new section node
-                node = SectionNode(title=elem.text, level=level)
-
-                if not stack:
-                    # First header ever — becomes a root
-                    roots.append(node)
-                    stack = [node]
-                elif level <= stack[-1].level:
-                    # Pop back to find the correct parent
-                    while stack and stack[-1].level >= level:
-                        stack.pop()
-                    if stack:
-                        stack[-1].children.append(node)
-                    else:
-                        roots.append(node)
-                    stack.append(node)
-                else:
-                    # Deeper header — child of current
-                    stack[-1].children.append(node)
-                    stack.append(node)
-            else:
-                # Non‑header element → attach to the current section
-                if stack:
-                    stack[-1].elements.append(elem)
-                else:
-                    # Elements before any header: create an implicit root
-                    implicit = SectionNode(
-                        title="(Preamble)", level=0, elements=[elem]
-                    )
-                    roots.append(implicit)
-                    stack = [implicit]
-
-        return roots
+        builder = SectionTreeBuilder()
+        builder.add(elements)
+        return builder.roots
 
     # ------------------------------------------------------------------
     # Table extraction & classification
@@ -597,23 +802,25 @@ class DocumentProcessor:
                 continue
 
             html = elem.html or ""
-            plain = _html_to_plain(html) if html else elem.text
-
-            col_headers = _extract_column_headers(html) if html else []
-            row_labels = _extract_row_labels(html) if html else []
+            # One parse yields plain text, headers, row labels and the cell grid
+            parsed: dict[str, Any] = (
+                parse_html_table(html) if html else {"plain_text": elem.text}
+            )
 
-            fin_type = self._classify_financial_table(elem.text, col_headers, row_labels)
+            fin_type = self._classify_financial_table(
+                elem.text,
+                parsed.get("column_headers", []),
+                parsed.get("row_labels", []),
+            )
 
             tables.append(
                 ExtractedTable(
                     table_id=str(uuid.uuid4()),
                     page_number=elem.page_number,
                     html=html,
-                    plain_text=plain,
-                    column_headers=col_headers,
-                    row_labels=row_labels,
                     financial_statement_type=fin_type,
                     element_id=elem.element_id,
+                    **parsed,
                 )
             )
 
@@ -0,0 +1,294 @@
+"""Pluggable embedding backends behind ``EmbeddingService``.
+
+``EmbeddingService`` owns batching, deduplication, caching and retries;
+a backend only turns one batch of texts into vectors.  Three backends are
+provided and selected via ``Settings.EMBEDDING_BACKEND``:
+
+- **openai** — ``AsyncOpenAI`` embeddings endpoint (production default).
+- **local** — a sentence-transformers model run on the CPU in a process
+  pool, so ingest throughput is bounded by local cores rather than a
+  remote quota.
+- **hashing** — a deterministic feature-hashing stand-in with a
+  configurable dimension.  No network, no model download; texts that
+  share words get similar vectors, so retrieval still behaves sensibly in
+  load tests, CI benchmarks and air-gapped runs.
+
+Every backend returns one contiguous 2-D ``float32`` matrix per batch —
+never a list of Python floats.  Each backend exposes a ``model_id`` that
+is used (with ``dimensions``) as the embedding-cache key, so vectors from
+different backends are never mixed.  Switching backend also changes the
+vector dimension — re-index ChromaDB afterwards.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any
+
+import httpx
+import numpy as np
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("openai", "local", "hashing")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingBackend:
+    """Interface implemented by every embedding backend."""
+
+    #: Identifier used as the embedding-cache key.
+    model_id: str = ""
+    #: Requested output dimension (*None* = the model's native size).
+    dimensions: int | None = None
+    #: Whether requests count against the remote RPM / TPM budget.
+    rate_limited: bool = False
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """Return a ``(len(texts), dim)`` float32 matrix, rows in input order."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+# ---------------------------------------------------------------------------
+# OpenAI
+# ---------------------------------------------------------------------------
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI embeddings endpoint via the native async SDK.
+
+    Parameters
+    ----------
+    model:
+        Embedding model identifier.
+    api_key:
+        OpenAI API key.  Falls back to the ``OPENAI_API_KEY`` env var.
+    dimensions:
+        Optional output dimensionality override supported by v3 models.
+    http_client:
+        Shared ``httpx.AsyncClient``.  *None* lets the SDK create its own.
+    """
+
+    rate_limited = True
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        api_key: str | None = None,
+        dimensions: int | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.model_id = model
+        self.dimensions = dimensions
+        # Retries are handled by EmbeddingService so 429s respect its budget
+        client_kwargs: dict[str, Any] = {"max_retries": 0}
+        if api_key:
+            client_kwargs["api_key"] = api_key
+        if http_client is not None:
+            client_kwargs["http_client"] = http_client
+        self._client = AsyncOpenAI(**client_kwargs)
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        # base64 is decoded straight into the matrix: no per-float objects
+        kwargs: dict[str, Any] = {
+            "input": texts,
+            "model": self.model_id,
+            "encoding_format": "base64",
+        }
+        if self.dimensions is not None:
+            kwargs["dimensions"] = self.dimensions
+
+        response = await self._client.embeddings.create(**kwargs)
+        # API returns items in the *same* order as input
+        return np.stack([_decode_embedding(item.embedding) for item in response.data])
+
+
+def _decode_embedding(value: str | list[float]) -> np.ndarray:
+    if isinstance(value, str):
+        return np.frombuffer(base64.b64decode(value), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Local sentence-transformers (process pool)
+# ---------------------------------------------------------------------------
+
+# Per-worker model, loaded once by the pool initializer
+_worker_model: Any = None
+
+
+def _init_local_worker(model_name: str, device: str, threads: int) -> None:
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device=device)
+
+
+def _encode_local(texts: list[str], batch_size: int) -> np.ndarray:
+    vectors = _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """sentence-transformers model evaluated in a CPU process pool.
+
+    Each worker process loads its own copy of the model, so *workers*
+    batches are encoded truly in parallel without contending for the GIL.
+
+    Parameters
+    ----------
+    model:
+        sentence-transformers model name or local path.
+    workers:
+        Number of worker processes.
+    device:
+        Torch device passed to ``SentenceTransformer`` (``"cpu"`` by default).
+    threads_per_worker:
+        Torch intra-op threads per worker.  ``0`` keeps torch's default;
+        set it so ``workers * threads_per_worker`` ≈ physical cores.
+    encode_batch_size:
+        Mini-batch size used inside ``SentenceTransformer.encode``.
+    """
+
+    def __init__(
+        self,
+        model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        workers: int = 2,
+        device: str = "cpu",
+        threads_per_worker: int = 0,
+        encode_batch_size: int = 32,
+    ) -> None:
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError as exc:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=local requires the sentence-transformers package"
+            ) from exc
+
+        self.model_id = f"local:{model}"
+        self._encode_batch_size = encode_batch_size
+        # spawn: torch does not survive fork() in a process with live threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_local_worker,
+            initargs=(model, device, threads_per_worker),
+        )
+        logger.info("Local embedding backend: %s on %d %s worker(s)", model, workers, device)
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool,
+            partial(_encode_local, texts, self._encode_batch_size),
+        )
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Deterministic hashing stand-in
+# ---------------------------------------------------------------------------
+
+def hashing_vector(text: str, dimensions: int, out: np.ndarray | None = None) -> np.ndarray:
+    """Signed feature-hashing embedding of word unigrams and bigrams.
+
+    The output is L2-normalised and depends only on *text* and
+    *dimensions*, so it is stable across processes and runs.  When *out*
+    is given the vector is written into it in place.
+    """
+    vec = np.zeros(dimensions, dtype=np.float32) if out is None else out
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vec[value % dimensions] += 1.0 if value >> 63 else -1.0
+
+    norm = float(np.linalg.norm(vec))
+    if norm == 0.0:
+        # Blank / punctuation-only text — avoid a zero vector (undefined cosine)
+        vec[0] = 1.0
+    else:
+        vec /= norm
+    return vec
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """Deterministic offline stand-in for a real embedding model.
+
+    Parameters
+    ----------
+    dimensions:
+        Output vector dimension.
+    """
+
+    def __init__(self, dimensions: int = 384) -> None:
+        if dimensions <= 0:
+            raise ValueError("Hashing backend dimensions must be positive")
+        self.model_id = f"hashing:{dimensions}"
+        self.dimensions = dimensions
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._embed_sync, texts)
+
+    def _embed_sync(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in zip(matrix, texts):
+            hashing_vector(text, self.dimensions, out=row)
+        return matrix
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+def build_embedding_backend(
+    settings: Any,
+    http_client: httpx.AsyncClient | None = None,
+) -> EmbeddingBackend:
+    """Instantiate the backend named by ``settings.EMBEDDING_BACKEND``."""
+    name = settings.EMBEDDING_BACKEND.lower()
+    if name == "openai":
+        return OpenAIEmbeddingBackend(
+            model=settings.EMBEDDING_MODEL,
+            api_key=settings.OPENAI_API_KEY,
+            dimensions=settings.EMBEDDING_DIMENSIONS or None,
+            http_client=http_client,
+        )
+    if name == "local":
+        return LocalEmbeddingBackend(
+            model=settings.EMBEDDING_LOCAL_MODEL,
+            workers=settings.EMBEDDING_LOCAL_WORKERS,
+            device=settings.EMBEDDING_LOCAL_DEVICE,
+            threads_per_worker=settings.EMBEDDING_LOCAL_THREADS,
+        )
+    if name == "hashing":
+        return HashingEmbeddingBackend(dimensions=settings.EMBEDDING_HASHING_DIMENSIONS)
+    raise ValueError(
+        f"Unknown EMBEDDING_BACKEND {settings.EMBEDDING_BACKEND!r} "
+        f"(expected one of {', '.join(BACKENDS)})"
+    )
@@ -0,0 +1,162 @@
+"""Persistent, content-addressed cache for text embeddings.
+
+Vectors are keyed by ``(model, dimensions, sha256(text))`` so a cached
+entry can never be served for a different model or output size.  The
+store is a single SQLite file holding each vector as packed float32
+bytes, read back with ``np.frombuffer`` (no per-float Python objects).
+
+The cache is size-capped: once it holds more than *max_entries* rows the
+least-recently-used entries are evicted.  Hit / miss / eviction counters
+are kept in-process and exposed via ``stats()``.
+
+All methods are synchronous and thread-safe; ``EmbeddingService`` calls
+them from the default executor so SQLite I/O never blocks the event loop.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from typing import Any
+
+import numpy as np
+
+from app.services.sqlite_cache import SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of host parameters per statement (999 on older
+# builds); lookups are chunked to stay well under that.
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model       TEXT    NOT NULL,
+    dimensions  INTEGER NOT NULL,
+    text_hash   TEXT    NOT NULL,
+    vector      BLOB    NOT NULL,
+    last_used   REAL    NOT NULL,
+    PRIMARY KEY (model, dimensions, text_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def text_hash(text: str) -> str:
+    """Return the hex SHA-256 digest used as the cache key for *text*."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _unpack(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class EmbeddingCache(SQLiteLRUCache):
+    """SQLite-backed LRU cache of embedding vectors.
+
+    Parameters
+    ----------
+    path:
+        Filesystem path of the SQLite database.  Parent directories are
+        created if needed.
+    max_entries:
+        Maximum number of vectors kept across all models.  ``0`` disables
+        the cap.
+    """
+
+    _table = "embeddings"
+    _schema = _SCHEMA
+    _label = "Embedding cache"
+
+    def __init__(
+        self, path: str = "./cache/embeddings.sqlite3", max_entries: int = 200_000
+    ) -> None:
+        super().__init__(path, max_entries)
+        logger.info("Embedding cache opened at %s (max %d entries)", self._path, max_entries)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(
+        self,
+        model: str,
+        dimensions: int | None,
+        hashes: list[str],
+    ) -> dict[str, np.ndarray]:
+        """Return cached float32 vectors for *hashes* as ``{hash: vector}``.
+
+        Missing hashes are simply absent from the result.  Hits have their
+        ``last_used`` timestamp refreshed so they survive eviction.
+        """
+        if not hashes:
+            return {}
+
+        dims = dimensions or 0
+        unique = list(dict.fromkeys(hashes))
+        found: dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                part = unique[start : start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimensions = ? AND text_hash IN ({placeholders})",
+                    (model, dims, *part),
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = _unpack(blob)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? "
+                    "WHERE model = ? AND dimensions = ? AND text_hash = ?",
+                    [(now, model, dims, h) for h in found],
+                )
+                self._conn.commit()
+
+            hits = sum(1 for h in hashes if h in found)
+            self._stats.hits += hits
+            self._stats.misses += len(hashes) - hits
+
+        return found
+
+    def put_many(
+        self,
+        model: str,
+        dimensions: int | None,
+        items: list[tuple[str, np.ndarray]],
+    ) -> None:
+        """Store ``(hash, vector)`` pairs, then evict down to the size cap."""
+        if not items:
+            return
+
+        dims = dimensions or 0
+        now = time.time()
+        rows = [(model, dims, h, _pack(vec), now) for h, vec in items if len(vec)]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, dimensions, text_hash, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit / miss / eviction counters and the current entry count."""
+        with self._lock:
+            return {
+                "path": str(self._path),
+                "entries": self._count_locked(),
+                "max_entries": self._max_size,
+                **self._stats.as_dict(),
+            }
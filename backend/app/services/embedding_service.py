@@ -1,19 +1,50 @@
-"""Embedding generation service using OpenAI text-embedding models.
+"""Embedding generation service (OpenAI by default, pluggable backends).
 
 Provides both single-text and batched embedding generation with automatic
-chunking to stay within OpenAI's per-request input limits.  All heavy I/O
-is async-safe — the synchronous OpenAI SDK call is dispatched to a thread
-pool so it never blocks the event loop.
+chunking to stay within OpenAI's per-request input limits.  The actual
+vectors come from an ``EmbeddingBackend`` (see ``embedding_backends``):
+the native ``AsyncOpenAI`` client — optionally on the process-wide shared
+``httpx.AsyncClient`` — a local sentence-transformers process pool, or a
+deterministic hashing stand-in for offline runs.
+
+Batches are sized by an estimated token count rather than a fixed number
+of texts, and several batches are kept in flight at once under a
+requests-per-minute / tokens-per-minute budget (remote backends only).
+A 429 response pauses every in-flight batch for the server's
+``retry-after`` hint before retrying.  Results are always returned in
+input order.
+
+Bulk callers should use ``embed_matrix``, which returns one contiguous
+2-D NumPy matrix (``float32`` or ``float16``) instead of a list of Python
+float lists — roughly 8x less memory per 3 072-dim vector.
+``embed_batch`` remains for callers that need plain lists.
+
+Exact duplicate texts within one call are embedded once and fanned back
+out to every position.  When an ``EmbeddingCache`` is
+supplied, vectors are looked up by ``(model_id, dimensions, sha256(text))``
+first and only cache misses are sent to the API.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
+import random
+import time
+from collections import deque
 from functools import partial
 from typing import Any
 
-from openai import OpenAI
+import httpx
+import numpy as np
+from openai import RateLimitError
+
+from app.services.embedding_backends import (
+    EmbeddingBackend,
+    OpenAIEmbeddingBackend,
+    build_embedding_backend,
+)
+from app.services.embedding_cache import EmbeddingCache, text_hash
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +53,89 @@ logger = logging.getLogger(__name__)
 _DEFAULT_BATCH_SIZE = 100
 _MAX_RETRIES = 3
 
+# OpenAI caps a single embeddings request at 300k tokens; stay well under
+# it because ``_estimate_tokens`` is only an approximation.
+_DEFAULT_MAX_BATCH_TOKENS = 100_000
+# Financial text is number-heavy, so assume ~3 chars/token rather than 4.
+_CHARS_PER_TOKEN = 3
+_BACKOFF_BASE = 1.0  # seconds, doubled per attempt when no retry-after hint
+_BACKOFF_MAX = 60.0
+
+_DTYPES = {"float32": np.float32, "float16": np.float16}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap upper-bound token estimate (no tokenizer dependency)."""
+    return max(1, len(text) // _CHARS_PER_TOKEN)
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Extract the ``retry-after`` hint from an OpenAI error response."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class _RateLimiter:
+    """Sliding 60-second window over requests and tokens.
+
+    ``acquire`` waits until one more request of *tokens* fits inside both
+    budgets.  ``pause`` blocks every caller until a deadline — used when
+    the server answers 429 so all in-flight batches back off together.
+    A limit of ``0`` disables that budget.
+    """
+
+    _WINDOW = 60.0
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        self._rpm = requests_per_minute
+        self._tpm = tokens_per_minute
+        self._events: deque[tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                while self._events and now - self._events[0][0] >= self._WINDOW:
+                    _, used = self._events.popleft()
+                    self._tokens_in_window -= used
+
+                fits_requests = self._rpm <= 0 or len(self._events) < self._rpm
+                # A single oversized batch is allowed through an empty window
+                fits_tokens = (
+                    self._tpm <= 0
+                    or not self._events
+                    or self._tokens_in_window + tokens <= self._tpm
+                )
+                if fits_requests and fits_tokens:
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+
+                await asyncio.sleep(max(self._WINDOW - (now - self._events[0][0]), 0.05))
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
 
 class EmbeddingService:
-    """Generate text embeddings via the OpenAI API.
+    """Generate text embeddings via a pluggable backend (OpenAI by default).
 
     Parameters
     ----------
@@ -36,6 +147,24 @@ class EmbeddingService:
     dimensions:
         Optional output dimensionality override supported by v3 models.
         *None* keeps the model's native dimension (1 536 for ``-small``).
+    dtype:
+        ``"float32"`` (default) or ``"float16"`` — element type of the
+        matrices returned by ``embed_matrix``.
+    cache:
+        Optional persistent ``EmbeddingCache``.  *None* disables caching.
+    max_concurrency:
+        Maximum number of embedding requests in flight at once.
+    requests_per_minute / tokens_per_minute:
+        Client-side budget matching the account's rate-limit tier.
+        ``0`` disables the corresponding limit.
+    max_batch_tokens:
+        Estimated-token ceiling for a single request.
+    http_client:
+        Shared ``httpx.AsyncClient`` (connection pool).  *None* lets the
+        OpenAI SDK create its own.
+    backend:
+        Explicit ``EmbeddingBackend``.  *None* builds an OpenAI backend
+        from *model*, *api_key*, *dimensions* and *http_client*.
     """
 
     def __init__(
@@ -43,10 +172,60 @@ class EmbeddingService:
         model: str = "text-embedding-3-small",
         api_key: str | None = None,
         dimensions: int | None = None,
+        cache: EmbeddingCache | None = None,
+        *,
+        dtype: str = "float32",
+        max_concurrency: int = 4,
+        requests_per_minute: int = 3_000,
+        tokens_per_minute: int = 1_000_000,
+        max_batch_tokens: int = _DEFAULT_MAX_BATCH_TOKENS,
+        http_client: httpx.AsyncClient | None = None,
+        backend: EmbeddingBackend | None = None,
     ) -> None:
-        self._model = model
-        self._dimensions = dimensions
-        self._client = OpenAI(api_key=api_key) if api_key else OpenAI()
+        if backend is None:
+            backend = OpenAIEmbeddingBackend(
+                model=model,
+                api_key=api_key,
+                dimensions=dimensions,
+                http_client=http_client,
+            )
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported embedding dtype {dtype!r} (use float32 or float16)")
+        self._backend = backend
+        self._model = backend.model_id
+        self._dimensions = backend.dimensions
+        self._dtype = _DTYPES[dtype]
+        self._cache = cache
+        self._max_concurrency = max(1, max_concurrency)
+        self._max_batch_tokens = max_batch_tokens
+        self._limiter = _RateLimiter(requests_per_minute, tokens_per_minute)
+
+        self._dedup_saved_inputs = 0
+        self._dedup_saved_requests = 0
+        self._dedup_saved_tokens = 0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Any,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> EmbeddingService:
+        """Build a service (backend and optional cache) from application ``Settings``."""
+        cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            cache = EmbeddingCache(
+                path=settings.EMBEDDING_CACHE_PATH,
+                max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        return cls(
+            cache=cache,
+            dtype=settings.EMBEDDING_DTYPE,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+            requests_per_minute=settings.EMBEDDING_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.EMBEDDING_TOKENS_PER_MINUTE,
+            max_batch_tokens=settings.EMBEDDING_MAX_BATCH_TOKENS,
+            backend=build_embedding_backend(settings, http_client=http_client),
+        )
 
     # ------------------------------------------------------------------
     # Public API
@@ -76,7 +255,8 @@ class EmbeddingService:
         texts:
             Texts to embed (order is preserved).
         batch_size:
-            Number of texts per API call (max 2 048).
+            Maximum number of texts per API call (max 2 048).  Batches
+            are also cut at ``max_batch_tokens`` estimated tokens.
 
         Returns
         -------
@@ -85,28 +265,119 @@ class EmbeddingService:
         """
         if not texts:
             return []
+        return (await self.embed_matrix(texts, batch_size)).tolist()
+
+    async def embed_matrix(
+        self,
+        texts: list[str],
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+    ) -> np.ndarray:
+        """Generate embeddings for *texts* as one contiguous 2-D matrix.
+
+        Parameters
+        ----------
+        texts:
+            Texts to embed (order is preserved).
+        batch_size:
+            Maximum number of texts per API call (max 2 048).  Batches
+            are also cut at ``max_batch_tokens`` estimated tokens.
+
+        Returns
+        -------
+        np.ndarray
+            ``(len(texts), dim)`` matrix of the configured dtype; row *i*
+            is the embedding of ``texts[i]``.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=self._dtype)
 
         # Sanitise — OpenAI rejects empty strings
         sanitised = [t if t and t.strip() else " " for t in texts]
 
-        all_embeddings: list[list[float]] = []
+        # Collapse exact duplicates (page headers, boilerplate notes, tables
+        # repeated across standalone / consolidated statements)
+        first_seen: dict[str, int] = {}
+        inverse = np.fromiter(
+            (first_seen.setdefault(t, len(first_seen)) for t in sanitised),
+            dtype=np.intp,
+            count=len(sanitised),
+        )
+        unique = list(first_seen)
+        if len(unique) < len(sanitised):
+            self._record_dedup(sanitised, unique, batch_size)
+
+        matrix = await self._embed_unique(unique, batch_size)
+        if len(unique) < len(sanitised):
+            matrix = matrix[inverse]
+        return matrix.astype(self._dtype, copy=False)
+
+    async def _embed_unique(
+        self,
+        texts: list[str],
+        batch_size: int,
+    ) -> np.ndarray:
+        """Embed distinct *texts*, serving cache hits and sending only misses."""
+        if self._cache is None:
+            return await self._embed_uncached(texts, batch_size)
+
         loop = asyncio.get_running_loop()
+        hashes = [text_hash(t) for t in texts]
+        cached = await loop.run_in_executor(
+            None,
+            partial(self._cache.get_many, self._model, self._dimensions, hashes),
+        )
 
-        for start in range(0, len(sanitised), batch_size):
-            batch = sanitised[start : start + batch_size]
-            logger.debug(
-                "Embedding batch %d–%d of %d",
-                start,
-                start + len(batch),
-                len(sanitised),
-            )
-            batch_embeddings = await loop.run_in_executor(
-                None,
-                partial(self._embed_sync, batch),
-            )
-            all_embeddings.extend(batch_embeddings)
+        miss_idx = [i for i, h in enumerate(hashes) if h not in cached]
+        logger.debug(
+            "Embedding cache: %d hits, %d misses of %d texts",
+            len(texts) - len(miss_idx),
+            len(miss_idx),
+            len(texts),
+        )
+        if not miss_idx:
+            return np.stack([cached[h] for h in hashes])
+
+        fresh = await self._embed_uncached([texts[i] for i in miss_idx], batch_size)
+        await loop.run_in_executor(
+            None,
+            partial(
+                self._cache.put_many,
+                self._model,
+                self._dimensions,
+                [(hashes[i], fresh[row]) for row, i in enumerate(miss_idx)],
+            ),
+        )
+        if len(miss_idx) == len(texts):
+            return fresh
+
+        matrix = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+        matrix[miss_idx] = fresh
+        for i, h in enumerate(hashes):
+            if h in cached:
+                matrix[i] = cached[h]
+        return matrix
 
-        return all_embeddings
+    def _record_dedup(self, texts: list[str], unique: list[str], batch_size: int) -> None:
+        """Account for the requests / tokens saved by in-call deduplication."""
+        saved_inputs = len(texts) - len(unique)
+        saved_tokens = sum(_estimate_tokens(t) for t in texts) - sum(
+            _estimate_tokens(t) for t in unique
+        )
+        saved_requests = len(self._plan_batches(texts, batch_size)) - len(
+            self._plan_batches(unique, batch_size)
+        )
+
+        self._dedup_saved_inputs += saved_inputs
+        self._dedup_saved_tokens += saved_tokens
+        self._dedup_saved_requests += saved_requests
+
+        logger.info(
+            "Embedding dedup: %d → %d texts (saved %d requests, ~%d tokens)",
+            len(texts),
+            len(unique),
+            saved_requests,
+            saved_tokens,
+        )
 
     # ------------------------------------------------------------------
     # Convenience
@@ -114,32 +385,108 @@ class EmbeddingService:
 
     @property
     def model(self) -> str:
-        """Return the model identifier in use."""
+        """Return the backend's model identifier (also the cache key)."""
         return self._model
 
+    def stats(self) -> dict[str, Any]:
+        """Return cache counters (*None* when caching is off) and dedup savings."""
+        return {
+            "cache": self._cache.stats() if self._cache is not None else None,
+            "dedup": {
+                "saved_inputs": self._dedup_saved_inputs,
+                "saved_requests": self._dedup_saved_requests,
+                "saved_tokens_estimate": self._dedup_saved_tokens,
+            },
+        }
+
+    def close(self) -> None:
+        """Release the backend and the embedding cache, if any."""
+        self._backend.close()
+        if self._cache is not None:
+            self._cache.close()
+
     # ------------------------------------------------------------------
-    # Internal — synchronous SDK call (run in thread)
+    # Internal — batched API dispatch
     # ------------------------------------------------------------------
 
-    def _embed_sync(self, texts: list[str]) -> list[list[float]]:
-        """Blocking call to the OpenAI embeddings endpoint."""
-        kwargs: dict[str, Any] = {"input": texts, "model": self._model}
-        if self._dimensions is not None:
-            kwargs["dimensions"] = self._dimensions
+    async def _embed_uncached(
+        self,
+        texts: list[str],
+        batch_size: int,
+    ) -> np.ndarray:
+        """Embed *texts* via the backend with bounded-concurrency batch dispatch."""
+        batches = self._plan_batches(texts, batch_size)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results: list[np.ndarray | None] = [None for _ in batches]
+
+        async def _run(slot: int, start: int, end: int, tokens: int) -> None:
+            async with semaphore:
+                logger.debug(
+                    "Embedding batch %d–%d of %d (~%d tokens)",
+                    start,
+                    end,
+                    len(texts),
+                    tokens,
+                )
+                results[slot] = await self._embed_with_retry(texts[start:end], tokens)
+
+        await asyncio.gather(
+            *(_run(slot, *batch) for slot, batch in enumerate(batches))
+        )
+
+        if len(results) == 1:
+            return results[0]  # type: ignore[return-value]
+        return np.concatenate(results)  # type: ignore[arg-type]
+
+    def _plan_batches(
+        self,
+        texts: list[str],
+        batch_size: int,
+    ) -> list[tuple[int, int, int]]:
+        """Split *texts* into contiguous ``(start, end, est_tokens)`` batches."""
+        batches: list[tuple[int, int, int]] = []
+        start = 0
+        tokens = 0
+        for idx, text in enumerate(texts):
+            cost = _estimate_tokens(text)
+            full = idx - start >= batch_size or tokens + cost > self._max_batch_tokens
+            if idx > start and full:
+                batches.append((start, idx, tokens))
+                start, tokens = idx, 0
+            tokens += cost
+        if start < len(texts):
+            batches.append((start, len(texts), tokens))
+        return batches
 
+    async def _embed_with_retry(self, texts: list[str], tokens: int) -> np.ndarray:
+        """Send one batch, backing off on 429 and transient failures."""
         for attempt in range(1, _MAX_RETRIES + 1):
+            if self._backend.rate_limited:
+                await self._limiter.acquire(tokens)
             try:
-                response = self._client.embeddings.create(**kwargs)
-                # API returns items in the *same* order as input
-                return [item.embedding for item in response.data]
-            except Exception:
+                return await self._backend.embed(texts)
+            except Exception as exc:
                 if attempt == _MAX_RETRIES:
                     logger.exception(
-                        "OpenAI embeddings call failed after %d attempts", _MAX_RETRIES
+                        "Embeddings call (%s) failed after %d attempts",
+                        self._model,
+                        _MAX_RETRIES,
                     )
                     raise
+
+                delay = min(_BACKOFF_BASE * 2 ** (attempt - 1), _BACKOFF_MAX)
+                if isinstance(exc, RateLimitError):
+                    delay = _retry_after_seconds(exc) or delay
+                    self._limiter.pause(delay)
+                delay += random.uniform(0, delay * 0.1)
+
                 logger.warning(
-                    "Embeddings attempt %d/%d failed — retrying",
+                    "Embeddings attempt %d/%d failed (%s) — retrying in %.1fs",
                     attempt,
                     _MAX_RETRIES,
+                    type(exc).__name__,
+                    delay,
                 )
+                await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable — the final attempt either returns or raises")
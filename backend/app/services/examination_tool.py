@@ -17,11 +17,22 @@ import re
 from datetime import datetime, timezone
 from typing import Any
 
+import httpx
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
+# Fields of ``documents`` records used by the profile / timeline views
+_DOC_SUMMARY_PROJECTION = {
+    "filename": 1,
+    "status": 1,
+    "metadata": 1,
+    "total_pages": 1,
+    "elements_count": 1,
+    "created_at": 1,
+}
+
 
 class ExaminationTool:
     """Preliminary examination service for NFRA investigations.
@@ -38,6 +49,8 @@ class ExaminationTool:
         OpenAI API key.
     model:
         LLM model (default gpt-4o).
+    http_client:
+        Shared ``httpx.AsyncClient`` connection pool (optional).
     """
 
     def __init__(
@@ -47,6 +60,7 @@ class ExaminationTool:
         embedding_service: Any,
         api_key: str = "",
         model: str = "gpt-4o",
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
         self._mongo = mongo_service
         self._vs = vector_store
@@ -56,6 +70,7 @@ class ExaminationTool:
             temperature=0.15,
             api_key=api_key,
             max_tokens=4096,
+            http_async_client=http_client,
         )
 
     # ── Public API ─────────────────────────────────────────────────
@@ -66,6 +81,7 @@ class ExaminationTool:
             "documents",
             query={},
             limit=100,
+            projection=_DOC_SUMMARY_PROJECTION,
         )
 
         matching_docs = [
@@ -126,10 +142,10 @@ class ExaminationTool:
     ) -> dict[str, Any]:
         """Generate a risk dashboard for a document or all documents."""
         if document_id:
-            docs = [await self._mongo.find_by_id("documents", document_id)]
+            docs = [await self._mongo.find_by_id("documents", document_id, {"_id": 1})]
             docs = [d for d in docs if d]
         else:
-            docs = await self._mongo.find_many("documents", limit=50)
+            docs = await self._mongo.find_many("documents", limit=50, projection={"_id": 1})
 
         if not docs:
             return {
@@ -234,7 +250,11 @@ class ExaminationTool:
             query = {}
 
         docs = await self._mongo.find_many(
-            "documents", query, limit=100, sort=[("created_at", 1)]
+            "documents",
+            query,
+            limit=100,
+            sort=[("created_at", 1)],
+            projection=_DOC_SUMMARY_PROJECTION,
         )
         for d in docs:
             if company_name and company_name.lower() not in d.get("filename", "").lower():
@@ -0,0 +1,115 @@
+"""Process-wide async HTTP transport shared by every OpenAI client.
+
+One ``httpx.AsyncClient`` is created in the FastAPI lifespan and injected
+into ``EmbeddingService`` (``AsyncOpenAI``) and every LangChain
+``ChatOpenAI`` instance, so chat, compliance and ingest traffic share a
+single keep-alive connection pool instead of one pool per client.
+
+HTTP/2 is enabled when the optional ``h2`` package is installed
+(``httpx[http2]``); otherwise the client falls back to HTTP/1.1.  On top
+of httpx's global pool limits, ``_HostLimitedTransport`` caps the number
+of concurrent requests per host so one busy upstream cannot starve the
+others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Wrap a transport with a per-host in-flight request cap."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, per_host: int) -> None:
+        self._inner = inner
+        self._per_host = per_host
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self._per_host)
+            self._semaphores[host] = sem
+        return sem
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        sem = self._semaphore(request.url.host)
+        await sem.acquire()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException:
+            sem.release()
+            raise
+
+        if response.is_closed:
+            # Body was fully buffered by the inner transport
+            sem.release()
+            return response
+
+        # Hold the slot until the body is consumed (streamed or read)
+        response.stream = _ReleasingStream(response.stream, sem)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that releases a semaphore slot exactly once on close."""
+
+    def __init__(self, inner: Any, sem: asyncio.Semaphore) -> None:
+        self._inner = inner
+        self._sem = sem
+        self._released = False
+
+    async def __aiter__(self):  # type: ignore[override]
+        async for chunk in self._inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._inner.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._sem.release()
+
+
+def build_async_http_client(settings: Any) -> httpx.AsyncClient:
+    """Create the shared ``httpx.AsyncClient`` from application ``Settings``."""
+    http2 = settings.HTTP2_ENABLED
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("h2 package not installed — shared HTTP client falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=limits,
+    )
+    if settings.HTTP_PER_HOST_CONCURRENCY > 0:
+        transport = _HostLimitedTransport(transport, settings.HTTP_PER_HOST_CONCURRENCY)
+
+    logger.info(
+        "Shared HTTP client: http2=%s, max_connections=%d, keepalive=%d, per_host=%d",
+        http2,
+        settings.HTTP_MAX_CONNECTIONS,
+        settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        settings.HTTP_PER_HOST_CONCURRENCY,
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=10.0),
+        follow_redirects=True,
+    )
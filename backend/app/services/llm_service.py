@@ -14,6 +14,7 @@ import logging
 import re
 from typing import Any
 
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
@@ -102,7 +103,11 @@ _CHAT_SYSTEM = (
 
 
 class LLMService:
-    """Wraps LangChain ChatOpenAI for compliance, summarisation, and chat."""
+    """Wraps LangChain ChatOpenAI for compliance, summarisation, and chat.
+
+    Pass the process-wide ``httpx.AsyncClient`` as *http_client* to share
+    its connection pool with the other OpenAI clients.
+    """
 
     def __init__(
         self,
@@ -110,6 +115,7 @@ class LLMService:
         api_key: str | None = None,
         temperature: float = 0.1,
         max_tokens: int = 8192,
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
         kwargs: dict[str, Any] = {
             "model": model,
@@ -118,6 +124,8 @@ class LLMService:
         }
         if api_key:
             kwargs["api_key"] = api_key
+        if http_client is not None:
+            kwargs["http_async_client"] = http_client
         self._llm = ChatOpenAI(**kwargs)
         self._model = model
 
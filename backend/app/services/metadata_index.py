@@ -0,0 +1,223 @@
+"""Secondary metadata index for where-filtered vector search.
+
+Both vector store backends index the metadata fields declared in
+``COLLECTIONS`` (plus ``document_id``, ``source_file``, ``page_number``,
+``element_type`` and ``framework``) so that a ``where`` filter resolves to
+its partition before any vector is scored:
+
+- ``value_predicate`` turns a ChromaDB-style field condition
+  (``"IndAS"``, ``{"$in": [...]}``, ``{"$contains": "annual"}``, ...) into a
+  Python predicate.  Filters are evaluated once per *distinct value* of a
+  field, never per row; equality and ``$in`` conditions (``exact_values``)
+  are plain lookups.
+- ``ValueIndex`` keeps the distinct values of each indexed field with
+  their row counts.  The ChromaDB backend uses it to rewrite a filter into
+  exact ``$in`` lists ChromaDB pre-filters natively (``$contains`` on
+  metadata, which ChromaDB rejects, included) and to answer empty
+  partitions without a query.
+- ``WriteMarkers`` keeps a per-collection write counter in a SQLite file
+  shared by every process writing to the store.  A ``ValueIndex`` records
+  the marker it was built under, so writes from another uvicorn worker or
+  indexing script make it stale even when the row count is unchanged.
+
+The NumPy backend keeps row-level postings per value on top of the same
+predicates (see ``numpy_vector_store._Column``).
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from functools import partial
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda v, x: v == x,
+    "$ne": lambda v, x: v != x,
+    "$gt": lambda v, x: v > x,
+    "$gte": lambda v, x: v >= x,
+    "$lt": lambda v, x: v < x,
+    "$lte": lambda v, x: v <= x,
+    "$in": lambda v, x: v in x,
+    "$nin": lambda v, x: v not in x,
+    "$contains": lambda v, x: isinstance(v, str) and str(x) in v,
+}
+
+
+def value_predicate(condition: Any) -> Callable[[Any], bool]:
+    """Build a value predicate from a ChromaDB-style field condition."""
+    if not isinstance(condition, dict):
+        return lambda v: v == condition
+    checks = []
+    for op, operand in condition.items():
+        fn = _OPERATORS.get(op)
+        if fn is None:
+            raise ValueError(f"Unsupported where operator {op!r}")
+        checks.append(partial(lambda f, x, v: f(v, x), fn, operand))
+    return lambda v: all(check(v) for check in checks)
+
+
+def exact_values(condition: Any) -> list[Any] | None:
+    """Values an equality / ``$in`` condition selects, else ``None``.
+
+    Lets indexes answer the common ``{"document_id": ...}`` filters by
+    lookup instead of testing every distinct value.
+    """
+    if not isinstance(condition, dict):
+        return [condition]
+    if len(condition) == 1:
+        op, operand = next(iter(condition.items()))
+        if op == "$eq":
+            return [operand]
+        if op == "$in" and isinstance(operand, (list, tuple, set)):
+            return list(operand)
+    return None
+
+
+def matches(predicate: Callable[[Any], bool], value: Any) -> bool:
+    """``predicate(value)``, treating type errors (``"$gt"`` str vs int) as no match."""
+    try:
+        return bool(predicate(value))
+    except TypeError:
+        return False
+
+
+class ValueIndex:
+    """Distinct values (with row counts) of the indexed fields of one collection.
+
+    Parameters
+    ----------
+    fields:
+        Metadata fields to index.
+    generation:
+        ``WriteMarkers`` value of the collection the index reflects.
+    """
+
+    def __init__(self, fields: tuple[str, ...], generation: int = 0) -> None:
+        self.fields = fields
+        self.generation = generation
+        self.size = 0
+        self._counts: dict[str, Counter] = {f: Counter() for f in fields}
+
+    def add(self, metadatas: list[dict[str, Any] | None]) -> None:
+        """Account for newly stored rows."""
+        for meta in metadatas:
+            meta = meta or {}
+            for field, counts in self._counts.items():
+                value = meta.get(field)
+                if value is not None:
+                    counts[value] += 1
+        self.size += len(metadatas)
+
+    def remove(self, metadatas: list[dict[str, Any] | None]) -> None:
+        """Account for deleted rows."""
+        for meta in metadatas:
+            meta = meta or {}
+            for field, counts in self._counts.items():
+                value = meta.get(field)
+                if value is not None and counts[value] > 0:
+                    counts[value] -= 1
+                    if not counts[value]:
+                        del counts[value]
+        self.size = max(0, self.size - len(metadatas))
+
+    def rewrite(self, where: dict[str, Any]) -> tuple[dict[str, Any] | None, int]:
+        """Resolve indexed conditions of *where* to exact ``$in`` lists.
+
+        Returns ``(native_where, bound)``.  *native_where* only uses
+        operators ChromaDB evaluates natively on indexed fields
+        (non-indexed conditions pass through unchanged); it is ``None``
+        when the filter matches nothing.  *bound* is an upper bound on the
+        number of matching rows.
+        """
+        clauses: list[dict[str, Any]] = []
+        bound = self.size
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self.rewrite(clause) for clause in condition]
+                if key == "$and":
+                    if any(native is None for native, _ in parts):
+                        return None, 0
+                    part_bound = min((b for _, b in parts), default=self.size)
+                else:
+                    parts = [(native, b) for native, b in parts if native is not None]
+                    if not parts:
+                        return None, 0
+                    part_bound = sum(b for _, b in parts)
+                    if any(native == {} for native, _ in parts):
+                        parts = []  # one branch matches everything
+                natives = [native for native, _ in parts if native]
+                if natives:
+                    clauses.append(natives[0] if len(natives) == 1 else {key: natives})
+            elif key in self._counts:
+                counts = self._counts[key]
+                values = exact_values(condition)
+                if values is not None:
+                    values = [v for v in dict.fromkeys(values) if v in counts]
+                else:
+                    predicate = value_predicate(condition)
+                    values = [v for v in counts if matches(predicate, v)]
+                if not values:
+                    return None, 0
+                clauses.append({key: values[0] if len(values) == 1 else {"$in": values}})
+                part_bound = sum(self._counts[key][v] for v in values)
+            else:
+                clauses.append({key: condition})
+                part_bound = self.size
+            bound = min(bound, part_bound)
+
+        if not clauses:
+            return {}, bound
+        return (clauses[0] if len(clauses) == 1 else {"$and": clauses}), bound
+
+
+class WriteMarkers:
+    """Per-collection write counters shared by every process on the host.
+
+    Parameters
+    ----------
+    path:
+        Filesystem path of the SQLite database (WAL mode, so readers in
+        other processes never block on a writer).
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS markers ("
+            "collection TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def current(self, collection: str) -> int:
+        """Current marker of *collection* (``0`` before its first write)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM markers WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, collection: str) -> int:
+        """Record a write to *collection* and return its new marker."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO markers (collection, generation) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET generation = generation + 1",
+                (collection,),
+            )
+            (generation,) = self._conn.execute(
+                "SELECT generation FROM markers WHERE collection = ?", (collection,)
+            ).fetchone()
+            self._conn.commit()
+        return generation
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -3,19 +3,40 @@
 Provides a thin wrapper around ``AsyncIOMotorDatabase`` with convenience
 methods for insert / find / update / delete / count — plus ``ObjectId``
 serialisation so callers always work with plain ``str`` ids.
+
+``insert_many`` sends large writes as unordered batches of
+``bulk_batch_size`` documents, one round trip per batch instead of one
+per document.
+
+A document's extracted elements and tables live in their own
+collections (``document_elements`` / ``document_tables``, one record per
+element or table, zstd block-compressed) rather than inside its
+``documents`` record, which stays small and well under Mongo's 16 MB
+limit.  Load them on demand with ``document_elements`` /
+``document_tables``; records ingested before the split still carry them
+inline and are read transparently.
 """
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from datetime import datetime, timezone
 from typing import Any
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
 
 logger = logging.getLogger(__name__)
 
+ELEMENTS_COLLECTION = "document_elements"
+TABLES_COLLECTION = "document_tables"
+
+# Element / table records are large, rarely-updated text — compress harder
+# than WiredTiger's default snappy
+_CONTENT_STORAGE = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+
 
 def _serialize_id(doc: dict[str, Any]) -> dict[str, Any]:
     """Convert ``_id: ObjectId(...)`` → ``_id: str(...)`` in‑place."""
@@ -32,13 +53,24 @@ class MongoService:
     db:
         A ``motor.motor_asyncio.AsyncIOMotorDatabase`` instance, typically
         set up during the FastAPI lifespan and attached to ``app.state.db``.
+    bulk_batch_size:
+        Default number of documents per ``insert_many`` round trip.
     """
 
-    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+    def __init__(self, db: AsyncIOMotorDatabase, bulk_batch_size: int = 1000) -> None:
         self._db = db
+        self.bulk_batch_size = max(1, bulk_batch_size)
 
     async def ensure_indexes(self) -> None:
         """Create indexes for frequently queried fields to speed up reads."""
+        try:
+            existing = set(await self._db.list_collection_names())
+            for name in (ELEMENTS_COLLECTION, TABLES_COLLECTION):
+                if name not in existing:
+                    await self._db.create_collection(name, storageEngine=_CONTENT_STORAGE)
+        except Exception:
+            logger.warning("Failed to create compressed content collections", exc_info=True)
+
         try:
             await self._db["documents"].create_index("status")
             await self._db["documents"].create_index("created_at")
@@ -49,6 +81,11 @@ class MongoService:
             await self._db["chat_sessions"].create_index("session_id", unique=True)
             await self._db["chat_sessions"].create_index("updated_at")
             await self._db["compliance_progress"].create_index("job_id", unique=True)
+            await self._db["document_chunks"].create_index(
+                [("document_id", 1), ("chunk_index", 1)]
+            )
+            for name in (ELEMENTS_COLLECTION, TABLES_COLLECTION):
+                await self._db[name].create_index([("document_id", 1), ("seq", 1)])
             logger.info("MongoDB indexes ensured")
         except Exception:
             logger.warning("Failed to create some MongoDB indexes", exc_info=True)
@@ -71,24 +108,87 @@ class MongoService:
         logger.debug("Inserted doc %s into %s", doc_id, collection)
         return doc_id
 
+    async def insert_many(
+        self,
+        collection: str,
+        docs: Sequence[dict[str, Any]],
+        batch_size: int | None = None,
+    ) -> int:
+        """Insert *docs* in unordered batches and return the number inserted.
+
+        Stamps ``created_at`` / ``updated_at`` like ``insert_document``, on
+        copies: the caller's dicts (including their ``_id``) are left alone.
+        Unordered batches let the server apply each batch in parallel and
+        keep going past a failed document, and a failed batch does not stop
+        the later ones.  If any document failed, a ``BulkWriteError`` is
+        raised once every batch is done; its ``details`` hold the total
+        ``nInserted`` and every ``writeErrors`` entry, indexed into *docs*.
+        """
+        size = batch_size or self.bulk_batch_size
+        now = datetime.now(timezone.utc)
+        inserted = 0
+        write_errors: list[dict[str, Any]] = []
+        concern_errors: list[dict[str, Any]] = []
+        for start in range(0, len(docs), size):
+            batch = [
+                {"created_at": now, "updated_at": now, **data}
+                for data in docs[start : start + size]
+            ]
+            try:
+                result = await self._db[collection].insert_many(batch, ordered=False)
+            except BulkWriteError as exc:
+                inserted += exc.details.get("nInserted", 0)
+                write_errors.extend(
+                    {**error, "index": start + error["index"]}
+                    for error in exc.details.get("writeErrors", [])
+                )
+                concern_errors.extend(exc.details.get("writeConcernErrors", []))
+            else:
+                inserted += len(result.inserted_ids)
+        if write_errors or concern_errors:
+            logger.error(
+                "Inserted %d of %d docs into %s; %d failed",
+                inserted, len(docs), collection, len(write_errors),
+            )
+            raise BulkWriteError({
+                "writeErrors": write_errors,
+                "writeConcernErrors": concern_errors,
+                "nInserted": inserted,
+                "nUpserted": 0,
+                "nMatched": 0,
+                "nModified": 0,
+                "nRemoved": 0,
+                "upserted": [],
+            })
+        logger.debug("Inserted %d docs into %s", inserted, collection)
+        return inserted
+
     # ------------------------------------------------------------------
     # Find
     # ------------------------------------------------------------------
 
     async def find_one(
-        self, collection: str, query: dict[str, Any]
+        self,
+        collection: str,
+        query: dict[str, Any],
+        projection: dict[str, int] | None = None,
     ) -> dict[str, Any] | None:
         """Return a single document matching *query*, or ``None``."""
-        doc = await self._db[collection].find_one(query)
+        doc = await self._db[collection].find_one(query, projection)
         return _serialize_id(doc) if doc else None
 
-    async def find_by_id(self, collection: str, doc_id: str) -> dict[str, Any] | None:
+    async def find_by_id(
+        self,
+        collection: str,
+        doc_id: str,
+        projection: dict[str, int] | None = None,
+    ) -> dict[str, Any] | None:
         """Shortcut — find by ``_id`` accepting either ``str`` or ``ObjectId``."""
         try:
             oid = ObjectId(doc_id)
         except Exception:
             oid = doc_id  # type: ignore[assignment]
-        return await self.find_one(collection, {"_id": oid})
+        return await self.find_one(collection, {"_id": oid}, projection)
 
     async def find_many(
         self,
@@ -160,10 +260,99 @@ class MongoService:
         return await self.delete_one(collection, {"_id": oid})
 
     async def delete_many(self, collection: str, query: dict[str, Any]) -> int:
-        """Delete all matching documents.  Returns count of removed docs."""
+        """Delete all matching documents in one round trip.  Returns count of removed docs."""
         result = await self._db[collection].delete_many(query)
         return result.deleted_count
 
+    # ------------------------------------------------------------------
+    # Document content (elements / tables)
+    # ------------------------------------------------------------------
+
+    async def insert_document_content(
+        self,
+        document_id: str,
+        elements: list[dict[str, Any]],
+        tables: list[dict[str, Any]],
+        *,
+        element_start: int = 0,
+        table_start: int = 0,
+    ) -> None:
+        """Store element / table records of *document_id* in bulk.
+
+        *element_start* / *table_start* number the first record, so a
+        document can be written in consecutive batches in document order.
+        """
+        for collection, records, start in (
+            (ELEMENTS_COLLECTION, elements, element_start),
+            (TABLES_COLLECTION, tables, table_start),
+        ):
+            if records:
+                await self.insert_many(collection, [
+                    {**record, "document_id": document_id, "seq": start + i}
+                    for i, record in enumerate(records)
+                ])
+
+    async def delete_document_content(self, document_id: str) -> None:
+        """Remove every element / table record of *document_id*."""
+        for collection in (ELEMENTS_COLLECTION, TABLES_COLLECTION):
+            await self.delete_many(collection, {"document_id": document_id})
+
+    async def document_elements(
+        self,
+        document_id: str,
+        query: dict[str, Any] | None = None,
+        projection: dict[str, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Elements of *document_id* in document order.
+
+        *query* filters further (e.g. ``{"element_type": "Table"}``) and
+        *projection* selects fields.
+        """
+        return await self._document_content(
+            ELEMENTS_COLLECTION, "elements", document_id, query, projection
+        )
+
+    async def document_tables(
+        self,
+        document_id: str,
+        projection: dict[str, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Tables of *document_id* in document order (see ``document_elements``)."""
+        return await self._document_content(
+            TABLES_COLLECTION, "tables", document_id, None, projection
+        )
+
+    async def _document_content(
+        self,
+        collection: str,
+        legacy_field: str,
+        document_id: str,
+        query: dict[str, Any] | None,
+        projection: dict[str, int] | None,
+    ) -> list[dict[str, Any]]:
+        if projection:
+            fields = {**projection, "_id": 0}
+        else:
+            fields = dict.fromkeys(
+                ("_id", "document_id", "seq", "created_at", "updated_at"), 0
+            )
+        cursor = self._db[collection].find(
+            {**(query or {}), "document_id": document_id}, fields
+        ).sort("seq", 1)
+        records = [doc async for doc in cursor]
+        if records:
+            return records
+
+        # Records ingested before content moved out of ``documents``
+        doc = await self.find_by_id("documents", document_id, {legacy_field: 1})
+        legacy = (doc or {}).get(legacy_field) or []
+        if query:
+            legacy = [r for r in legacy if all(r.get(k) == v for k, v in query.items())]
+        if projection:
+            keep = {k for k, v in projection.items() if v}
+            legacy = [{k: v for k, v in r.items() if k in keep} for r in legacy]
+        return legacy
+
     # ------------------------------------------------------------------
     # Count
     # ------------------------------------------------------------------
@@ -0,0 +1,980 @@
+"""In-process NumPy vector index — an alternative to the ChromaDB backend.
+
+Selected with ``VECTOR_STORE_BACKEND=numpy``.  Each collection lives in
+its own directory under *persist_dir*:
+
+- ``vectors.f32`` — row-major float32 matrix, append-only, memory-mapped
+- ``records.jsonl`` — one ``{"id", "text", "metadata"}`` line per row
+- ``tombstones.txt`` — rows deleted since the last compaction
+- ``meta.json`` — vector dimension
+
+Search is exact brute force (one blocked matrix multiply) until a
+collection holds ``ivf_threshold`` live rows; above that an IVF index
+(k-means coarse quantiser, ``nprobe`` lists probed per query) is trained
+lazily and retrained whenever the collection doubles.  Distances are
+squared L2 — ChromaDB's default space — so callers' ``1 - distance``
+relevance scores are unchanged.
+
+With ``quantization`` set to ``int8`` or ``pq`` (see ``quantization``),
+collections of ``_QUANTIZE_MIN`` rows or more also keep compact codes in
+RAM: the flat scan and the IVF candidate lists are scored on the codes and
+the best ``rerank_factor * k`` rows re-ranked exactly against the float32
+file.  The quantiser is trained lazily and retrained when the collection
+doubles, like the IVF index.
+
+Metadata fields declared in ``COLLECTIONS`` (plus ``document_id``,
+``source_file``, ``page_number``, ``element_type`` and ``framework``) are
+kept in dictionary-encoded columns with per-value row postings.  A
+``where`` filter is evaluated once per distinct value of a column and
+resolves directly to the matching rows, so a filtered search costs time
+proportional to its partition rather than to the collection.  Other
+fields get a column on first use.  ``$contains`` works on string metadata.
+
+The index is owned by one process: writes made by another process are
+picked up on restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from app.services.bm25_index import BM25Index
+from app.services.metadata_index import exact_values, matches, value_predicate
+from app.services.quantization import QUANTIZATIONS, kmeans, make_quantizer, nearest_centroid
+from app.services.retrieval_cache import RetrievalCache
+from app.services.vector_store import (
+    COLLECTIONS,
+    _SearchMixin,
+    _sanitise_metadata,
+    indexed_fields,
+    is_partition,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix multiply — bounds the temporary distance matrix
+_BLOCK_ROWS = 65_536
+
+# Compact once this share of rows is dead (and at least _COMPACT_MIN rows)
+_COMPACT_RATIO = 0.25
+_COMPACT_MIN = 1_024
+
+_KMEANS_SAMPLE_PER_LIST = 32
+_MAX_LISTS = 4_096
+
+# Quantised scan: minimum live rows, training sample, rows scored per block
+_QUANTIZE_MIN = 4_096
+_QUANTIZE_SAMPLE = 32_768
+_CODE_BLOCK_ROWS = 65_536
+
+
+def _grow(arr: np.ndarray, needed: int, fill: Any = 0) -> np.ndarray:
+    """Return *arr* with capacity for at least *needed* rows (doubling)."""
+    if len(arr) >= needed:
+        return arr
+    grown = np.full((max(needed, 2 * len(arr), 1_024), *arr.shape[1:]), fill, dtype=arr.dtype)
+    grown[: len(arr)] = arr
+    return grown
+
+
+def _merge_top_k(
+    best: tuple[np.ndarray, np.ndarray],
+    block_rows: np.ndarray,
+    dist: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fold one block's ``(queries, rows)`` distances into the running top *k*."""
+    best_rows = np.hstack([best[0], np.broadcast_to(block_rows, dist.shape)])
+    best_dist = np.hstack([best[1], dist])
+    if best_dist.shape[1] > k:
+        part = np.argpartition(best_dist, k - 1, axis=1)[:, :k]
+        best_rows = np.take_along_axis(best_rows, part, axis=1)
+        best_dist = np.take_along_axis(best_dist, part, axis=1)
+    return best_rows, best_dist
+
+
+# ---------------------------------------------------------------------------
+# Columnar metadata
+# ---------------------------------------------------------------------------
+
+class _Column:
+    """Dictionary-encoded metadata column (``-1`` = field absent).
+
+    Row postings per value (rows sorted by code) are derived lazily and
+    dropped on every write.
+    """
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self._lookup: dict[Any, int] = {}
+        self.codes = np.empty(0, dtype=np.int32)
+        self._postings: tuple[int, np.ndarray, np.ndarray] | None = None
+
+    def set_rows(self, start: int, values: list[Any]) -> None:
+        codes = np.fromiter(
+            (self._encode(v) for v in values), dtype=np.int32, count=len(values)
+        )
+        self.codes = _grow(self.codes, start + len(values), fill=-1)
+        self.codes[start : start + len(values)] = codes
+        self._postings = None
+
+    def _encode(self, value: Any) -> int:
+        if value is None:
+            return -1
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._lookup[value] = code
+        return code
+
+    def rows(self, n: int, condition: Any) -> np.ndarray:
+        """Sorted rows (< *n*) whose value satisfies the where *condition*.
+
+        Equality / ``$in`` conditions are dictionary lookups; others are
+        evaluated once per distinct value.  The cost after that is
+        proportional to the number of matching rows.
+        """
+        values = exact_values(condition)
+        if values is not None:
+            allowed = sorted({self._lookup[v] for v in values if v in self._lookup})
+        else:
+            predicate = value_predicate(condition)
+            allowed = [code for code, value in enumerate(self.values) if matches(predicate, value)]
+        if not allowed:
+            return np.empty(0, dtype=np.intp)
+        if self._postings is None or self._postings[0] != n:
+            codes = self.codes[:n]
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(self.values) + 1))
+            self._postings = (n, order, bounds)
+        _, order, bounds = self._postings
+        if len(allowed) == 1:
+            code = allowed[0]
+            return order[bounds[code] : bounds[code + 1]]
+        return np.sort(np.concatenate([order[bounds[c] : bounds[c + 1]] for c in allowed]))
+
+
+# ---------------------------------------------------------------------------
+# One collection
+# ---------------------------------------------------------------------------
+
+class _Collection:
+    """Vectors, records, columns, (optional) IVF index and codes of one collection."""
+
+    def __init__(
+        self,
+        path: Path,
+        columns: tuple[str, ...],
+        ivf_threshold: int,
+        nprobe: int,
+        quantization: str = "none",
+        rerank_factor: int = 16,
+        pq_subvectors: int = 0,
+    ) -> None:
+        self.path = path
+        self.lock = threading.RLock()
+        self._ivf_threshold = ivf_threshold
+        self._nprobe = nprobe
+        self._column_names = columns
+        self._quantization = quantization
+        self._rerank_factor = max(1, rerank_factor)
+        self._pq_subvectors = pq_subvectors
+
+        self.dim = 0
+        self.n = 0  # rows, live + dead
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict[str, Any]] = []
+        self.row_of: dict[str, int] = {}
+        self.alive = np.empty(0, dtype=bool)
+        self.sq_norms = np.empty(0, dtype=np.float32)
+        self.columns: dict[str, _Column] = {}
+        self.vectors: np.ndarray = np.empty((0, 0), dtype=np.float32)
+
+        self._centroids: np.ndarray | None = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self._lists: list[np.ndarray] | None = None
+        self._trained_on = 0
+
+        self._quantizer: Any = None
+        self._codes = np.empty((0, 0), dtype=np.uint8)
+        self._code_norms: np.ndarray | None = None
+        self._quantized_on = 0
+
+        path.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    # ── persistence ────────────────────────────────────────────────────
+
+    @property
+    def live(self) -> int:
+        return len(self.row_of)
+
+    def _load(self) -> None:
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            self.dim = json.loads(meta_path.read_text())["dim"]
+
+        records = self.path / "records.jsonl"
+        if records.exists():
+            with records.open(encoding="utf-8") as fh:
+                for line in fh:
+                    rec = json.loads(line)
+                    self.ids.append(rec["id"])
+                    self.texts.append(rec["text"])
+                    self.metadatas.append(rec["metadata"])
+        self.n = len(self.ids)
+        self.alive = np.ones(self.n, dtype=bool)
+        self._map_vectors()
+
+        tombstones = self.path / "tombstones.txt"
+        if tombstones.exists():
+            dead = [int(x) for x in tombstones.read_text().split()]
+            self.alive[dead] = False
+
+        self.row_of = {
+            rid: row for row, rid in enumerate(self.ids) if self.alive[row]
+        }
+        self.sq_norms = np.empty(self.n, dtype=np.float32)
+        for start in range(0, self.n, _BLOCK_ROWS):
+            block = np.asarray(self.vectors[start : start + _BLOCK_ROWS])
+            self.sq_norms[start : start + len(block)] = np.einsum("ij,ij->i", block, block)
+        for name in self._column_names:
+            self._build_column(name)
+
+    def _map_vectors(self) -> None:
+        path = self.path / "vectors.f32"
+        expected = self.n * self.dim * 4
+        if path.exists() and path.stat().st_size > expected:
+            # Vectors are written before records; drop rows from an
+            # interrupted add so later appends stay aligned
+            logger.warning("Truncating orphaned vectors in '%s'", self.path.name)
+            os.truncate(path, expected)
+        if self.n == 0 or not path.exists():
+            self.vectors = np.empty((0, self.dim), dtype=np.float32)
+            return
+        self.vectors = np.memmap(path, dtype=np.float32, mode="r", shape=(self.n, self.dim))
+
+    def _build_column(self, name: str) -> _Column:
+        column = _Column()
+        column.set_rows(0, [m.get(name) for m in self.metadatas])
+        self.columns[name] = column
+        return column
+
+    # ── writes ─────────────────────────────────────────────────────────
+
+    def add(
+        self,
+        ids: list[str],
+        embeddings: np.ndarray,
+        texts: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> int:
+        """Append rows; IDs that already exist are skipped (as ChromaDB does)."""
+        if self.dim == 0:
+            self.dim = embeddings.shape[1]
+            (self.path / "meta.json").write_text(json.dumps({"dim": self.dim}))
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Embedding dimension {embeddings.shape[1]} does not match "
+                f"collection dimension {self.dim}"
+            )
+
+        keep = []
+        seen: set[str] = set()
+        for i, rid in enumerate(ids):
+            if rid in self.row_of or rid in seen:
+                logger.warning("Add of existing embedding ID: %s", rid)
+                continue
+            seen.add(rid)
+            keep.append(i)
+        if not keep:
+            return 0
+
+        vectors = np.ascontiguousarray(embeddings[keep], dtype=np.float32)
+        new_ids = [ids[i] for i in keep]
+        new_texts = [texts[i] for i in keep]
+        new_metas = [metadatas[i] for i in keep]
+
+        with (self.path / "vectors.f32").open("ab") as fh:
+            fh.write(vectors.tobytes())
+        with (self.path / "records.jsonl").open("a", encoding="utf-8") as fh:
+            for rid, text, meta in zip(new_ids, new_texts, new_metas):
+                fh.write(json.dumps({"id": rid, "text": text, "metadata": meta}) + "\n")
+
+        start, count = self.n, len(keep)
+        self.n += count
+        self.ids.extend(new_ids)
+        self.texts.extend(new_texts)
+        self.metadatas.extend(new_metas)
+        for offset, rid in enumerate(new_ids):
+            self.row_of[rid] = start + offset
+        self.alive = _grow(self.alive, self.n, fill=False)
+        self.alive[start : self.n] = True
+        self.sq_norms = _grow(self.sq_norms, self.n)
+        self.sq_norms[start : self.n] = np.einsum("ij,ij->i", vectors, vectors)
+        for name, column in self.columns.items():
+            column.set_rows(start, [m.get(name) for m in new_metas])
+        self._map_vectors()
+
+        if self._centroids is not None:
+            self._assign = _grow(self._assign, self.n, fill=-1)
+            self._assign[start : self.n] = nearest_centroid(vectors, self._centroids)
+            self._lists = None
+        if self._quantizer is not None:
+            codes, norms = self._quantizer.encode(vectors)
+            self._codes = _grow(self._codes, self.n)
+            self._codes[start : self.n] = codes
+            if norms is not None:
+                self._code_norms = _grow(self._code_norms, self.n)
+                self._code_norms[start : self.n] = norms
+        return count
+
+    def delete_ids(self, ids: list[str]) -> int:
+        rows = [self.row_of.pop(rid) for rid in ids if rid in self.row_of]
+        if not rows:
+            return 0
+        self.alive[rows] = False
+        with (self.path / "tombstones.txt").open("a") as fh:
+            fh.write("\n".join(map(str, rows)) + "\n")
+        self._lists = None
+
+        dead = self.n - len(self.row_of)
+        if dead >= _COMPACT_MIN and dead > self.n * _COMPACT_RATIO:
+            self._compact()
+        return len(rows)
+
+    def _compact(self) -> None:
+        """Rewrite the collection without dead rows."""
+        keep = np.flatnonzero(self.alive[: self.n])
+        logger.info("Compacting '%s': %d → %d rows", self.path.name, self.n, len(keep))
+
+        tmp_vectors = self.path / "vectors.f32.tmp"
+        with tmp_vectors.open("wb") as fh:
+            for start in range(0, len(keep), _BLOCK_ROWS):
+                fh.write(np.asarray(self.vectors[keep[start : start + _BLOCK_ROWS]]).tobytes())
+        tmp_records = self.path / "records.jsonl.tmp"
+        with tmp_records.open("w", encoding="utf-8") as fh:
+            for row in keep:
+                fh.write(json.dumps({
+                    "id": self.ids[row],
+                    "text": self.texts[row],
+                    "metadata": self.metadatas[row],
+                }) + "\n")
+
+        self.vectors = np.empty((0, self.dim), dtype=np.float32)  # drop the old map
+        os.replace(tmp_vectors, self.path / "vectors.f32")
+        os.replace(tmp_records, self.path / "records.jsonl")
+        (self.path / "tombstones.txt").unlink(missing_ok=True)
+
+        self.ids, self.texts, self.metadatas = [], [], []
+        self.columns = {}
+        self._centroids, self._lists, self._trained_on = None, None, 0
+        self._quantizer, self._codes, self._quantized_on = None, self._codes[:0], 0
+        self._code_norms = None
+        self._load()
+
+    # ── filtering ──────────────────────────────────────────────────────
+
+    def live_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.alive[: self.n])
+
+    def filter_rows(
+        self,
+        where: dict[str, Any] | None,
+        where_document: dict[str, Any] | None = None,
+    ) -> np.ndarray | None:
+        """Sorted live rows matching the filters (``None`` = no filter)."""
+        if not where and not where_document:
+            return None
+        if where:
+            rows = self._where_rows(where)
+            rows = rows[self.alive[rows]]
+        else:
+            rows = self.live_rows()
+        if where_document:
+            rows = rows[self._document_mask(where_document, rows)]
+        return rows
+
+    def _where_rows(self, where: dict[str, Any]) -> np.ndarray:
+        rows: np.ndarray | None = None
+        for key, condition in where.items():
+            if key == "$and":
+                parts = [self._where_rows(clause) for clause in condition]
+            elif key == "$or":
+                parts = [
+                    np.unique(np.concatenate([self._where_rows(c) for c in condition]))
+                    if condition else np.empty(0, dtype=np.intp)
+                ]
+            else:
+                column = self.columns.get(key) or self._build_column(key)
+                parts = [column.rows(self.n, condition)]
+            for part in parts:
+                rows = part if rows is None else np.intersect1d(rows, part, assume_unique=True)
+        return np.arange(self.n) if rows is None else rows
+
+    def _document_mask(self, where_document: dict[str, Any], rows: np.ndarray) -> np.ndarray:
+        if "$contains" in where_document:
+            needle = where_document["$contains"]
+            return np.fromiter(
+                (needle in (self.texts[r] or "") for r in rows), dtype=bool, count=len(rows)
+            )
+        if "$not_contains" in where_document:
+            needle = where_document["$not_contains"]
+            return np.fromiter(
+                (needle not in (self.texts[r] or "") for r in rows), dtype=bool, count=len(rows)
+            )
+        raise ValueError(f"Unsupported where_document filter {where_document!r}")
+
+    # ── search ─────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        rows: np.ndarray | None = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Top-*k* ``(rows, sq_l2_distances)`` per query among *rows*.
+
+        *rows* comes from ``filter_rows``; ``None`` searches every live row.
+        """
+        if rows is None and self.live < self.n:
+            rows = self.live_rows()
+        selected = self.n if rows is None else len(rows)
+        if selected == 0 or k <= 0:
+            return [(np.empty(0, np.intp), np.empty(0, np.float32)) for _ in queries]
+
+        if self.live >= self._ivf_threshold:
+            self._ensure_ivf()
+        if self._quantization != "none" and self.live >= _QUANTIZE_MIN:
+            self._ensure_quantizer()
+        if self._centroids is None or selected < self._ivf_threshold:
+            # Small collection or selective filter — flat scan
+            return self._scan(queries, k, rows)
+        if rows is None:
+            mask = self.alive[: self.n]
+        else:
+            mask = np.zeros(self.n, dtype=bool)
+            mask[rows] = True
+        return [self._ivf_search(q, k, mask) for q in queries]
+
+    def _scan(
+        self,
+        queries: np.ndarray,
+        k: int,
+        rows: np.ndarray | None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Exact top-*k*, via quantised candidates when codes are available."""
+        depth = k * self._rerank_factor
+        if self._quantizer is None or (self.n if rows is None else len(rows)) <= depth:
+            return self._exact(queries, k, rows)
+        candidates = self._candidates(queries, depth, rows)
+        return [self._exact(q[None, :], k, cand)[0] for q, cand in zip(queries, candidates)]
+
+    def _candidates(
+        self,
+        queries: np.ndarray,
+        depth: int,
+        rows: np.ndarray | None,
+    ) -> list[np.ndarray]:
+        """Sorted rows of the *depth* nearest codes per query."""
+        total = self.n if rows is None else len(rows)
+        best = (
+            np.empty((len(queries), 0), dtype=np.intp),
+            np.empty((len(queries), 0), dtype=np.float32),
+        )
+        for start in range(0, total, _CODE_BLOCK_ROWS):
+            block_rows = (
+                np.arange(start, min(start + _CODE_BLOCK_ROWS, total))
+                if rows is None
+                else rows[start : start + _CODE_BLOCK_ROWS]
+            )
+            if rows is None:
+                codes = self._codes[start : start + len(block_rows)]
+                norms = self._code_norms
+                if norms is not None:
+                    norms = norms[start : start + len(block_rows)]
+            else:
+                codes = self._codes[block_rows]
+                norms = None if self._code_norms is None else self._code_norms[block_rows]
+            dist = self._quantizer.distances(queries, codes, norms)
+            best = _merge_top_k(best, block_rows, dist, depth)
+        return [np.sort(r) for r in best[0]]
+
+    def _exact(
+        self,
+        queries: np.ndarray,
+        k: int,
+        rows: np.ndarray | None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        total = self.n if rows is None else len(rows)
+        q_norms = np.einsum("ij,ij->i", queries, queries)
+        best = (
+            np.empty((len(queries), 0), dtype=np.intp),
+            np.empty((len(queries), 0), dtype=np.float32),
+        )
+
+        for start in range(0, total, _BLOCK_ROWS):
+            block_rows = (
+                np.arange(start, min(start + _BLOCK_ROWS, total))
+                if rows is None
+                else rows[start : start + _BLOCK_ROWS]
+            )
+            block = (
+                np.asarray(self.vectors[start : start + len(block_rows)])
+                if rows is None
+                else np.asarray(self.vectors[block_rows])
+            )
+            dist = (
+                q_norms[:, None]
+                + self.sq_norms[block_rows][None, :]
+                - 2.0 * (queries @ block.T)
+            )
+            best = _merge_top_k(best, block_rows, dist, k)
+
+        best_rows, best_dist = best
+        order = np.argsort(best_dist, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_dist = np.maximum(np.take_along_axis(best_dist, order, axis=1), 0.0)
+        return list(zip(best_rows, best_dist))
+
+    def _ivf_search(
+        self,
+        query: np.ndarray,
+        k: int,
+        mask: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        assert self._centroids is not None
+        lists = self._inverted_lists()
+        centroid_dist = (
+            np.einsum("ij,ij->i", self._centroids, self._centroids)
+            - 2.0 * (self._centroids @ query)
+        )
+        probe_order = np.argsort(centroid_dist)
+        nprobe = min(self._nprobe, len(lists))
+
+        while True:
+            cand = np.concatenate([lists[c] for c in probe_order[:nprobe]])
+            cand = cand[mask[cand]]
+            # Widen the probe until enough candidates survive the filter
+            if len(cand) >= k or nprobe >= len(lists):
+                break
+            nprobe = min(nprobe * 2, len(lists))
+
+        if len(cand) == 0:
+            return np.empty(0, np.intp), np.empty(0, np.float32)
+        rows, dist = self._scan(query[None, :], k, np.sort(cand))[0]
+        return rows, dist
+
+    # ── IVF ────────────────────────────────────────────────────────────
+
+    def _ensure_ivf(self) -> None:
+        live = self.live
+        if self._centroids is not None and live <= 2 * self._trained_on:
+            return
+        rows = np.flatnonzero(self.alive[: self.n])
+        n_lists = int(min(_MAX_LISTS, max(16, 2 * math.sqrt(live))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(
+            rng.choice(rows, size=min(len(rows), n_lists * _KMEANS_SAMPLE_PER_LIST), replace=False)
+        )
+        sample = np.asarray(self.vectors[sample_rows])
+
+        logger.info(
+            "Training IVF for '%s': %d lists on %d of %d vectors",
+            self.path.name, n_lists, len(sample), live,
+        )
+        self._centroids = kmeans(sample, n_lists, rng)
+
+        self._assign = np.full(self.n, -1, dtype=np.int32)
+        for start in range(0, len(rows), _BLOCK_ROWS):
+            block_rows = rows[start : start + _BLOCK_ROWS]
+            self._assign[block_rows] = nearest_centroid(
+                np.asarray(self.vectors[block_rows]), self._centroids
+            )
+        self._lists = None
+        self._trained_on = live
+
+    def _inverted_lists(self) -> list[np.ndarray]:
+        if self._lists is None:
+            assert self._centroids is not None
+            assign = self._assign[: self.n]
+            rows = np.flatnonzero((assign >= 0) & self.alive[: self.n])
+            order = rows[np.argsort(assign[rows], kind="stable")]
+            bounds = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+            self._lists = [order[bounds[i] : bounds[i + 1]] for i in range(len(self._centroids))]
+        return self._lists
+
+    @property
+    def index_type(self) -> str:
+        return "ivf" if self._centroids is not None else "flat"
+
+    # ── quantisation ───────────────────────────────────────────────────
+
+    def _ensure_quantizer(self) -> None:
+        live = self.live
+        if self._quantizer is not None and live <= 2 * self._quantized_on:
+            return
+        rows = np.flatnonzero(self.alive[: self.n])
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(
+            rng.choice(rows, size=min(len(rows), _QUANTIZE_SAMPLE), replace=False)
+        )
+        quantizer = make_quantizer(self._quantization, self.dim, self._pq_subvectors)
+
+        logger.info(
+            "Training %s quantiser for '%s' on %d of %d vectors",
+            self._quantization, self.path.name, len(sample_rows), live,
+        )
+        quantizer.train(np.asarray(self.vectors[sample_rows]), rng)
+        codes = np.zeros((self.n, quantizer.code_size), dtype=np.uint8)
+        code_norms: np.ndarray | None = None
+        for start in range(0, len(rows), _BLOCK_ROWS):
+            block_rows = rows[start : start + _BLOCK_ROWS]
+            block_codes, block_norms = quantizer.encode(np.asarray(self.vectors[block_rows]))
+            codes[block_rows] = block_codes
+            if block_norms is not None:
+                if code_norms is None:
+                    code_norms = np.zeros(self.n, dtype=np.float32)
+                code_norms[block_rows] = block_norms
+        self._quantizer, self._codes, self._code_norms = quantizer, codes, code_norms
+        self._quantized_on = live
+
+    @property
+    def quantization(self) -> str:
+        return self._quantizer.kind if self._quantizer is not None else "none"
+
+    @property
+    def scan_bytes(self) -> int:
+        """RAM scanned per unfiltered flat query (codes, else float32 vectors)."""
+        if self._quantizer is not None:
+            return self.n * self._quantizer.code_size
+        return self.n * self.dim * 4
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class NumpyVectorStore(_SearchMixin):
+    """Drop-in ``VectorStoreService`` replacement backed by NumPy.
+
+    Parameters
+    ----------
+    persist_dir:
+        Directory holding one sub-directory per collection.
+    ivf_threshold:
+        Live rows above which a collection switches from exact search to
+        the IVF index.
+    nprobe:
+        Inverted lists probed per IVF query (recall / speed trade-off).
+    quantization:
+        ``none``, ``int8`` or ``pq`` — compact codes for the candidate scan
+        (see ``quantization``); results are re-ranked exactly.
+    rerank_factor:
+        Candidates re-ranked exactly per requested result when quantised.
+    pq_subvectors:
+        Bytes per product-quantisation code (``0`` = ``dim / 4``).
+    keyword_index:
+        Optional ``BM25Index`` kept in sync with every add / delete.
+    search_timeout / search_concurrency / document_partitions / retrieval_cache:
+        As for ``VectorStoreService``.  Partitions are loaded on first use.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = "./vector_index",
+        ivf_threshold: int = 50_000,
+        nprobe: int = 16,
+        quantization: str = "none",
+        rerank_factor: int = 16,
+        pq_subvectors: int = 0,
+        keyword_index: BM25Index | None = None,
+        search_timeout: float | None = None,
+        search_concurrency: int | None = None,
+        document_partitions: bool = False,
+        retrieval_cache: RetrievalCache | None = None,
+    ) -> None:
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown vector quantization {quantization!r} (expected one of {QUANTIZATIONS})"
+            )
+        self._keyword_index = keyword_index
+        self._retrieval_cache = retrieval_cache
+        self._document_partitions = document_partitions
+        self._search_timeout = search_timeout
+        self._search_concurrency = search_concurrency
+        self._root = Path(persist_dir)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._ivf_threshold = ivf_threshold
+        self._nprobe = nprobe
+        self._quantization = quantization
+        self._rerank_factor = rerank_factor
+        self._pq_subvectors = pq_subvectors
+        self._collections: dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+
+        for name in COLLECTIONS:
+            self._collection(name)
+        for path in sorted(self._root.iterdir()):
+            if path.is_dir() and not is_partition(path.name):
+                self._collection(path.name)
+        logger.info(
+            "NumPy vector store initialised at %s with collections: %s",
+            self._root,
+            self.list_collections(),
+        )
+
+    def _collection(self, name: str) -> _Collection:
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = _Collection(
+                        self._root / name,
+                        columns=indexed_fields(name),
+                        ivf_threshold=self._ivf_threshold,
+                        nprobe=self._nprobe,
+                        quantization=self._quantization,
+                        rerank_factor=self._rerank_factor,
+                        pq_subvectors=self._pq_subvectors,
+                    )
+                    self._collections[name] = collection
+        return collection
+
+    async def _run(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run *fn(collection, ...)* under the collection lock in a worker thread."""
+        collection = self._collection(name)
+
+        def _locked() -> Any:
+            with collection.lock:
+                return fn(collection, *args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _locked)
+
+    # ------------------------------------------------------------------
+    # Add
+    # ------------------------------------------------------------------
+
+    async def add_documents(
+        self,
+        collection_name: str,
+        chunks: list[dict[str, Any]],
+        embeddings: np.ndarray | None = None,
+    ) -> int:
+        """Add pre-embedded chunks (same contract as ``VectorStoreService``).
+
+        Returns the number of chunks actually stored; IDs already present
+        are skipped.
+        """
+        if not chunks:
+            return 0
+        if embeddings is None:
+            embeddings = np.asarray([c["embedding"] for c in chunks], dtype=np.float32)
+        elif len(embeddings) != len(chunks):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(chunks)} chunks")
+
+        ids = [c["id"] for c in chunks]
+        texts = [c["text"] for c in chunks]
+        metadatas = [_sanitise_metadata(c.get("metadata", {})) for c in chunks]
+
+        added = await self._run(
+            collection_name,
+            lambda col: col.add(ids, np.asarray(embeddings, dtype=np.float32), texts, metadatas),
+        )
+        await self._invalidate_results(collection_name)
+        await self._index_keywords(collection_name, ids, texts)
+        logger.info("Added %d chunks to collection '%s'", added, collection_name)
+        return added
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    async def _query_raw(
+        self,
+        collection_name: str,
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int,
+        where: dict[str, Any] | None = None,
+        where_document: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+
+        def _search(col: _Collection) -> dict[str, Any]:
+            if col.n and queries.shape[1] != col.dim:
+                raise ValueError(
+                    f"Query dimension {queries.shape[1]} does not match "
+                    f"collection dimension {col.dim}"
+                )
+            found = col.search(queries, n_results, col.filter_rows(where, where_document))
+            return {
+                "ids": [[col.ids[r] for r in rows] for rows, _ in found],
+                "documents": [[col.texts[r] for r in rows] for rows, _ in found],
+                "metadatas": [[col.metadatas[r] for r in rows] for rows, _ in found],
+                "distances": [dist.tolist() for _, dist in found],
+                "embeddings": None,
+            }
+
+        return await self._run(collection_name, _search)
+
+    # ------------------------------------------------------------------
+    # Delete
+    # ------------------------------------------------------------------
+
+    async def delete_documents(self, collection_name: str, ids: list[str]) -> None:
+        """Delete documents from a collection by ID."""
+        if not ids:
+            return
+        deleted = await self._run(collection_name, lambda col: col.delete_ids(ids))
+        await self._invalidate_results(collection_name)
+        await self._unindex_keywords(collection_name, ids)
+        logger.info("Deleted %d documents from collection '%s'", deleted, collection_name)
+
+    async def delete_by_metadata(
+        self,
+        collection_name: str,
+        where: dict[str, Any],
+    ) -> int:
+        """Delete all documents in *collection_name* matching a metadata filter."""
+
+        def _delete(col: _Collection) -> list[str]:
+            rows = col.filter_rows(where)
+            ids = [col.ids[r] for r in (col.live_rows() if rows is None else rows)]
+            col.delete_ids(ids)
+            return ids
+
+        deleted = await self._run(collection_name, _delete)
+        await self._invalidate_results(collection_name)
+        await self._unindex_keywords(collection_name, deleted)
+        return len(deleted)
+
+    # ------------------------------------------------------------------
+    # Utility / stats
+    # ------------------------------------------------------------------
+
+    def list_collections(self) -> list[str]:
+        """Return names of all collections in the store (partitions excluded)."""
+        return [name for name in self._collections if not is_partition(name)]
+
+    def _has_collection(self, name: str) -> bool:
+        return name in self._collections or (self._root / name).is_dir()
+
+    async def _drop_collection(self, name: str) -> None:
+        if not self._has_collection(name):
+            return
+        collection = self._collection(name)
+
+        def _drop() -> None:
+            with collection.lock:
+                with self._lock:
+                    self._collections.pop(name, None)
+                collection.vectors = np.empty((0, 0), dtype=np.float32)  # release the map
+                shutil.rmtree(collection.path, ignore_errors=True)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _drop)
+        await self._invalidate_results(name)
+
+    def get_collection_stats(self, collection_name: str) -> dict[str, Any]:
+        """Return basic stats for a collection."""
+        col = self._collection(collection_name)
+        description = COLLECTIONS.get(collection_name, {}).get("description", "")
+        return {
+            "name": collection_name,
+            "count": col.live,
+            "metadata": {
+                "description": description,
+                "backend": "numpy",
+                "index": col.index_type,
+                "quantization": col.quantization,
+                "dimension": col.dim,
+            },
+        }
+
+    def get_all_stats(self) -> list[dict[str, Any]]:
+        """Return stats for every collection."""
+        return [self.get_collection_stats(name) for name in self.list_collections()]
+
+    async def _get_raw(
+        self,
+        collection_name: str,
+        ids: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        include_embeddings: bool = False,
+    ) -> dict[str, Any]:
+        """Fetch live rows by IDs and / or metadata filter (ChromaDB ``get()`` shape)."""
+
+        def _get(col: _Collection) -> dict[str, Any]:
+            if ids is not None:
+                rows = np.asarray([col.row_of[i] for i in ids if i in col.row_of], dtype=np.intp)
+            else:
+                rows = col.live_rows()
+            if where:
+                rows = rows[np.isin(rows, col.filter_rows(where))]
+            start = offset or 0
+            rows = rows[start : None if limit is None else start + limit]
+            return {
+                "ids": [col.ids[r] for r in rows],
+                "documents": [col.texts[r] for r in rows],
+                "metadatas": [col.metadatas[r] for r in rows],
+                "embeddings": np.asarray(col.vectors[rows]) if include_embeddings else None,
+            }
+
+        return await self._run(collection_name, _get)
+
+    async def _substring_search(
+        self,
+        collection_name: str,
+        keyword: str,
+        n_results: int,
+        where: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        """Unranked substring scan over chunk text (no keyword index)."""
+
+        def _scan(col: _Collection) -> dict[str, Any]:
+            rows = col.filter_rows(where, {"$contains": keyword})[:n_results]
+            return {
+                "ids": [col.ids[r] for r in rows],
+                "documents": [col.texts[r] for r in rows],
+                "metadatas": [col.metadatas[r] for r in rows],
+            }
+
+        try:
+            return await self._run(collection_name, _scan)
+        except Exception:
+            logger.warning("Keyword search on '%s' failed", collection_name, exc_info=True)
+            return {"ids": [], "documents": [], "metadatas": []}
+
+    async def peek(
+        self,
+        collection_name: str,
+        limit: int = 5,
+    ) -> dict[str, Any]:
+        """Return a small sample of documents from a collection (for debugging)."""
+
+        def _peek(col: _Collection) -> dict[str, Any]:
+            rows = col.live_rows()[:limit]
+            return {
+                "ids": [col.ids[r] for r in rows],
+                "embeddings": np.asarray(col.vectors[rows]).tolist(),
+                "documents": [col.texts[r] for r in rows],
+                "metadatas": [col.metadatas[r] for r in rows],
+            }
+
+        return await self._run(collection_name, _peek)
@@ -0,0 +1,166 @@
+"""Persistent, content-addressed cache for raw partition output.
+
+Partitioning (Unstructured API or local ``hi_res``) dominates ingest time,
+yet re-ingesting the same bytes — ``/reindex``, re-running the compliance
+ingest scripts, the same annual report uploaded under another name —
+always produces the same elements.  This cache stores the raw element
+dicts keyed by ``sha256(file bytes)`` plus the partition parameters
+(mode, strategy, thresholds, library version), so a repeat run skips
+partitioning entirely and changed parameters never serve stale output.
+
+Entries are zlib-compressed JSON in a single SQLite file.  The cache is
+capped by compressed size: once it holds more than *max_bytes* the
+least-recently-used entries are evicted.  Hit / miss / eviction counters
+are kept in-process and exposed via ``stats()``.
+
+All methods are synchronous and thread-safe; ``DocumentProcessor`` calls
+them from the default executor so hashing and SQLite I/O never block the
+event loop.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+import zlib
+from typing import Any
+
+from app.services.sqlite_cache import SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the stored element format changes
+_FORMAT_VERSION = 1
+
+_HASH_BLOCK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    cache_key   TEXT    PRIMARY KEY,
+    file_hash   TEXT    NOT NULL,
+    elements    BLOB    NOT NULL,
+    size        INTEGER NOT NULL,
+    last_used   REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_partitions_last_used ON partitions (last_used);
+"""
+
+
+def file_hash(path: str) -> str:
+    """Return the hex SHA-256 digest of the bytes of *path*."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(_HASH_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def partition_key(digest: str, params: dict[str, Any]) -> str:
+    """Cache key for file *digest* partitioned with *params*."""
+    blob = json.dumps([_FORMAT_VERSION, digest, params], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _pack(elements: list[dict[str, Any]]) -> bytes:
+    payload = json.dumps(elements, separators=(",", ":"), default=str)
+    return zlib.compress(payload.encode("utf-8"), 6)
+
+
+def _unpack(blob: bytes) -> list[dict[str, Any]]:
+    return json.loads(zlib.decompress(blob))
+
+
+class PartitionCache(SQLiteLRUCache):
+    """SQLite-backed LRU cache of partitioned documents.
+
+    Parameters
+    ----------
+    path:
+        Filesystem path of the SQLite database.  Parent directories are
+        created if needed.
+    max_bytes:
+        Maximum total compressed size of the cached documents.  ``0``
+        disables the cap.
+    """
+
+    _table = "partitions"
+    _schema = _SCHEMA
+    _size_column = "size"
+    _label = "Partition cache"
+
+    def __init__(
+        self, path: str = "./cache/partitions.sqlite3", max_bytes: int = 2 * 2**30
+    ) -> None:
+        super().__init__(path, max_bytes)
+        logger.info(
+            "Partition cache opened at %s (max %.0f MiB)", self._path, max_bytes / 2**20
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> PartitionCache | None:
+        """Build the cache from application ``Settings`` (``None`` if disabled)."""
+        if not settings.PARTITION_CACHE_ENABLED:
+            return None
+        return cls(
+            path=settings.PARTITION_CACHE_PATH,
+            max_bytes=settings.PARTITION_CACHE_MAX_MB * 2**20,
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return the cached elements for *key*, or ``None`` on a miss.
+
+        Hits have their ``last_used`` timestamp refreshed so they survive
+        eviction.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT elements FROM partitions WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE partitions SET last_used = ? WHERE cache_key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self._stats.hits += 1
+        return _unpack(row[0])
+
+    def put(self, key: str, digest: str, elements: list[dict[str, Any]]) -> None:
+        """Store *elements* of file *digest* under *key*, then evict down to the cap."""
+        if not elements:
+            return
+        blob = _pack(elements)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO partitions "
+                "(cache_key, file_hash, elements, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, digest, blob, len(blob), time.time()),
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit / miss / eviction counters, entry count and stored size."""
+        with self._lock:
+            entries, size = self._size_locked()
+            return {
+                "path": str(self._path),
+                "entries": entries,
+                "size_mb": round(size / 2**20, 2),
+                "max_mb": round(self._max_size / 2**20, 2),
+                **self._stats.as_dict(),
+            }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _log_eviction(self, rows: int, size: int) -> None:
+        logger.info("Partition cache evicted %d LRU entries (%.1f MiB)", rows, size / 2**20)
@@ -0,0 +1,457 @@
+"""Process pool for local ``unstructured`` partitioning.
+
+``partition_pdf(strategy="hi_res")`` runs layout detection and OCR models
+for minutes per PDF while holding the GIL, so calling it inside a
+coroutine stalls every other request on the event loop.
+``PartitionPool`` runs it in separate worker processes instead:
+
+- *workers* processes partition files truly in parallel (one file each).
+- Workers are recycled after *max_tasks_per_child* files, returning the
+  memory that model caches and fragmented heaps accumulate.
+- *memory_limit_mb* caps each worker's address space (POSIX only).  A
+  worker that hits it fails that file with ``MemoryError`` instead of
+  dragging the host into swap.  A worker killed outright (e.g. by the OOM
+  killer) breaks the pool, which is rebuilt for the next file.
+
+Workers return elements as plain dicts (``Element.to_dict()``), which
+``DocumentProcessor._normalise_elements`` consumes directly and which are
+cheap to pickle back to the parent.
+
+Large PDFs (``split_min_pages`` pages or more) are split into page ranges
+partitioned by several workers at once (``partition_pdf_pages``).  Each
+range is written to a temporary PDF and partitioned with
+``starting_page_number`` and the original file name, so page numbers,
+element order, page breaks and hash element IDs are identical to a
+single-process run.  A range partitioned on its own leaves the elements
+before its first title without a parent; ``link_range_parents`` points
+them at the last title of an earlier range while the ranges are stitched
+back together, as a single run would.
+
+With ``strategy="tiered"`` (the default) pages are first read from the PDF
+text layer with the cheap ``fast`` strategy (pdfminer, no models).  Only
+pages that look scanned (fewer than *fast_min_chars* characters), carry a
+broken text layer (``(cid:NN)`` glyphs) or look like tables (more than
+*fast_max_numeric_ratio* of their tokens are numbers) are re-partitioned
+with ``hi_res`` layout detection, table structure inference and OCR.
+Every element records the strategy that produced its page in
+``metadata["partition_strategy"]``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Smallest page range worth a task — each range re-opens the PDF and runs
+# layout detection setup once
+_MIN_PAGES_PER_TASK = 4
+
+PARTITION_STRATEGIES = ("hi_res", "tiered")
+
+_RE_NUMERIC_TOKEN = re.compile(r"^[(\-–]?[₹$]?[0-9][0-9,]*(?:\.[0-9]+)?%?\)?$")
+_RE_CID_GLYPH = re.compile(r"\(cid:\d+\)")
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _init_partition_worker(memory_limit_mb: int) -> None:
+    if memory_limit_mb > 0:
+        try:
+            import resource
+
+            limit = memory_limit_mb * 2**20
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            logger.warning("Could not cap partition worker memory")
+
+
+def partition_pdf_local(filepath: str, **kwargs: Any) -> list[dict[str, Any]]:
+    """Partition *filepath* with ``hi_res`` and return elements as dicts.
+
+    Runs in a pool worker; also callable in-process.  Extra *kwargs* are
+    passed to ``partition_pdf``.
+    """
+    from unstructured.partition.pdf import partition_pdf
+
+    elements = partition_pdf(
+        filename=filepath,
+        strategy="hi_res",
+        infer_table_structure=True,
+        languages=["eng"],
+        include_page_breaks=True,
+        **kwargs,
+    )
+    return [element.to_dict() for element in elements]
+
+
+@contextmanager
+def _page_subset(filepath: str, first_page: int, last_page: int) -> Iterator[str]:
+    """Yield a temporary PDF holding pages *first_page*..*last_page* of *filepath*.
+
+    The copy carries the original's mtime (``last_modified`` metadata).
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(filepath)
+    writer = PdfWriter()
+    for index in range(first_page - 1, last_page):
+        writer.add_page(reader.pages[index])
+
+    stat = os.stat(filepath)
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf", prefix="partition_")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            writer.write(fh)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        yield tmp_path
+    finally:
+        os.unlink(tmp_path)
+
+
+def partition_pdf_pages(filepath: str, first_page: int, last_page: int) -> list[dict[str, Any]]:
+    """Partition pages *first_page*..*last_page* (1-based, inclusive) of *filepath*.
+
+    Elements report their page numbers and file name in the original.
+    """
+    with _page_subset(filepath, first_page, last_page) as tmp_path:
+        return partition_pdf_local(
+            tmp_path,
+            metadata_filename=filepath,
+            starting_page_number=first_page,
+        )
+
+
+def _split_pages(
+    elements: list[dict[str, Any]], first_page: int
+) -> dict[int, list[dict[str, Any]]]:
+    """Group partition output by page; every page ends with its ``PageBreak``."""
+    pages: dict[int, list[dict[str, Any]]] = {}
+    page = first_page
+    for element in elements:
+        pages.setdefault(page, []).append(element)
+        if element.get("type") == "PageBreak":
+            page += 1
+    return pages
+
+
+def link_range_parents(
+    elements: list[dict[str, Any]], last_title: str | None
+) -> str | None:
+    """Restore ``parent_id`` links from one page range to the ranges before it.
+
+    *elements* is one range's partition output, in document order, and
+    *last_title* the ``element_id`` of the last ``Title`` of the earlier
+    ranges.  Elements before the range's first ``Title`` (page breaks
+    excepted) that have no parent are linked to *last_title*, in place.
+    Returns the last title to carry into the next range.
+    """
+    for element in elements:
+        kind = element.get("type")
+        if kind == "Title":
+            break
+        if last_title is None or kind == "PageBreak":
+            continue
+        metadata = element.get("metadata")
+        if metadata is None:
+            metadata = element["metadata"] = {}
+        if not metadata.get("parent_id"):
+            metadata["parent_id"] = last_title
+    for element in reversed(elements):
+        if element.get("type") == "Title":
+            return element.get("element_id")
+    return last_title
+
+
+def page_needs_hi_res(
+    elements: list[dict[str, Any]],
+    min_chars: int = 200,
+    max_numeric_ratio: float = 0.3,
+) -> bool:
+    """Whether a page's text-layer elements are too thin or tabular to keep.
+
+    *elements* are one page of ``fast`` output.  A page needs ``hi_res``
+    when its text layer has fewer than *min_chars* characters (scanned or
+    image-only), contains undecodable ``(cid:NN)`` glyphs, or more than
+    *max_numeric_ratio* of its tokens are numbers (a financial table,
+    whose structure only ``hi_res`` recovers).
+    """
+    text = " ".join(e.get("text") or "" for e in elements)
+    if len(text.strip()) < min_chars or _RE_CID_GLYPH.search(text):
+        return True
+    tokens = text.split()
+    numeric = sum(1 for token in tokens if _RE_NUMERIC_TOKEN.match(token))
+    return numeric > max_numeric_ratio * len(tokens)
+
+
+def _tag_strategy(elements: list[dict[str, Any]], strategy: str) -> list[dict[str, Any]]:
+    for element in elements:
+        element.setdefault("metadata", {})["partition_strategy"] = strategy
+    return elements
+
+
+def partition_pdf_tiered(
+    filepath: str,
+    first_page: int = 1,
+    last_page: int = 0,
+    *,
+    min_chars: int = 200,
+    max_numeric_ratio: float = 0.3,
+) -> list[dict[str, Any]]:
+    """Partition pages of *filepath* from the text layer, using ``hi_res`` only where needed.
+
+    Parameters
+    ----------
+    filepath:
+        PDF to partition.
+    first_page, last_page:
+        1-based inclusive page range (``last_page=0`` = the whole file).
+    min_chars, max_numeric_ratio:
+        Thresholds of ``page_needs_hi_res``.
+    """
+    from unstructured.partition.pdf import partition_pdf
+
+    whole_file = first_page == 1 and last_page == 0
+    if last_page == 0:
+        last_page = pdf_page_count(filepath)
+        if last_page == 0:  # unreadable by pypdf — leave it all to hi_res
+            return _tag_strategy(partition_pdf_local(filepath), "hi_res")
+
+    def _fast(path: str) -> list[dict[str, Any]]:
+        elements = partition_pdf(
+            filename=path,
+            strategy="fast",
+            languages=["eng"],
+            include_page_breaks=True,
+            metadata_filename=filepath,
+            starting_page_number=first_page,
+        )
+        return [element.to_dict() for element in elements]
+
+    try:
+        if whole_file:
+            fast = _fast(filepath)
+        else:
+            with _page_subset(filepath, first_page, last_page) as tmp_path:
+                fast = _fast(tmp_path)
+    except Exception:
+        logger.warning("Text-layer extraction failed for %s", filepath, exc_info=True)
+        fast = []
+    pages = _split_pages(fast, first_page)
+
+    needs_hi_res = [
+        page for page in range(first_page, last_page + 1)
+        if page_needs_hi_res(
+            [e for e in pages.get(page, []) if e.get("type") != "PageBreak"],
+            min_chars,
+            max_numeric_ratio,
+        )
+    ]
+    strategy = dict.fromkeys(range(first_page, last_page + 1), "fast")
+
+    # Re-partition consecutive runs of such pages with hi_res
+    runs: list[list[int]] = []
+    for page in needs_hi_res:
+        if runs and runs[-1][-1] == page - 1:
+            runs[-1].append(page)
+        else:
+            runs.append([page])
+    for run in runs:
+        if whole_file and len(run) == last_page:
+            hi_res = partition_pdf_local(filepath)  # no text layer at all
+        else:
+            hi_res = partition_pdf_pages(filepath, run[0], run[-1])
+        for page, elements in _split_pages(hi_res, run[0]).items():
+            pages[page] = elements
+            strategy[page] = "hi_res"
+
+    result: list[dict[str, Any]] = []
+    for page in range(first_page, last_page + 1):
+        result.extend(_tag_strategy(pages.get(page, []), strategy[page]))
+    return result
+
+
+def pdf_page_count(filepath: str) -> int:
+    """Number of pages in *filepath* (``0`` if it cannot be read)."""
+    try:
+        from pypdf import PdfReader
+
+        return len(PdfReader(filepath).pages)
+    except Exception:
+        logger.debug("Could not count pages of %s", filepath, exc_info=True)
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+class PartitionPool:
+    """Lazily started process pool for CPU-heavy partitioning.
+
+    Parameters
+    ----------
+    workers:
+        Worker processes (``0`` = ``os.cpu_count()``).
+    max_tasks_per_child:
+        Files a worker partitions before it is replaced (``0`` = never).
+    memory_limit_mb:
+        Address-space cap per worker in MiB (``0`` = no limit).
+    pages_per_task:
+        Largest page range partitioned by one worker when a PDF is split.
+    split_min_pages:
+        PDFs with fewer pages are partitioned whole (``0`` = never split).
+    strategy:
+        ``"tiered"`` (text layer first, ``hi_res`` per page where needed) or
+        ``"hi_res"`` (every page through layout detection and OCR).
+    fast_min_chars, fast_max_numeric_ratio:
+        ``page_needs_hi_res`` thresholds for the tiered strategy.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_tasks_per_child: int = 8,
+        memory_limit_mb: int = 0,
+        pages_per_task: int = 16,
+        split_min_pages: int = 32,
+        strategy: str = "tiered",
+        fast_min_chars: int = 200,
+        fast_max_numeric_ratio: float = 0.3,
+    ) -> None:
+        if strategy not in PARTITION_STRATEGIES:
+            raise ValueError(
+                f"Unknown partition strategy {strategy!r}; "
+                f"expected one of {', '.join(PARTITION_STRATEGIES)}"
+            )
+        self.workers = workers or os.cpu_count() or 1
+        self._max_tasks_per_child = max_tasks_per_child
+        self._memory_limit_mb = memory_limit_mb
+        self._pages_per_task = max(1, pages_per_task)
+        self._split_min_pages = split_min_pages
+        self.strategy = strategy
+        self._fast_min_chars = fast_min_chars
+        self._fast_max_numeric_ratio = fast_max_numeric_ratio
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> PartitionPool:
+        """Build a pool from application ``Settings``."""
+        return cls(
+            workers=settings.PARTITION_WORKERS,
+            max_tasks_per_child=settings.PARTITION_MAX_TASKS_PER_CHILD,
+            memory_limit_mb=settings.PARTITION_MEMORY_LIMIT_MB,
+            pages_per_task=settings.PARTITION_PAGES_PER_TASK,
+            split_min_pages=settings.PARTITION_SPLIT_MIN_PAGES,
+            strategy=settings.PARTITION_STRATEGY,
+            fast_min_chars=settings.PARTITION_FAST_MIN_CHARS,
+            fast_max_numeric_ratio=settings.PARTITION_FAST_MAX_NUMERIC_RATIO,
+        )
+
+    def page_ranges(self, n_pages: int) -> list[tuple[int, int]]:
+        """1-based inclusive page ranges to partition in parallel.
+
+        A single range means "do not split": the document is small, or
+        there is only one worker.  Ranges are sized to keep every worker
+        busy, between ``_MIN_PAGES_PER_TASK`` and *pages_per_task* pages.
+        """
+        if (
+            self.workers < 2
+            or self._split_min_pages <= 0
+            or n_pages < max(self._split_min_pages, 2)
+        ):
+            return [(1, max(n_pages, 1))]
+        size = min(
+            self._pages_per_task,
+            max(_MIN_PAGES_PER_TASK, math.ceil(n_pages / self.workers)),
+        )
+        return [(first, min(first + size - 1, n_pages)) for first in range(1, n_pages + 1, size)]
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: the model libraries do not survive fork() with live threads,
+                # and max_tasks_per_child requires a non-fork context anyway
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_partition_worker,
+                    initargs=(self._memory_limit_mb,),
+                    max_tasks_per_child=self._max_tasks_per_child or None,
+                )
+                logger.info(
+                    "Partition pool started: %d worker(s), recycled every %s file(s), "
+                    "memory limit %s",
+                    self.workers,
+                    self._max_tasks_per_child or "∞",
+                    f"{self._memory_limit_mb} MiB" if self._memory_limit_mb else "none",
+                )
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run picklable *fn(*args, **kwargs)* in a worker process."""
+        pool = self._executor()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault) — later calls get a fresh pool
+            logger.error("Partition worker died; restarting the pool")
+            self._discard(pool)
+            raise
+
+    def cache_params(self) -> dict[str, Any]:
+        """Settings that change partition output (part of the partition cache key)."""
+        if self.strategy == "tiered":
+            return {
+                "strategy": self.strategy,
+                "fast_min_chars": self._fast_min_chars,
+                "fast_max_numeric_ratio": self._fast_max_numeric_ratio,
+            }
+        return {"strategy": self.strategy}
+
+    async def partition(
+        self, filepath: str, first_page: int = 1, last_page: int = 0
+    ) -> list[dict[str, Any]]:
+        """Partition a page range of *filepath* (``last_page=0`` = whole file) in a worker."""
+        if self.strategy == "tiered":
+            return await self.run(
+                partition_pdf_tiered,
+                filepath,
+                first_page,
+                last_page,
+                min_chars=self._fast_min_chars,
+                max_numeric_ratio=self._fast_max_numeric_ratio,
+            )
+        if last_page == 0:
+            return await self.run(partition_pdf_local, filepath)
+        return await self.run(partition_pdf_pages, filepath, first_page, last_page)
+
+    def close(self) -> None:
+        """Stop the workers (in-flight files are abandoned)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,322 @@
+"""Cache of vector search results with per-collection invalidation.
+
+Results of a single-collection similarity search are keyed by
+``(collection, sha256(query matrix), n_results, where, where_document)``
+so repeated queries (static framework queries, LLM-expanded chat queries,
+analytics ``search_vectors`` calls) skip the index entirely.
+
+Every collection has a *generation* counter that the vector stores bump
+after each add / delete / drop.  An entry is only served while the
+generation it was computed under is still current, so a write makes every
+cached result for that collection stale at once without scanning for
+them.  Entries also expire after *ttl* seconds, and the least-recently-used
+ones are evicted beyond *max_entries*.
+
+Two backends share the ``get`` / ``put`` / ``invalidate`` interface:
+
+- ``MemoryRetrievalCache`` — an in-process ``OrderedDict``; invalidations
+  are only seen by the process that made the write, so results written by
+  another worker or indexing script are served for up to *ttl* seconds.
+- ``SQLiteRetrievalCache`` — a SQLite file (WAL mode) shared by every
+  uvicorn worker and indexing script on the host, including the
+  generation counters.
+
+Hit / miss / stale / eviction counters are kept in-process and exposed via
+``stats()``.  All methods are synchronous and thread-safe; the shared
+backend is called from the default executor.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from app.services.sqlite_cache import EVICT_HEADROOM, CacheStats, SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    collection  TEXT    NOT NULL,
+    query_key   TEXT    NOT NULL,
+    generation  INTEGER NOT NULL,
+    result      TEXT    NOT NULL,
+    created_at  REAL    NOT NULL,
+    last_used   REAL    NOT NULL,
+    PRIMARY KEY (collection, query_key)
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS generations (
+    collection  TEXT    PRIMARY KEY,
+    generation  INTEGER NOT NULL
+);
+"""
+
+
+def query_key(
+    query_embeddings: np.ndarray | list[list[float]],
+    n_results: int,
+    where: dict[str, Any] | None = None,
+    where_document: dict[str, Any] | None = None,
+) -> str:
+    """Return the hex SHA-256 key of one search (collection excluded)."""
+    queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+    digest = hashlib.sha256(queries.tobytes())
+    digest.update(
+        json.dumps(
+            [queries.shape, n_results, where, where_document], sort_keys=True, default=str
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+class _CacheStats(CacheStats):
+    """Counters shared by both backends, plus stale reads and invalidations."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stale = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"stale": self.stale, "invalidations": self.invalidations, **super().as_dict()}
+
+
+class MemoryRetrievalCache:
+    """In-process LRU + TTL cache of search results.
+
+    Parameters
+    ----------
+    max_entries:
+        Maximum number of cached results.  ``0`` disables the cap.
+    ttl:
+        Seconds a result may be served (``0`` = until invalidated).
+    """
+
+    shared = False
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 600.0) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # (collection, key) -> (generation, created_at, serialised result)
+        self._entries: OrderedDict[tuple[str, str], tuple[int, float, str]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._stats = _CacheStats()
+
+    def generation(self, collection: str) -> int:
+        """Current generation of *collection* (read before running a search)."""
+        with self._lock:
+            return self._generations.get(collection, 0)
+
+    def get(self, collection: str, key: str) -> dict[str, Any] | None:
+        """Return the cached result for *key*, or ``None`` if absent or stale."""
+        with self._lock:
+            entry = self._entries.get((collection, key))
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            generation, created_at, payload = entry
+            if generation != self._generations.get(collection, 0) or self._expired(created_at):
+                del self._entries[(collection, key)]
+                self._stats.misses += 1
+                self._stats.stale += 1
+                return None
+            self._entries.move_to_end((collection, key))
+            self._stats.hits += 1
+        return json.loads(payload)
+
+    def put(self, collection: str, key: str, generation: int, result: dict[str, Any]) -> None:
+        """Store *result*, computed while *collection* was at *generation*."""
+        payload = json.dumps(result, default=str)
+        with self._lock:
+            if generation != self._generations.get(collection, 0):
+                return  # a write landed while the search ran
+            self._entries[(collection, key)] = (generation, time.time(), payload)
+            self._entries.move_to_end((collection, key))
+            if self._max_entries > 0 and len(self._entries) > self._max_entries:
+                target = int(self._max_entries * (1 - EVICT_HEADROOM))
+                excess = len(self._entries) - target
+                for _ in range(excess):
+                    self._entries.popitem(last=False)
+                self._stats.evictions += excess
+
+    def invalidate(self, collection: str) -> None:
+        """Make every cached result for *collection* stale."""
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            self._stats.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit / miss counters and the current entry count."""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl": self._ttl,
+                **self._stats.as_dict(),
+            }
+
+    def clear(self) -> None:
+        """Drop every cached result (counters and generations are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        self.clear()
+
+    def _expired(self, created_at: float) -> bool:
+        return self._ttl > 0 and time.time() - created_at > self._ttl
+
+
+class SQLiteRetrievalCache(SQLiteLRUCache):
+    """SQLite-backed LRU + TTL cache shared by every process on the host.
+
+    Parameters
+    ----------
+    path:
+        Filesystem path of the SQLite database.  Parent directories are
+        created if needed.
+    max_entries:
+        Maximum number of cached results.  ``0`` disables the cap.
+    ttl:
+        Seconds a result may be served (``0`` = until invalidated).
+    """
+
+    shared = True
+    _table = "results"
+    _schema = _SCHEMA
+    _label = "Retrieval cache"
+    _stats_class = _CacheStats
+
+    def __init__(
+        self,
+        path: str = "./cache/retrieval.sqlite3",
+        max_entries: int = 10_000,
+        ttl: float = 600.0,
+    ) -> None:
+        super().__init__(path, max_entries, timeout=30.0)
+        self._ttl = ttl
+        logger.info("Retrieval cache opened at %s (max %d entries)", self._path, max_entries)
+
+    def generation(self, collection: str) -> int:
+        """Current generation of *collection* (read before running a search)."""
+        with self._lock:
+            return self._generation_locked(collection)
+
+    def get(self, collection: str, key: str) -> dict[str, Any] | None:
+        """Return the cached result for *key*, or ``None`` if absent or stale."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.generation, r.created_at, r.result, COALESCE(g.generation, 0) "
+                "FROM results r LEFT JOIN generations g ON g.collection = r.collection "
+                "WHERE r.collection = ? AND r.query_key = ?",
+                (collection, key),
+            ).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+            generation, created_at, payload, current = row
+            now = time.time()
+            if generation != current or (self._ttl > 0 and now - created_at > self._ttl):
+                self._conn.execute(
+                    "DELETE FROM results WHERE collection = ? AND query_key = ?", (collection, key)
+                )
+                self._conn.commit()
+                self._stats.misses += 1
+                self._stats.stale += 1
+                return None
+            self._conn.execute(
+                "UPDATE results SET last_used = ? WHERE collection = ? AND query_key = ?",
+                (now, collection, key),
+            )
+            self._conn.commit()
+            self._stats.hits += 1
+        return json.loads(payload)
+
+    def put(self, collection: str, key: str, generation: int, result: dict[str, Any]) -> None:
+        """Store *result*, computed while *collection* was at *generation*."""
+        payload = json.dumps(result, default=str)
+        now = time.time()
+        with self._lock:
+            if generation != self._generation_locked(collection):
+                return  # a write landed while the search ran
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(collection, query_key, generation, result, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (collection, key, generation, payload, now, now),
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def invalidate(self, collection: str) -> None:
+        """Make every cached result for *collection* stale, in every process."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO generations (collection, generation) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET generation = generation + 1",
+                (collection,),
+            )
+            self._conn.execute("DELETE FROM results WHERE collection = ?", (collection,))
+            self._conn.commit()
+            self._stats.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit / miss counters and the current entry count."""
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": str(self._path),
+                "entries": self._count_locked(),
+                "max_entries": self._max_size,
+                "ttl": self._ttl,
+                **self._stats.as_dict(),
+            }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _generation_locked(self, collection: str) -> int:
+        row = self._conn.execute(
+            "SELECT generation FROM generations WHERE collection = ?", (collection,)
+        ).fetchone()
+        return row[0] if row else 0
+
+
+RetrievalCache = MemoryRetrievalCache | SQLiteRetrievalCache
+
+
+def build_retrieval_cache(settings: Any) -> RetrievalCache | None:
+    """Build the cache named by ``settings.RETRIEVAL_CACHE_BACKEND``.
+
+    ``none`` disables caching, ``memory`` is per-process and ``sqlite`` is
+    shared by every worker using the same ``RETRIEVAL_CACHE_PATH``.
+    """
+    backend = settings.RETRIEVAL_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryRetrievalCache(
+            max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+            ttl=settings.RETRIEVAL_CACHE_TTL,
+        )
+    if backend == "sqlite":
+        return SQLiteRetrievalCache(
+            path=settings.RETRIEVAL_CACHE_PATH,
+            max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+            ttl=settings.RETRIEVAL_CACHE_TTL,
+        )
+    raise ValueError(
+        f"Unknown RETRIEVAL_CACHE_BACKEND {settings.RETRIEVAL_CACHE_BACKEND!r} "
+        "(expected 'none', 'memory' or 'sqlite')"
+    )
@@ -0,0 +1,144 @@
+"""Shared scaffolding for the SQLite-backed LRU caches.
+
+``EmbeddingCache``, ``SQLiteRetrievalCache`` and ``PartitionCache`` each
+keep their entries in one SQLite file (WAL mode, so readers in other
+processes never block on a writer) behind a single ``threading.Lock``.
+Each table has a ``last_used`` column refreshed on every hit; beyond the
+cap the least-recently-used rows are evicted.  The cap counts rows, or
+sums a per-row size column when the subclass sets ``_size_column``.
+
+Subclasses provide the table name and schema and implement their own
+lookups and inserts, calling ``_evict_locked`` after each insert.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Eviction trims a little below the cap so we don't evict on every insert.
+EVICT_HEADROOM = 0.05
+
+
+class CacheStats:
+    """In-process lookup counters (caller holds the cache lock)."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SQLiteLRUCache:
+    """Base class: connection, lock, counters and LRU eviction.
+
+    Parameters
+    ----------
+    path:
+        Filesystem path of the SQLite database.  Parent directories are
+        created if needed.
+    max_size:
+        Cap on the row count, or on the sum of ``_size_column``.  ``0``
+        disables the cap.
+    timeout:
+        Seconds to wait for another process's write lock.
+    """
+
+    _table: str
+    _schema: str
+    _size_column: str | None = None
+    _label = "Cache"
+    _stats_class: type[CacheStats] = CacheStats
+
+    def __init__(self, path: str, max_size: int, *, timeout: float = 5.0) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._schema)
+        self._conn.commit()
+
+        self._stats = self._stats_class()
+
+    def clear(self) -> None:
+        """Drop every cached entry (counters are kept)."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _count_locked(self) -> int:
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()
+        return count
+
+    def _size_locked(self) -> tuple[int, int]:
+        """Return ``(rows, size)``; *size* is the row count without a size column."""
+        total = f"COALESCE(SUM({self._size_column}), 0)" if self._size_column else "COUNT(*)"
+        rows, size = self._conn.execute(
+            f"SELECT COUNT(*), {total} FROM {self._table}"
+        ).fetchone()
+        return rows, size
+
+    def _evict_locked(self) -> None:
+        """Delete least-recently-used rows beyond the cap (lock must be held)."""
+        if self._max_size <= 0:
+            return
+
+        _, size = self._size_locked()
+        if size <= self._max_size:
+            return
+
+        excess = size - int(self._max_size * (1 - EVICT_HEADROOM))
+        if self._size_column is None:
+            self._conn.execute(
+                f"DELETE FROM {self._table} WHERE rowid IN ("
+                f"SELECT rowid FROM {self._table} ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            evicted = freed = excess
+        else:
+            rowids: list[int] = []
+            freed = 0
+            for rowid, row_size in self._conn.execute(
+                f"SELECT rowid, {self._size_column} FROM {self._table} ORDER BY last_used ASC"
+            ):
+                if freed >= excess:
+                    break
+                rowids.append(rowid)
+                freed += row_size
+            self._conn.executemany(
+                f"DELETE FROM {self._table} WHERE rowid = ?", [(r,) for r in rowids]
+            )
+            evicted = len(rowids)
+        self._conn.commit()
+        self._stats.evictions += evicted
+        self._log_eviction(evicted, freed)
+
+    def _log_eviction(self, rows: int, size: int) -> None:
+        logger.info("%s evicted %d LRU entries", self._label, rows)
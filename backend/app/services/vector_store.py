@@ -12,20 +12,73 @@ Maintains separate collections for different document categories:
 All collections receive externally-generated embeddings (from
 ``EmbeddingService``) so ChromaDB never calls an embedding function
 itself.
+
+Collection handles are resolved once and cached, and each collection's
+document count is kept in memory (refreshed after every add / delete), so
+searches go straight to the index without extra metadata round trips.
+Counts written by other processes are picked up within ``_COUNT_TTL``.
+
+Filtered searches consult a per-collection ``ValueIndex`` over the
+indexed metadata fields (see ``metadata_index``): the ``where`` filter is
+rewritten into exact ``$in`` value lists so ChromaDB pre-selects the
+partition natively (``$contains`` on metadata works too), and filters
+matching nothing are confirmed by ChromaDB (or a fresh metadata scan when
+the filter uses ``$contains``) rather than trusted blindly.  The index is
+built on the first filtered query, maintained on add / delete, and rebuilt
+when the collection's shared write marker (``WriteMarkers``, bumped by
+every process writing through this service) shows writes from elsewhere.
+
+Every backend can carry a persistent BM25 index (``bm25_index``) built
+over the same chunk IDs at ingest time; ``hybrid_query`` fuses its ranking
+with vector search by reciprocal rank fusion.  ``mmr_rerank`` re-orders
+retrieved hits by maximal marginal relevance so near-duplicate chunks do
+not crowd out distinct ones.
+
+Single-collection searches can be served from a ``retrieval_cache``; every
+add / delete / drop bumps the collection's cache generation so stale
+results are never returned.
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import heapq
 import logging
+import re
+import threading
+import time
 from functools import partial
-from typing import Any
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Hashable
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
 
+from app.services.bm25_index import BM25Index
+from app.services.metadata_index import ValueIndex, WriteMarkers
+from app.services.retrieval_cache import RetrievalCache, build_retrieval_cache, query_key
+
 logger = logging.getLogger(__name__)
 
+# Cached counts are re-read at most this often on the read path, so writes
+# made by another process (e.g. ``scripts.index_compliance_rules``) are
+# picked up without a ``count()`` round trip on every search.
+_COUNT_TTL = 30.0  # seconds
+
+# Rows handed to a single ``collection.add`` call.  ChromaDB converts the
+# embedding matrix to Python lists internally, so writing in slices keeps
+# that transient copy small.
+_ADD_BATCH_SIZE = 1_000
+
+# Rows read per ``collection.get`` while building a metadata value index
+_INDEX_PAGE_SIZE = 5_000
+
+# Where operators ChromaDB evaluates on metadata itself
+_NATIVE_OPERATORS = frozenset({"$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin"})
+
 # ---------------------------------------------------------------------------
 # Collection definitions
 # ---------------------------------------------------------------------------
@@ -64,11 +117,49 @@ COLLECTIONS: dict[str, dict[str, Any]] = {
     },
 }
 
+# Metadata fields indexed in every collection on top of its metadata_fields
+_BASE_INDEXED_FIELDS = ("document_id", "source_file", "page_number", "element_type", "framework")
+
+
+# Per-document partitions (``VECTOR_DOCUMENT_PARTITIONS``) are collections
+# named ``docpart_<document_id>``; they are hidden from ``list_collections``
+PARTITION_PREFIX = "docpart_"
+
+
+def partition_name(document_id: str) -> str:
+    """Collection name of *document_id*'s partition (ChromaDB-safe)."""
+    safe = re.sub(r"[^A-Za-z0-9_-]", "-", document_id)
+    name = f"{PARTITION_PREFIX}{safe}"
+    if len(name) > 63 or not name[-1].isalnum():
+        name = PARTITION_PREFIX + hashlib.sha1(document_id.encode()).hexdigest()
+    return name
+
+
+def is_partition(collection_name: str) -> bool:
+    return collection_name.startswith(PARTITION_PREFIX)
+
+
+def indexed_fields(collection_name: str) -> tuple[str, ...]:
+    """Metadata fields the vector stores keep a secondary index on."""
+    declared = COLLECTIONS.get(collection_name, {}).get("metadata_fields", [])
+    return tuple(dict.fromkeys([*declared, *_BASE_INDEXED_FIELDS]))
+
 
 # ---------------------------------------------------------------------------
 # Sanitise helper — ChromaDB only accepts str/int/float/bool metadata values
 # ---------------------------------------------------------------------------
 
+def _is_native_where(where: dict[str, Any]) -> bool:
+    """Whether ChromaDB can evaluate *where* itself (no ``$contains`` on metadata)."""
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            if not all(_is_native_where(clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and not _NATIVE_OPERATORS.issuperset(condition):
+            return False
+    return True
+
+
 def _sanitise_metadata(meta: dict[str, Any]) -> dict[str, Any]:
     """Coerce metadata values to types ChromaDB accepts (str/int/float/bool).
 
@@ -89,24 +180,804 @@ def _sanitise_metadata(meta: dict[str, Any]) -> dict[str, Any]:
     return clean
 
 
+# ---------------------------------------------------------------------------
+# Result merging for multi-query search
+# ---------------------------------------------------------------------------
+
+def merge_hits(
+    per_query: list[list[dict[str, Any]]],
+    key: Callable[[dict[str, Any]], Hashable] | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Merge ``query_many`` results into one globally ranked list.
+
+    Hits sharing a *key* (default: collection + id) are collapsed to the
+    closest one.  Each returned hit gains a ``query_index`` field naming the
+    query that produced it.  Results are sorted by ascending distance and
+    truncated to *limit* when given.
+    """
+    if key is None:
+        key = lambda h: (h["collection"], h["id"])  # noqa: E731
+
+    best: dict[Hashable, dict[str, Any]] = {}
+    for qi, hits in enumerate(per_query):
+        for hit in hits:
+            k = key(hit)
+            current = best.get(k)
+            if current is None or hit["distance"] < current["distance"]:
+                best[k] = {**hit, "query_index": qi}
+
+    merged = sorted(best.values(), key=lambda h: h["distance"])
+    return merged[:limit] if limit is not None else merged
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: list[list[dict[str, Any]]],
+    key: Callable[[dict[str, Any]], Hashable] | None = None,
+    k: int = 60,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Fuse several ranked hit lists with reciprocal rank fusion.
+
+    A hit scores ``sum(1 / (k + rank))`` over the lists it appears in
+    (rank is 1-based; only its best rank per list counts).  Each returned
+    hit gains an ``rrf_score`` field; results are sorted by descending
+    score and truncated to *limit* when given.  Where the same key occurs
+    in several lists, the copy carrying a ``distance`` is kept.
+    """
+    if key is None:
+        key = lambda h: (h["collection"], h["id"])  # noqa: E731
+
+    scores: dict[Hashable, float] = {}
+    chosen: dict[Hashable, dict[str, Any]] = {}
+    for hits in ranked_lists:
+        seen: set[Hashable] = set()
+        for rank, hit in enumerate(hits, start=1):
+            k_ = key(hit)
+            if k_ in seen:
+                continue
+            seen.add(k_)
+            scores[k_] = scores.get(k_, 0.0) + 1.0 / (k + rank)
+            current = chosen.get(k_)
+            if current is None or (
+                current.get("distance") is None and hit.get("distance") is not None
+            ):
+                chosen[k_] = hit
+
+    fused = sorted(
+        ({**chosen[k_], "rrf_score": score} for k_, score in scores.items()),
+        key=lambda h: h["rrf_score"],
+        reverse=True,
+    )
+    return fused[:limit] if limit is not None else fused
+
+
+def mmr_select(
+    relevance: np.ndarray,
+    embeddings: np.ndarray,
+    k: int | None = None,
+    lambda_: float = 0.7,
+    redundancy_cutoff: float | None = None,
+) -> np.ndarray:
+    """Indices of up to *k* candidates in maximal-marginal-relevance order.
+
+    Each step picks the candidate maximising
+    ``lambda_ * relevance - (1 - lambda_) * max_cosine_to_selected``.  The
+    similarity to the selected set is kept as one running maximum, so every
+    step costs a single matrix-vector product over the candidate matrix.
+    Candidates whose cosine similarity to an already selected one reaches
+    *redundancy_cutoff* are dropped altogether.
+    """
+    n = len(relevance)
+    k = n if k is None else min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    unit = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(unit, axis=1, keepdims=True)
+    unit = np.divide(unit, norms, out=np.zeros_like(unit), where=norms > 0)
+    relevance = np.asarray(relevance, dtype=np.float32)
+
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: list[int] = []
+    while len(selected) < k and available.any():
+        penalty = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        score = lambda_ * relevance - (1.0 - lambda_) * penalty
+        score[~available] = -np.inf
+        best = int(np.argmax(score))
+        selected.append(best)
+        available[best] = False
+        max_sim = np.maximum(max_sim, unit @ unit[best])
+        if redundancy_cutoff is not None:
+            available &= max_sim < redundancy_cutoff
+    return np.asarray(selected, dtype=np.intp)
+
+
+def mmr_rerank(
+    hits: list[dict[str, Any]],
+    embeddings: np.ndarray,
+    k: int | None = None,
+    lambda_: float = 0.7,
+    relevance: np.ndarray | list[float] | None = None,
+    redundancy_cutoff: float | None = None,
+) -> list[dict[str, Any]]:
+    """Re-order *hits* (row *i* of *embeddings* is ``hits[i]``) by MMR.
+
+    Relevance defaults to the cosine similarity implied by each hit's
+    squared-L2 ``distance`` on unit vectors (``1 - distance / 2``), which is
+    on the same scale as the redundancy penalty.  See ``mmr_select``.
+    """
+    if not hits:
+        return []
+    if relevance is None:
+        relevance = np.asarray(
+            [1.0 - h["distance"] / 2.0 if h.get("distance") is not None else 0.0 for h in hits],
+            dtype=np.float32,
+        )
+    order = mmr_select(
+        np.asarray(relevance, dtype=np.float32),
+        embeddings,
+        k=k,
+        lambda_=lambda_,
+        redundancy_cutoff=redundancy_cutoff,
+    )
+    return [hits[i] for i in order]
+
+
+# ---------------------------------------------------------------------------
+# Search front-end shared by every vector store backend
+# ---------------------------------------------------------------------------
+
+class _SearchMixin:
+    """``query`` / ``query_many`` / ``hybrid_query`` shared by the backends.
+
+    A backend implements ``_query_raw(collection_name, query_embeddings,
+    n_results, where=None, where_document=None)`` returning a
+    ChromaDB-shaped ``query()`` result, and ``_get_raw(...)`` returning a
+    ChromaDB-shaped ``get()`` result.  It keeps ``_keyword_index`` (a
+    ``BM25Index`` or ``None``) in sync by calling ``_index_keywords`` /
+    ``_unindex_keywords`` from its add and delete paths, and calls
+    ``_invalidate_results`` after every write so the optional
+    ``_retrieval_cache`` never serves results from before it.
+    """
+
+    _keyword_index: BM25Index | None = None
+    _retrieval_cache: RetrievalCache | None = None
+    _document_partitions = False
+    # Per-collection query timeout (seconds) and concurrent collection
+    # queries per ``query_many`` call; ``None`` means unbounded
+    _search_timeout: float | None = None
+    _search_concurrency: int | None = None
+
+    async def _get_raw(
+        self,
+        collection_name: str,
+        ids: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        include_embeddings: bool = False,
+    ) -> dict[str, Any]:
+        raise NotImplementedError
+
+    async def _substring_search(
+        self,
+        collection_name: str,
+        keyword: str,
+        n_results: int,
+        where: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def _has_collection(self, collection_name: str) -> bool:
+        raise NotImplementedError
+
+    async def _drop_collection(self, collection_name: str) -> None:
+        raise NotImplementedError
+
+    async def _query_raw(
+        self,
+        collection_name: str,
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int,
+        where: dict[str, Any] | None = None,
+        where_document: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        raise NotImplementedError
+
+    async def query(
+        self,
+        collection_name: str,
+        query_embedding: list[float],
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+        where_document: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Run a similarity search against *collection_name*.
+
+        Returns a dict mirroring ChromaDB's ``query()`` output with keys
+        ``ids``, ``documents``, ``metadatas``, ``distances``.
+        """
+        return await self._query_cached(
+            collection_name,
+            [query_embedding],
+            n_results,
+            where=where,
+            where_document=where_document,
+        )
+
+    async def query_many(
+        self,
+        collection_names: list[str],
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+        where_by_collection: dict[str, dict[str, Any] | None] | None = None,
+        fallback_unfiltered: bool = False,
+        limit: int | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Search every collection with every query vector in one pass.
+
+        Each collection receives a single ``query()`` carrying all query
+        embeddings.  Collections are searched concurrently (at most
+        ``_search_concurrency`` at a time), each under ``_search_timeout``:
+        a collection that fails or times out contributes no hits instead
+        of failing or stalling the whole search.  The per-collection
+        rankings are combined with a k-way heap merge.
+
+        Parameters
+        ----------
+        collection_names:
+            Collections to search.
+        query_embeddings:
+            ``(n_queries, dim)`` matrix (or list of vectors).
+        n_results:
+            Hits per query *per collection*.
+        where:
+            Metadata filter applied to every collection.
+        where_by_collection:
+            Per-collection filter overriding *where* (``None`` values mean
+            "no filter" for that collection).
+        fallback_unfiltered:
+            Retry a collection without its filter if the filtered query
+            raises (e.g. the metadata field is missing).
+        limit:
+            Keep only the *limit* closest hits per query (across all
+            collections).
+
+        Returns
+        -------
+        list[list[dict]]
+            One list per query, in input order, of hits
+            ``{"id", "text", "metadata", "distance", "collection"}`` sorted
+            by ascending distance.  Failed collections contribute no hits.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[np.newaxis, :]
+        hits: list[list[dict[str, Any]]] = [[] for _ in range(len(queries))]
+        if not len(queries) or not collection_names:
+            return hits
+
+        overrides = where_by_collection or {}
+        filters = [overrides.get(name, where) for name in collection_names]
+        semaphore = asyncio.Semaphore(self._search_concurrency or len(collection_names))
+        results = await asyncio.gather(
+            *(
+                self._query_collection_bounded(
+                    semaphore, name, queries, n_results, flt, fallback_unfiltered
+                )
+                for name, flt in zip(collection_names, filters)
+            )
+        )
+
+        # per_collection[c][q] — one distance-sorted run per collection
+        per_collection: list[list[list[dict[str, Any]]]] = []
+        for name, raw in zip(collection_names, results):
+            if raw is None:
+                continue
+            runs = []
+            for ids, docs, metas, dists in zip(
+                raw["ids"], raw["documents"], raw["metadatas"], raw["distances"]
+            ):
+                run = [
+                    {
+                        "id": chunk_id,
+                        "text": text,
+                        "metadata": meta or {},
+                        "distance": dist,
+                        "collection": name,
+                    }
+                    for chunk_id, text, meta, dist in zip(ids, docs, metas, dists)
+                ]
+                run.sort(key=lambda h: h["distance"])
+                runs.append(run)
+            per_collection.append(runs)
+
+        for qi in range(len(queries)):
+            merged = heapq.merge(
+                *(runs[qi] for runs in per_collection), key=lambda h: h["distance"]
+            )
+            hits[qi] = list(islice(merged, limit))
+        return hits
+
+    async def _query_collection_bounded(
+        self,
+        semaphore: asyncio.Semaphore,
+        collection_name: str,
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int,
+        where: dict[str, Any] | None,
+        fallback_unfiltered: bool,
+    ) -> dict[str, Any] | None:
+        """``_query_collection_safe`` under the concurrency limit and timeout."""
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._query_collection_safe(
+                        collection_name, query_embeddings, n_results, where, fallback_unfiltered
+                    ),
+                    timeout=self._search_timeout,
+                )
+            except asyncio.TimeoutError:
+                # The worker thread finishes in the background; its result is dropped
+                logger.warning(
+                    "Query on collection '%s' timed out after %.1fs — returning partial results",
+                    collection_name,
+                    self._search_timeout,
+                )
+                return None
+
+    async def _query_collection_safe(
+        self,
+        collection_name: str,
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int,
+        where: dict[str, Any] | None,
+        fallback_unfiltered: bool,
+    ) -> dict[str, Any] | None:
+        """``_query_raw`` that logs failures instead of raising."""
+        try:
+            return await self._query_cached(
+                collection_name, query_embeddings, n_results, where=where
+            )
+        except Exception:
+            if not (where and fallback_unfiltered):
+                logger.warning("Query failed on collection '%s'", collection_name, exc_info=True)
+                return None
+        # Filtered query failed — metadata might not match; retry unfiltered
+        try:
+            return await self._query_cached(collection_name, query_embeddings, n_results)
+        except Exception:
+            logger.warning("Query failed on collection '%s'", collection_name, exc_info=True)
+            return None
+
+    # ------------------------------------------------------------------
+    # Result cache
+    # ------------------------------------------------------------------
+
+    async def _query_cached(
+        self,
+        collection_name: str,
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int,
+        where: dict[str, Any] | None = None,
+        where_document: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """``_query_raw`` behind the retrieval cache (when configured)."""
+        cache = self._retrieval_cache
+        if cache is None:
+            return await self._query_raw(
+                collection_name, query_embeddings, n_results,
+                where=where, where_document=where_document,
+            )
+
+        key = query_key(query_embeddings, n_results, where, where_document)
+        generation = await self._cache_call(cache.generation, collection_name)
+        cached = await self._cache_call(cache.get, collection_name, key)
+        if cached is not None:
+            return cached
+        result = await self._query_raw(
+            collection_name, query_embeddings, n_results,
+            where=where, where_document=where_document,
+        )
+        # Stored under the generation read *before* the search, so a write
+        # that lands meanwhile makes this entry stale rather than current
+        await self._cache_call(cache.put, collection_name, key, generation, result)
+        return result
+
+    async def _cache_call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # The shared (SQLite) cache does file I/O — keep it off the event loop
+        assert self._retrieval_cache is not None
+        if not self._retrieval_cache.shared:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+    async def _invalidate_results(self, collection_name: str) -> None:
+        if self._retrieval_cache is not None:
+            await self._cache_call(self._retrieval_cache.invalidate, collection_name)
+
+    def retrieval_cache_stats(self) -> dict[str, Any] | None:
+        """Return retrieval cache counters (*None* when caching is off)."""
+        return self._retrieval_cache.stats() if self._retrieval_cache is not None else None
+
+    async def fetch_embeddings(self, hits: list[dict[str, Any]]) -> np.ndarray:
+        """Stored vectors of *hits* as a ``(len(hits), dim)`` float32 matrix.
+
+        Vectors are looked up by ID, one ``get`` per collection.  Rows of
+        hits whose vector is missing (deleted meanwhile) are zero.
+        """
+        if not hits:
+            return np.empty((0, 0), dtype=np.float32)
+
+        by_collection: dict[str, dict[str, None]] = {}
+        for hit in hits:
+            by_collection.setdefault(hit["collection"], {})[hit["id"]] = None
+        names = list(by_collection)
+        raws = await asyncio.gather(
+            *(
+                self._get_raw(name, ids=list(by_collection[name]), include_embeddings=True)
+                for name in names
+            )
+        )
+
+        vectors: dict[tuple[str, str], np.ndarray] = {}
+        for name, raw in zip(names, raws):
+            embeddings = raw.get("embeddings")
+            if embeddings is None:
+                continue
+            for chunk_id, vector in zip(raw["ids"], embeddings):
+                vectors[(name, chunk_id)] = np.asarray(vector, dtype=np.float32)
+        if not vectors:
+            return np.zeros((len(hits), 0), dtype=np.float32)
+
+        dim = len(next(iter(vectors.values())))
+        matrix = np.zeros((len(hits), dim), dtype=np.float32)
+        for i, hit in enumerate(hits):
+            vector = vectors.get((hit["collection"], hit["id"]))
+            if vector is not None:
+                matrix[i] = vector
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Keyword (BM25) and hybrid search
+    # ------------------------------------------------------------------
+
+    async def _index_keywords(self, collection_name: str, ids: list[str], texts: list[str]) -> None:
+        # Partitions duplicate chunks of the shared collection — not indexed twice
+        if self._keyword_index is not None and ids and not is_partition(collection_name):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self._keyword_index.add, collection_name, ids, texts
+            )
+
+    async def _unindex_keywords(self, collection_name: str, ids: list[str]) -> None:
+        if self._keyword_index is not None and ids:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self._keyword_index.remove, collection_name, ids
+            )
+
+    async def keyword_hits(
+        self,
+        collection_names: list[str],
+        query_text: str,
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+        where_by_collection: dict[str, dict[str, Any] | None] | None = None,
+        query_embedding: np.ndarray | list[float] | None = None,
+    ) -> list[dict[str, Any]]:
+        """BM25-ranked hits for *query_text* across *collection_names*.
+
+        Returns hits shaped like ``query_many``'s plus a ``bm25`` score,
+        best first.  When *query_embedding* is given each hit also carries
+        its exact squared-L2 ``distance`` to it (otherwise ``None``), so
+        keyword hits can be thresholded like vector hits.  Filters are
+        applied after BM25 ranking, so filtered collections fetch extra
+        candidates.  Returns ``[]`` when no keyword index is configured.
+        """
+        if self._keyword_index is None or not query_text.strip():
+            return []
+
+        overrides = where_by_collection or {}
+        query = (
+            None
+            if query_embedding is None
+            else np.asarray(query_embedding, dtype=np.float32).ravel()
+        )
+        index = self._keyword_index
+        loop = asyncio.get_running_loop()
+
+        async def _one(name: str) -> list[dict[str, Any]]:
+            flt = overrides.get(name, where)
+            candidates = n_results * 4 if flt else n_results
+            try:
+                ranked = await loop.run_in_executor(
+                    None, index.search, name, query_text, candidates
+                )
+                if not ranked:
+                    return []
+                raw = await self._get_raw(
+                    name,
+                    ids=[chunk_id for chunk_id, _ in ranked],
+                    where=flt,
+                    include_embeddings=query is not None,
+                )
+            except Exception:
+                logger.warning("Keyword search failed on collection '%s'", name, exc_info=True)
+                return []
+
+            embeddings = raw.get("embeddings")
+            found = {
+                chunk_id: (
+                    text,
+                    meta,
+                    None if query is None else np.asarray(embeddings[i], dtype=np.float32),
+                )
+                for i, (chunk_id, text, meta) in enumerate(
+                    zip(raw["ids"], raw["documents"], raw["metadatas"])
+                )
+            }
+            hits = []
+            for chunk_id, score in ranked:
+                if chunk_id not in found:
+                    continue  # filtered out, or index ahead of the store
+                text, meta, vector = found[chunk_id]
+                hits.append({
+                    "id": chunk_id,
+                    "text": text,
+                    "metadata": meta or {},
+                    "distance": None if vector is None else float(np.sum((vector - query) ** 2)),
+                    "collection": name,
+                    "bm25": score,
+                })
+                if len(hits) == n_results:
+                    break
+            return hits
+
+        per_collection = await asyncio.gather(*(_one(name) for name in collection_names))
+        merged = [hit for hits in per_collection for hit in hits]
+        merged.sort(key=lambda h: h["bm25"], reverse=True)
+        return merged
+
+    async def hybrid_query(
+        self,
+        collection_names: list[str],
+        query_text: str,
+        query_embedding: np.ndarray | list[float],
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+        where_by_collection: dict[str, dict[str, Any] | None] | None = None,
+        rrf_k: int = 60,
+    ) -> list[dict[str, Any]]:
+        """Vector + BM25 search fused with reciprocal rank fusion.
+
+        Parameters
+        ----------
+        collection_names:
+            Collections to search.
+        query_text:
+            Raw query for the BM25 side.
+        query_embedding:
+            Embedding of *query_text* for the vector side.
+        n_results:
+            Hits returned (and candidates fetched per side, per collection).
+        where / where_by_collection:
+            Metadata filters, as in ``query_many``.
+        rrf_k:
+            RRF damping constant; larger values flatten rank differences.
+
+        Returns
+        -------
+        list[dict]
+            Hits shaped like ``query_many``'s (``distance`` always set) plus
+            ``rrf_score`` and, for keyword matches, ``bm25`` — best first.
+        """
+        vector_hits, keyword_hits = await asyncio.gather(
+            self.query_many(
+                collection_names,
+                [query_embedding],
+                n_results=n_results,
+                where=where,
+                where_by_collection=where_by_collection,
+            ),
+            self.keyword_hits(
+                collection_names,
+                query_text,
+                n_results=n_results,
+                where=where,
+                where_by_collection=where_by_collection,
+                query_embedding=query_embedding,
+            ),
+        )
+        return reciprocal_rank_fusion(
+            [vector_hits[0], keyword_hits], k=rrf_k, limit=n_results
+        )
+
+    async def keyword_search(
+        self,
+        collection_name: str,
+        keyword: str,
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """BM25-ranked keyword search over one collection.
+
+        Returns a ChromaDB ``get()``-shaped dict (``ids``, ``documents``,
+        ``metadatas``) plus ``scores``.  Without a keyword index this falls
+        back to an unranked substring scan.
+        """
+        if self._keyword_index is None:
+            return await self._substring_search(collection_name, keyword, n_results, where)
+        hits = await self.keyword_hits([collection_name], keyword, n_results, where=where)
+        return {
+            "ids": [h["id"] for h in hits],
+            "documents": [h["text"] for h in hits],
+            "metadatas": [h["metadata"] for h in hits],
+            "scores": [h["bm25"] for h in hits],
+        }
+
+    async def backfill_keyword_index(self, batch_size: int = 1_000) -> int:
+        """Index chunks stored before the keyword index existed.
+
+        Collections whose BM25 index holds fewer chunks than the vector
+        store are re-read in pages and (re-)indexed.  Returns the number of
+        chunks indexed.
+        """
+        if self._keyword_index is None:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        total = 0
+        for name in await loop.run_in_executor(None, self.list_collections):
+            stats = await loop.run_in_executor(None, self.get_collection_stats, name)
+            stored = stats["count"]
+            indexed = await loop.run_in_executor(None, self._keyword_index.count, name)
+            if indexed >= stored:
+                continue
+            logger.info(
+                "Backfilling keyword index for '%s' (%d of %d chunks indexed)",
+                name, indexed, stored,
+            )
+            offset = 0
+            while True:
+                page = await self._get_raw(name, limit=batch_size, offset=offset)
+                if not page["ids"]:
+                    break
+                await self._index_keywords(name, page["ids"], page["documents"])
+                offset += len(page["ids"])
+            total += offset
+        return total
+
+    # ------------------------------------------------------------------
+    # Per-document partitions
+    # ------------------------------------------------------------------
+
+    async def write_document_partition(
+        self,
+        document_id: str,
+        chunks: list[dict[str, Any]],
+        embeddings: np.ndarray | None = None,
+    ) -> int:
+        """(Re)write *document_id*'s partition; no-op unless partitions are on.
+
+        The chunks are expected to be stored in the shared collection as
+        well — the partition is a small private index over the same IDs.
+        """
+        if not self._document_partitions or not chunks:
+            return 0
+        name = partition_name(document_id)
+        if self._has_collection(name):
+            await self._drop_collection(name)
+        return await self.add_documents(name, chunks, embeddings=embeddings)
+
+    async def append_document_partition(
+        self,
+        document_id: str,
+        chunks: list[dict[str, Any]],
+        embeddings: np.ndarray | None = None,
+    ) -> int:
+        """Add *chunks* to *document_id*'s partition without dropping it first.
+
+        Used by streaming ingest, which writes a document in batches after
+        ``drop_document``.  No-op unless partitions are on.
+        """
+        if not self._document_partitions or not chunks:
+            return 0
+        return await self.add_documents(partition_name(document_id), chunks, embeddings=embeddings)
+
+    async def query_document(
+        self,
+        document_id: str,
+        query_embedding: list[float],
+        n_results: int = 10,
+        collection_name: str = "financial_documents",
+    ) -> dict[str, Any]:
+        """Similarity search restricted to one document's chunks.
+
+        Searches the document's partition when it exists, otherwise the
+        shared *collection_name* filtered by ``document_id`` (served by the
+        metadata index).  Returns a ChromaDB ``query()``-shaped result.
+        """
+        name = partition_name(document_id)
+        if self._document_partitions and self._has_collection(name):
+            return await self._query_cached(name, [query_embedding], n_results)
+        return await self._query_cached(
+            collection_name, [query_embedding], n_results, where={"document_id": document_id}
+        )
+
+    async def drop_document(
+        self,
+        document_id: str,
+        collection_name: str = "financial_documents",
+    ) -> int:
+        """Remove *document_id*'s partition and its chunks in *collection_name*.
+
+        Dropping the partition is a single collection delete; the shared
+        collection is cleaned by ``document_id``.  Returns the number of
+        chunks deleted from the shared collection.
+        """
+        name = partition_name(document_id)
+        if self._has_collection(name):
+            await self._drop_collection(name)
+            logger.info("Dropped partition '%s'", name)
+        return await self.delete_by_metadata(collection_name, {"document_id": document_id})
+
+
 # ---------------------------------------------------------------------------
 # Service
 # ---------------------------------------------------------------------------
 
-class VectorStoreService:
+class VectorStoreService(_SearchMixin):
     """Multi-collection ChromaDB vector store.
 
     Parameters
     ----------
     persist_dir:
         Filesystem path for ChromaDB's persistent storage.
+    keyword_index:
+        Optional ``BM25Index`` kept in sync with every add / delete and
+        used by ``keyword_search`` / ``hybrid_query``.
+    search_timeout:
+        Seconds a single collection may take inside ``query_many`` before
+        it is skipped (``None`` = no limit).
+    search_concurrency:
+        Collections queried at once by ``query_many`` (``None`` = all).
+    document_partitions:
+        Also store each ingested document in its own ``docpart_*``
+        collection (see ``write_document_partition``).
+    retrieval_cache:
+        Optional cache of search results (see ``retrieval_cache``),
+        invalidated per collection on every write.
     """
 
-    def __init__(self, persist_dir: str = "./chroma_db") -> None:
+    def __init__(
+        self,
+        persist_dir: str = "./chroma_db",
+        keyword_index: BM25Index | None = None,
+        search_timeout: float | None = None,
+        search_concurrency: int | None = None,
+        document_partitions: bool = False,
+        retrieval_cache: RetrievalCache | None = None,
+    ) -> None:
+        self._keyword_index = keyword_index
+        self._retrieval_cache = retrieval_cache
+        self._document_partitions = document_partitions
+        self._search_timeout = search_timeout
+        self._search_concurrency = search_concurrency
         self._client = chromadb.PersistentClient(
             path=persist_dir,
             settings=ChromaSettings(anonymized_telemetry=False),
         )
+        self._collections: dict[str, Any] = {}
+        self._counts: dict[str, tuple[int, float]] = {}
+        self._value_indexes: dict[str, ValueIndex] = {}
+        self._index_scanned_at: dict[str, float] = {}
+        self._markers = WriteMarkers(str(Path(persist_dir) / "write_markers.sqlite3"))
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
         self._init_collections()
 
     # ------------------------------------------------------------------
@@ -116,16 +987,171 @@ class VectorStoreService:
     def _init_collections(self) -> None:
         """Ensure all predefined collections exist."""
         for name, config in COLLECTIONS.items():
-            self._client.get_or_create_collection(
+            collection = self._client.get_or_create_collection(
                 name=name,
                 metadata={"description": config["description"]},
                 embedding_function=None,  # we supply our own embeddings
             )
+            self._collections[name] = collection
+            self._counts[name] = (collection.count(), time.monotonic())
         logger.info(
             "ChromaDB initialised with collections: %s",
             list(COLLECTIONS.keys()),
         )
 
+    def _collection(self, name: str) -> Any:
+        """Return the cached handle for *name*, creating the collection once."""
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = self._client.get_or_create_collection(
+                        name=name,
+                        embedding_function=None,
+                    )
+                    self._collections[name] = collection
+                    self._counts[name] = (collection.count(), time.monotonic())
+        return collection
+
+    def _count(self, name: str) -> int:
+        """Return the in-memory document count for *name*."""
+        self._collection(name)
+        count, read_at = self._counts[name]
+        if time.monotonic() - read_at > _COUNT_TTL:
+            count = self._refresh_count(name)
+        return count
+
+    def _refresh_count(self, name: str) -> int:
+        """Re-read the document count from ChromaDB (after writes)."""
+        count = self._collection(name).count()
+        self._counts[name] = (count, time.monotonic())
+        return count
+
+    # ------------------------------------------------------------------
+    # Metadata value index
+    # ------------------------------------------------------------------
+
+    def _has_collection(self, name: str) -> bool:
+        if name in self._collections:
+            return True
+        try:
+            self._client.get_collection(name=name, embedding_function=None)
+        except Exception:  # chromadb raises ValueError / InvalidCollectionException
+            return False
+        return True
+
+    async def _drop_collection(self, name: str) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._collections.pop(name, None)
+            self._counts.pop(name, None)
+            self._value_indexes.pop(name, None)
+            self._index_scanned_at.pop(name, None)
+        try:
+            await loop.run_in_executor(None, partial(self._client.delete_collection, name=name))
+        except ValueError:
+            pass  # already gone
+        await loop.run_in_executor(None, self._markers.bump, name)
+        await self._invalidate_results(name)
+
+    def _value_index(self, name: str, rescan: bool = False) -> ValueIndex:
+        """Return the value index of *name*, (re)building it when stale.
+
+        The index is stale once the collection's write marker moves past
+        the one it was built under.  *rescan* also rebuilds an index last
+        scanned more than ``_COUNT_TTL`` ago, catching writes that bypassed
+        the markers.
+        """
+        collection = self._collection(name)
+        if rescan:
+            rescan = time.monotonic() - self._index_scanned_at.get(name, 0.0) > _COUNT_TTL
+        generation = self._markers.current(name)
+        index = self._value_indexes.get(name)
+        if not rescan and index is not None and index.generation == generation:
+            return index
+        with self._index_lock:
+            generation = self._markers.current(name)
+            index = self._value_indexes.get(name)
+            if not rescan and index is not None and index.generation == generation:
+                return index
+            # Marker read before the scan: a write landing meanwhile bumps
+            # it again, so the next lookup rebuilds
+            index = ValueIndex(indexed_fields(name), generation)
+            offset = 0
+            while True:
+                page = collection.get(include=["metadatas"], limit=_INDEX_PAGE_SIZE, offset=offset)
+                if not page["ids"]:
+                    break
+                index.add(page["metadatas"])
+                offset += len(page["ids"])
+            self._value_indexes[name] = index
+            self._index_scanned_at[name] = time.monotonic()
+        logger.info("Built metadata index for '%s' (%d rows)", name, index.size)
+        return index
+
+    def _resolve_where(
+        self, name: str, where: dict[str, Any] | None
+    ) -> tuple[dict[str, Any] | None, int | None]:
+        """Rewrite *where* for ChromaDB via the value index.
+
+        Returns ``(native_where, bound)``: ``native_where`` is ``None`` when
+        there is no filter left to apply, and ``bound`` is ``0`` when the
+        filter matches nothing (``None`` when unfiltered or unbounded).
+
+        An empty partition is never taken from the index alone: filters
+        ChromaDB can evaluate are passed through unchanged for it to
+        confirm, others (``$contains``) are re-resolved on a fresh scan.
+        """
+        if not where:
+            return None, None
+        native, bound = self._value_index(name).rewrite(where)
+        if bound == 0:
+            if _is_native_where(where):
+                if len(where) > 1:
+                    where = {"$and": [{key: value} for key, value in where.items()]}
+                return where, None
+            native, bound = self._value_index(name, rescan=True).rewrite(where)
+        return native or None, bound
+
+    def _add_batch(
+        self,
+        name: str,
+        ids: list[str],
+        embeddings: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        collection = self._collection(name)
+        index = self._value_indexes.get(name)
+        # ChromaDB skips existing IDs — only count rows that are really new
+        existing = set(collection.get(ids=ids, include=[])["ids"]) if index is not None else set()
+        collection.add(
+            ids=ids,
+            embeddings=embeddings.astype(np.float32, copy=False),
+            documents=documents,
+            metadatas=metadatas,
+        )
+        with self._index_lock:
+            generation = self._markers.bump(name)
+            # Kept up to date only if no other process wrote since it was built
+            if index is not None and index.generation == generation - 1:
+                index.add([m for i, m in zip(ids, metadatas) if i not in existing])
+                index.generation = generation
+
+    def _delete_ids(self, name: str, ids: list[str]) -> None:
+        collection = self._collection(name)
+        index = self._value_indexes.get(name)
+        removed = (
+            collection.get(ids=ids, include=["metadatas"])["metadatas"] if index is not None else []
+        )
+        collection.delete(ids=ids)
+        with self._index_lock:
+            generation = self._markers.bump(name)
+            if index is not None and index.generation == generation - 1:
+                index.remove(removed)
+                index.generation = generation
+
     # ------------------------------------------------------------------
     # Add
     # ------------------------------------------------------------------
@@ -134,41 +1160,51 @@ class VectorStoreService:
         self,
         collection_name: str,
         chunks: list[dict[str, Any]],
+        embeddings: np.ndarray | None = None,
     ) -> int:
         """Add pre-embedded chunks to *collection_name*.
 
         Each dict in *chunks* must contain:
         - ``id`` — unique string
         - ``text`` — the document text
-        - ``embedding`` — ``list[float]``
+        - ``embedding`` — ``list[float]`` (only when *embeddings* is None)
         - ``metadata`` — dict of metadata fields
 
+        *embeddings* is an optional ``(len(chunks), dim)`` matrix from
+        ``EmbeddingService.embed_matrix``; row *i* belongs to ``chunks[i]``.
+
         Returns the number of chunks inserted.
         """
         if not chunks:
             return 0
 
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
-        )
+        if embeddings is None:
+            embeddings = np.asarray([c["embedding"] for c in chunks], dtype=np.float32)
+        elif len(embeddings) != len(chunks):
+            raise ValueError(
+                f"Got {len(embeddings)} embeddings for {len(chunks)} chunks"
+            )
 
         ids = [c["id"] for c in chunks]
-        embeddings = [c["embedding"] for c in chunks]
         documents = [c["text"] for c in chunks]
         metadatas = [_sanitise_metadata(c.get("metadata", {})) for c in chunks]
 
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            partial(
-                collection.add,
-                ids=ids,
-                embeddings=embeddings,
-                documents=documents,
-                metadatas=metadatas,
-            ),
-        )
+        for start in range(0, len(ids), _ADD_BATCH_SIZE):
+            end = start + _ADD_BATCH_SIZE
+            await loop.run_in_executor(
+                None,
+                self._add_batch,
+                collection_name,
+                ids[start:end],
+                embeddings[start:end],
+                documents[start:end],
+                metadatas[start:end],
+            )
+        # Exact count (ChromaDB skips IDs that already exist)
+        await loop.run_in_executor(None, self._refresh_count, collection_name)
+        await self._invalidate_results(collection_name)
+        await self._index_keywords(collection_name, ids, documents)
 
         logger.info(
             "Added %d chunks to collection '%s'", len(ids), collection_name
@@ -179,35 +1215,46 @@ class VectorStoreService:
     # Query
     # ------------------------------------------------------------------
 
-    async def query(
+    async def _query_raw(
         self,
         collection_name: str,
-        query_embedding: list[float],
-        n_results: int = 10,
+        query_embeddings: np.ndarray | list[list[float]],
+        n_results: int,
         where: dict[str, Any] | None = None,
         where_document: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        """Run a similarity search against *collection_name*.
+        """Single ChromaDB ``query()`` call for one or more embeddings."""
+        collection = self._collection(collection_name)
+        loop = asyncio.get_running_loop()
 
-        Returns a dict mirroring ChromaDB's ``query()`` output with keys
-        ``ids``, ``documents``, ``metadatas``, ``distances``.
-        """
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
-        )
+        native_where, bound = (None, None)
+        if where:
+            native_where, bound = await loop.run_in_executor(
+                None, self._resolve_where, collection_name, where
+            )
+            if bound == 0:
+                empty: list[list[Any]] = [[] for _ in range(len(query_embeddings))]
+                return {
+                    "ids": empty,
+                    "documents": empty,
+                    "metadatas": empty,
+                    "distances": empty,
+                    "embeddings": None,
+                }
 
+        limit = self._count(collection_name) or n_results
+        if bound is not None:
+            limit = min(limit, bound)
         kwargs: dict[str, Any] = {
-            "query_embeddings": [query_embedding],
-            "n_results": min(n_results, collection.count() or n_results),
+            "query_embeddings": query_embeddings,
+            "n_results": min(n_results, limit),
             "include": ["documents", "metadatas", "distances"],
         }
-        if where:
-            kwargs["where"] = where
+        if native_where:
+            kwargs["where"] = native_where
         if where_document:
             kwargs["where_document"] = where_document
 
-        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
             None,
             partial(collection.query, **kwargs),
@@ -224,15 +1271,11 @@ class VectorStoreService:
         """Delete documents from a collection by ID."""
         if not ids:
             return
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
-        )
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            partial(collection.delete, ids=ids),
-        )
+        await loop.run_in_executor(None, self._delete_ids, collection_name, ids)
+        await loop.run_in_executor(None, self._refresh_count, collection_name)
+        await self._invalidate_results(collection_name)
+        await self._unindex_keywords(collection_name, ids)
         logger.info(
             "Deleted %d documents from collection '%s'", len(ids), collection_name
         )
@@ -246,17 +1289,8 @@ class VectorStoreService:
 
         Returns the number of deleted documents.
         """
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
-        )
-
         # Fetch matching IDs first (ChromaDB delete needs explicit IDs or where)
-        loop = asyncio.get_running_loop()
-        results = await loop.run_in_executor(
-            None,
-            partial(collection.get, where=where, include=[]),
-        )
+        results = await self._get_raw(collection_name, where=where)
         matched_ids: list[str] = results.get("ids", []) if results else []
 
         if matched_ids:
@@ -269,18 +1303,17 @@ class VectorStoreService:
     # ------------------------------------------------------------------
 
     def list_collections(self) -> list[str]:
-        """Return names of all collections in the store."""
-        return [c.name for c in self._client.list_collections()]
+        """Return names of all collections in the store (partitions excluded)."""
+        return [
+            c.name for c in self._client.list_collections() if not is_partition(c.name)
+        ]
 
     def get_collection_stats(self, collection_name: str) -> dict[str, Any]:
         """Return basic stats for a collection."""
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
-        )
+        collection = self._collection(collection_name)
         return {
             "name": collection_name,
-            "count": collection.count(),
+            "count": self._refresh_count(collection_name),
             "metadata": collection.metadata,
         }
 
@@ -291,32 +1324,67 @@ class VectorStoreService:
             for name in self.list_collections()
         ]
 
-    async def keyword_search(
+    async def _get_raw(
         self,
         collection_name: str,
-        keyword: str,
-        n_results: int = 10,
+        ids: list[str] | None = None,
         where: dict[str, Any] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        include_embeddings: bool = False,
     ) -> dict[str, Any]:
-        """Keyword-based search using ChromaDB's ``get`` + ``where_document`` filter.
-
-        Complements vector search for hybrid retrieval.
-        """
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
+        """ChromaDB ``get()`` by IDs and / or metadata filter."""
+        collection = self._collection(collection_name)
+        include = ["documents", "metadatas"]
+        if include_embeddings:
+            include.append("embeddings")
+        loop = asyncio.get_running_loop()
+        native_where, bound = await loop.run_in_executor(
+            None, self._resolve_where, collection_name, where
+        )
+        if bound == 0:
+            return {
+                "ids": [],
+                "documents": [],
+                "metadatas": [],
+                "embeddings": [] if include_embeddings else None,
+            }
+        return await loop.run_in_executor(
+            None,
+            partial(
+                collection.get,
+                ids=ids,
+                where=native_where,
+                limit=limit,
+                offset=offset,
+                include=include,
+            ),
         )
 
+    async def _substring_search(
+        self,
+        collection_name: str,
+        keyword: str,
+        n_results: int,
+        where: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        """Unranked ``get`` + ``where_document`` scan (no keyword index)."""
+        collection = self._collection(collection_name)
+
         get_kwargs: dict[str, Any] = {
             "where_document": {"$contains": keyword},
             "include": ["documents", "metadatas"],
-            "limit": min(n_results, max(collection.count(), 1)),
+            "limit": min(n_results, self._count(collection_name) or n_results),
         }
-        if where:
-            get_kwargs["where"] = where
-
         loop = asyncio.get_running_loop()
         try:
+            native_where, bound = await loop.run_in_executor(
+                None, self._resolve_where, collection_name, where
+            )
+            if bound == 0:
+                return {"ids": [], "documents": [], "metadatas": []}
+            if native_where:
+                get_kwargs["where"] = native_where
             result = await loop.run_in_executor(
                 None, partial(collection.get, **get_kwargs),
             )
@@ -331,12 +1399,60 @@ class VectorStoreService:
         limit: int = 5,
     ) -> dict[str, Any]:
         """Return a small sample of documents from a collection (for debugging)."""
-        collection = self._client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=None,
-        )
+        collection = self._collection(collection_name)
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             partial(collection.peek, limit=limit),
         )
+
+
+# ---------------------------------------------------------------------------
+# Backend selection
+# ---------------------------------------------------------------------------
+
+def create_vector_store(settings: Any) -> Any:
+    """Instantiate the vector store named by ``settings.VECTOR_STORE_BACKEND``.
+
+    ``chroma`` (default) returns a ``VectorStoreService``; ``numpy`` returns
+    the in-process ``NumpyVectorStore``, which exposes the same interface.
+    Either is given the shared BM25 keyword index unless
+    ``KEYWORD_INDEX_ENABLED`` is off, and the retrieval cache named by
+    ``RETRIEVAL_CACHE_BACKEND``.  Quantised storage
+    (``VECTOR_QUANTIZATION``) is a NumPy-backend feature.
+    """
+    backend = settings.VECTOR_STORE_BACKEND.lower()
+    keyword_index = (
+        BM25Index(settings.KEYWORD_INDEX_PATH) if settings.KEYWORD_INDEX_ENABLED else None
+    )
+    options = {
+        "search_timeout": settings.VECTOR_SEARCH_TIMEOUT or None,
+        "search_concurrency": settings.VECTOR_SEARCH_CONCURRENCY or None,
+        "document_partitions": settings.VECTOR_DOCUMENT_PARTITIONS,
+        "retrieval_cache": build_retrieval_cache(settings),
+    }
+    if backend == "chroma":
+        if settings.VECTOR_QUANTIZATION.lower() != "none":
+            logger.warning("VECTOR_QUANTIZATION only applies to the numpy backend; ignored")
+        return VectorStoreService(
+            persist_dir=settings.CHROMA_PERSIST_DIR,
+            keyword_index=keyword_index,
+            **options,
+        )
+    if backend == "numpy":
+        from app.services.numpy_vector_store import NumpyVectorStore
+
+        return NumpyVectorStore(
+            persist_dir=settings.VECTOR_INDEX_DIR,
+            ivf_threshold=settings.VECTOR_IVF_THRESHOLD,
+            nprobe=settings.VECTOR_IVF_NPROBE,
+            quantization=settings.VECTOR_QUANTIZATION.lower(),
+            rerank_factor=settings.VECTOR_RERANK_FACTOR,
+            pq_subvectors=settings.VECTOR_PQ_SUBVECTORS,
+            keyword_index=keyword_index,
+            **options,
+        )
+    raise ValueError(
+        f"Unknown VECTOR_STORE_BACKEND {settings.VECTOR_STORE_BACKEND!r} "
+        "(expected 'chroma' or 'numpy')"
+    )
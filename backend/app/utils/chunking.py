@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import logging
 import uuid
+from collections.abc import Iterable
 from typing import Any
 
 from app.models.document import ProcessedDocument, ProcessedElement
@@ -108,16 +109,98 @@ class ComplianceChunker:
         * **Title / Header** elements update the running section path and
           are prepended as context to subsequent chunks.
         """
+        stream = self.stream(
+            filename=doc.filename,
+            document_id=doc.document_id,
+            collection_type=collection_type,
+            extra_metadata=extra_metadata,
+        )
+        chunks = stream.feed(doc.elements)
+
+        logger.info(
+            "Chunked %s → %d chunks for collection '%s'",
+            doc.filename,
+            len(chunks),
+            collection_type,
+        )
+        return chunks
+
+    def stream(
+        self,
+        *,
+        filename: str,
+        document_id: str,
+        collection_type: str = "regulatory_frameworks",
+        extra_metadata: dict[str, Any] | None = None,
+    ) -> ChunkStream:
+        """Return a ``ChunkStream`` that chunks a document batch by batch."""
+        return ChunkStream(
+            self,
+            filename=filename,
+            document_id=document_id,
+            collection_type=collection_type,
+            extra_metadata=extra_metadata,
+        )
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _update_section_path(
+        current: list[str], element: ProcessedElement
+    ) -> list[str]:
+        """Maintain a running section-path stack.
+
+        Title resets the path; Header appends as a child.
+        """
+        if element.element_type == "Title":
+            return [element.text]
+        # Header → child of current
+        return current + [element.text]
+
+    def _split_text(self, text: str) -> list[str]:
+        """Split long text using LangChain or simple fallback."""
+        if self._splitter is not None and _HAS_LANGCHAIN:
+            return self._splitter.split_text(text)
+        return _simple_split(text, self._chunk_size, self._chunk_overlap)
+
+
+class ChunkStream:
+    """Incremental ``ComplianceChunker.chunk_processed_document``.
+
+    Keeps the running section path between calls, so feeding a document's
+    elements in consecutive batches yields exactly the chunks of one call
+    over all of them.  Created by ``ComplianceChunker.stream``.
+    """
+
+    def __init__(
+        self,
+        chunker: ComplianceChunker,
+        *,
+        filename: str,
+        document_id: str,
+        collection_type: str,
+        extra_metadata: dict[str, Any] | None,
+    ) -> None:
+        self._chunker = chunker
+        self._filename = filename
+        self._document_id = document_id
+        self._collection_type = collection_type
+        self._extra_metadata = extra_metadata
+        self._section_path: list[str] = []
+        self._current_header = ""
+
+    def feed(self, elements: Iterable[ProcessedElement]) -> list[dict[str, Any]]:
+        """Chunk the next batch of elements (in document order)."""
         chunks: list[dict[str, Any]] = []
-        section_path: list[str] = []
-        current_header: str = ""
 
-        for element in doc.elements:
+        for element in elements:
             # ── Headers update context but don't become chunks themselves ──
             if element.element_type in ("Title", "Header"):
-                current_header = element.text
-                section_path = self._update_section_path(
-                    section_path, element
+                self._current_header = element.text
+                self._section_path = self._chunker._update_section_path(
+                    self._section_path, element
                 )
                 continue
 
@@ -126,22 +209,22 @@ class ComplianceChunker:
                 continue
 
             base_metadata: dict[str, Any] = {
-                "source_file": doc.filename,
-                "document_id": doc.document_id,
+                "source_file": self._filename,
+                "document_id": self._document_id,
                 "page_number": element.page_number,
                 "element_type": element.element_type,
-                "section_path": " > ".join(section_path) if section_path else "",
-                "section_header": current_header,
-                "collection_type": collection_type,
+                "section_path": " > ".join(self._section_path) if self._section_path else "",
+                "section_header": self._current_header,
+                "collection_type": self._collection_type,
             }
-            if extra_metadata:
-                base_metadata.update(extra_metadata)
+            if self._extra_metadata:
+                base_metadata.update(self._extra_metadata)
 
-            # ── Tables — single chunk, keep whole ─────────────────────────
+            # ── Tables — single chunk, keep whole ─────────────────────
             if element.element_type == "Table":
                 chunk_text = (
-                    f"[Table in section: {current_header}]\n{element.text}"
-                    if current_header
+                    f"[Table in section: {self._current_header}]\n{element.text}"
+                    if self._current_header
                     else element.text
                 )
                 meta = {
@@ -151,70 +234,40 @@ class ComplianceChunker:
                 }
                 chunks.append(
                     {
-                        "id": f"{doc.document_id}_tbl_{element.element_id}",
+                        "id": f"{self._document_id}_tbl_{element.element_id}",
                         "text": chunk_text,
                         "metadata": meta,
                     }
                 )
                 continue
 
-            # ── Body text — split if too long ─────────────────────────────
+            # ── Body text — split if too long ─────────────────────────
             text_with_ctx = (
-                f"[Section: {current_header}]\n{element.text}"
-                if current_header
+                f"[Section: {self._current_header}]\n{element.text}"
+                if self._current_header
                 else element.text
             )
 
-            if len(text_with_ctx) <= self._chunk_size:
+            if len(text_with_ctx) <= self._chunker._chunk_size:
                 chunks.append(
                     {
-                        "id": f"{doc.document_id}_{element.element_id}",
+                        "id": f"{self._document_id}_{element.element_id}",
                         "text": text_with_ctx,
                         "metadata": base_metadata,
                     }
                 )
             else:
-                sub_chunks = self._split_text(text_with_ctx)
+                sub_chunks = self._chunker._split_text(text_with_ctx)
                 for j, sc in enumerate(sub_chunks):
                     chunks.append(
                         {
-                            "id": f"{doc.document_id}_{element.element_id}_c{j}",
+                            "id": f"{self._document_id}_{element.element_id}_c{j}",
                             "text": sc,
                             "metadata": {**base_metadata, "chunk_index": j},
                         }
                     )
-
-        logger.info(
-            "Chunked %s → %d chunks for collection '%s'",
-            doc.filename,
-            len(chunks),
-            collection_type,
-        )
         return chunks
 
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
-
-    @staticmethod
-    def _update_section_path(
-        current: list[str], element: ProcessedElement
-    ) -> list[str]:
-        """Maintain a running section-path stack.
-
-        Title resets the path; Header appends as a child.
-        """
-        if element.element_type == "Title":
-            return [element.text]
-        # Header → child of current
-        return current + [element.text]
-
-    def _split_text(self, text: str) -> list[str]:
-        """Split long text using LangChain or simple fallback."""
-        if self._splitter is not None and _HAS_LANGCHAIN:
-            return self._splitter.split_text(text)
-        return _simple_split(text, self._chunk_size, self._chunk_overlap)
-
 
 # ---------------------------------------------------------------------------
 # Simpler utility functions (retained from original scaffold)
@@ -0,0 +1,132 @@
+"""Single-pass extraction of financial-data annotations from element text.
+
+``DocumentProcessor`` annotates every element with the currency amounts,
+percentages, dates and XBRL tags it mentions.  Running one regex per
+category means five scans per element, most of them over narrative text
+with no figures at all.  Here:
+
+- A cheap prefilter skips text that no category can match: every
+  category needs a digit, except XBRL tags and the (digit-less) comma
+  "amounts" the currency patterns accept next to a marker or scale word.
+- One fused pattern scans the text once.  It consumes a single character
+  that can start some category, then tries the five category patterns as
+  a lookahead from that character.  Matches therefore never hide an
+  overlapping match of another category (``"$5%"`` is both an amount and
+  a percentage), and per-category "next start" offsets reproduce exactly
+  the non-overlapping matches of five separate ``finditer`` passes.  The
+  leading character class lets the regex engine skip ahead in C between
+  candidates, which a bare leading lookahead would not.
+
+The functions return plain dicts (the ``FinancialDataExtract`` fields) so
+batches can be extracted in worker processes and pickled back cheaply.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+_AMOUNT = r"[0-9,]+(?:\.[0-9]+)?"
+
+# Per-category patterns — the five-pass reference that ``_RE_FUSED`` must
+# reproduce (see ``scripts/benchmark_financial_extraction.py``)
+_RE_INR = re.compile(
+    rf"""(?:₹|Rs\.?|INR)\s*({_AMOUNT})"""
+    rf"""|({_AMOUNT})\s*(?:crore|lakh|thousand|million|billion)s?""",
+    re.IGNORECASE,
+)
+_RE_USD = re.compile(
+    rf"""\$\s*({_AMOUNT})"""
+    rf"""|USD\s*({_AMOUNT})""",
+    re.IGNORECASE,
+)
+_RE_PERCENT = re.compile(r"([0-9]+(?:\.[0-9]+)?)\s*%")
+_RE_DATE = re.compile(
+    r"\b(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})\b"
+    r"|(?:FY\s*\d{4}(?:\s*[-–]\s*\d{2,4})?)"
+    r"|(?:Q[1-4]\s*\d{4})",
+    re.IGNORECASE,
+)
+_RE_XBRL = re.compile(r"\b(in-gaap:[A-Za-z0-9_]+)\b")
+
+# At most one category can match at any given start position, so the
+# alternation order inside the lookahead never drops a match.
+_FUSED_ALTERNATIVES = (
+    "(?:"
+    rf"(?P<inr>(?i:(?:₹|Rs\.?|INR)\s*(?P<inr_a>{_AMOUNT})"
+    rf"|(?P<inr_b>{_AMOUNT})\s*(?:crore|lakh|thousand|million|billion)s?))"
+    rf"|(?P<usd>(?i:\$\s*(?P<usd_a>{_AMOUNT})|USD\s*(?P<usd_b>{_AMOUNT})))"
+    r"|(?P<pct>(?P<pct_v>[0-9]+(?:\.[0-9]+)?)\s*%)"
+    r"|(?P<date>(?i:\b\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}\b"
+    r"|FY\s*\d{4}(?:\s*[-–]\s*\d{2,4})?"
+    r"|Q[1-4]\s*\d{4}))"
+    r"|(?P<xbrl>\bin-gaap:[A-Za-z0-9_]+\b)"
+    ")"
+)
+# First characters of every alternative, then the alternatives as a
+# lookahead from that character (inside a one-character lookbehind)
+_RE_FUSED = re.compile(r"[₹$,\dRrIiUuFfQq](?<=(?=" + _FUSED_ALTERNATIVES + r").)")
+
+# Prefilter: a digit, an XBRL tag, or a digit-less comma amount
+_RE_DIGIT = re.compile(r"\d")
+_RE_COMMA_AMOUNT = re.compile(
+    r"(?:₹|Rs\.?|INR|\$|USD)\s*,|,\s*(?:crore|lakh|thousand|million|billion)",
+    re.IGNORECASE,
+)
+
+
+def _may_match(text: str) -> bool:
+    return (
+        _RE_DIGIT.search(text) is not None
+        or "in-gaap:" in text
+        or ("," in text and _RE_COMMA_AMOUNT.search(text) is not None)
+    )
+
+
+def extract_financial_fields(text: str) -> dict[str, Any] | None:
+    """Return ``FinancialDataExtract`` fields found in *text*, or ``None``."""
+    if not text or not _may_match(text):
+        return None
+
+    inr: list[dict[str, Any]] = []
+    usd: list[dict[str, Any]] = []
+    percentages: list[dict[str, Any]] = []
+    dates: list[str] = []
+    xbrl: list[str] = []
+    next_start = dict.fromkeys(("inr", "usd", "pct", "date", "xbrl"), 0)
+
+    for m in _RE_FUSED.finditer(text):
+        kind = m.lastgroup
+        start = m.start()
+        if start < next_start[kind]:
+            continue  # inside the previous match of the same category
+        raw = m.group(kind)
+        next_start[kind] = start + len(raw)
+
+        if kind == "inr":
+            val = m.group("inr_a") or m.group("inr_b") or ""
+            inr.append({"value": val.replace(",", ""), "currency": "INR", "raw_text": raw.strip()})
+        elif kind == "usd":
+            val = m.group("usd_a") or m.group("usd_b") or ""
+            usd.append({"value": val.replace(",", ""), "currency": "USD", "raw_text": raw.strip()})
+        elif kind == "pct":
+            percentages.append({"value": m.group("pct_v"), "raw_text": raw.strip()})
+        elif kind == "date":
+            dates.append(raw.strip())
+        else:
+            xbrl.append(raw)
+
+    if not (inr or usd or percentages or dates or xbrl):
+        return None
+
+    return {
+        "currency_amounts": inr + usd,
+        "percentages": percentages,
+        "dates": dates,
+        "xbrl_elements": xbrl,
+    }
+
+
+def extract_financial_fields_batch(texts: list[str]) -> list[dict[str, Any] | None]:
+    """``extract_financial_fields`` over a batch (picklable for worker pools)."""
+    return [extract_financial_fields(text) for text in texts]
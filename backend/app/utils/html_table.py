@@ -0,0 +1,163 @@
+"""Single-pass parser for the HTML tables produced by Unstructured.
+
+``parse_html_table`` streams a table's HTML through one ``HTMLParser``
+pass and returns everything downstream code needs, so the HTML never has
+to be parsed again:
+
+- ``plain_text`` — tab-separated cells, one line per row.
+- ``column_headers`` — ``<th>`` cells of the ``<thead>`` (else of the
+  whole table), falling back to the cells of the first row.
+- ``row_labels`` — the first cell of every row.
+- ``cells`` — a rectangular grid with ``colspan`` / ``rowspan`` expanded
+  and body values typed: ``1,234.5`` / ``₹ 1,234`` → number,
+  ``(1,234)`` → negative number, empty → ``None``, anything else text.
+- ``header_rows`` — how many leading rows of ``cells`` are headers (the
+  ``<thead>`` rows, or leading rows made only of ``<th>`` cells).
+
+The grid is persisted with each table so ``AnalyticsEngine`` builds its
+DataFrames from it instead of running ``pd.read_html``.
+"""
+
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import Any
+
+_RE_NUMBER = re.compile(r"(\()?([-−]?)([0-9]+(?:\.[0-9]+)?)(\))?")
+
+_CURRENCY_CHARS = str.maketrans("", "", "₹$, \u00a0")
+
+
+def _span(attrs: list[tuple[str, str | None]], name: str) -> int:
+    for key, value in attrs:
+        if key == name and value:
+            try:
+                return max(1, min(int(value), 1000))
+            except ValueError:
+                return 1
+    return 1
+
+
+def typed_cell(text: str) -> str | int | float | None:
+    """Type a body cell: number, negative for ``(…)`` amounts, ``None`` if empty."""
+    if not text:
+        return None
+    m = _RE_NUMBER.fullmatch(text.translate(_CURRENCY_CHARS))
+    if m is None or bool(m.group(1)) != bool(m.group(4)):
+        return text
+    digits = m.group(3)
+    value: int | float = float(digits) if "." in digits else int(digits)
+    return -value if m.group(1) or m.group(2) else value
+
+
+class _TableParser(HTMLParser):
+    """Collect rows of ``(text, is_header, colspan, rowspan)`` cells in one pass."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.plain: list[str] = []
+        self.rows: list[tuple[bool, list[tuple[str, bool, int, int]]]] = []
+        self._in_thead = False
+        self._cell: list[str] | None = None
+        self._cell_attrs: tuple[bool, int, int] = (False, 1, 1)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "thead":
+            self._in_thead = True
+        elif tag == "tr":
+            self.rows.append((self._in_thead, []))
+        elif tag in {"td", "th"}:
+            if not self.rows:
+                self.rows.append((self._in_thead, []))
+            self._cell = []
+            self._cell_attrs = (tag == "th", _span(attrs, "colspan"), _span(attrs, "rowspan"))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "thead":
+            self._in_thead = False
+        elif tag in {"td", "th"}:
+            self.plain.append("\t")
+            if self._cell is not None:
+                is_th, colspan, rowspan = self._cell_attrs
+                self.rows[-1][1].append(("".join(self._cell).strip(), is_th, colspan, rowspan))
+                self._cell = None
+        elif tag == "tr":
+            self.plain.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is not None:
+            self.plain.append(data.strip())
+            self._cell.append(data)
+
+
+def parse_html_table(html: str) -> dict[str, Any]:
+    """Parse one HTML table; keys match the ``ExtractedTable`` fields."""
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    rows = parser.rows
+
+    # Headers — <th> in <thead>, else any <th>, else the first row
+    thead = [cells for in_thead, cells in rows if in_thead]
+    header_cells = [c for cells in (thead or [c for _, c in rows]) for c in cells if c[1]]
+    if not header_cells and rows:
+        header_cells = rows[0][1]
+    column_headers = [text for text, *_ in header_cells if text]
+
+    row_labels = [cells[0][0] for _, cells in rows if cells and cells[0][0]]
+
+    if thead:
+        header_rows = sum(1 for in_thead, _ in rows if in_thead)
+    else:
+        header_rows = 0
+        for _, cells in rows:
+            if not cells or not all(is_th for _, is_th, *_ in cells):
+                break
+            header_rows += 1
+
+    # Grid with colspan / rowspan expanded
+    grid: list[list[Any]] = []
+    pending: dict[int, tuple[int, Any]] = {}  # column → (rows left, value)
+    for index, (_, cells) in enumerate(rows):
+        row: list[Any] = []
+        queue = iter(cells)
+        col = 0
+        while True:
+            if col in pending:
+                left, value = pending[col]
+                row.append(value)
+                if left > 1:
+                    pending[col] = (left - 1, value)
+                else:
+                    del pending[col]
+                col += 1
+                continue
+            cell = next(queue, None)
+            if cell is None:
+                if any(c >= col for c in pending):
+                    row.append(None)
+                    col += 1
+                    continue
+                break
+            text, _, colspan, rowspan = cell
+            text = " ".join(text.split())
+            value = text if index < header_rows else typed_cell(text)
+            for _ in range(colspan):
+                if rowspan > 1:
+                    pending[col] = (rowspan - 1, value)
+                row.append(value)
+                col += 1
+        grid.append(row)
+
+    width = max((len(r) for r in grid), default=0)
+    for row in grid:
+        row.extend([None] * (width - len(row)))
+
+    return {
+        "plain_text": "".join(parser.plain).strip(),
+        "column_headers": column_headers,
+        "row_labels": row_labels,
+        "cells": grid,
+        "header_rows": header_rows,
+    }
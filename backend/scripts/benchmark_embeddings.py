@@ -0,0 +1,97 @@
+"""Measure embedding throughput of the configured backend.
+
+Usage:
+    cd backend
+    EMBEDDING_BACKEND=hashing python -m scripts.benchmark_embeddings
+    EMBEDDING_BACKEND=local python -m scripts.benchmark_embeddings --texts 5000
+
+Embeds synthetic financial-statement-like chunks (or the lines of
+``--input``) through ``EmbeddingService`` with the embedding cache
+disabled, and reports texts/s and estimated tokens/s.  Together with
+``EMBEDDING_BACKEND=hashing`` or ``local`` this lets ``IngestPipeline`` /
+``ComplianceEngine`` be benchmarked end-to-end without an OpenAI quota.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure the backend package is on sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings
+from app.services.embedding_service import EmbeddingService, _estimate_tokens
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
+)
+logger = logging.getLogger("benchmark_embeddings")
+
+_VOCAB = (
+    "revenue from operations other income finance costs depreciation "
+    "amortisation deferred tax liabilities trade receivables inventories "
+    "contingent liabilities related party transactions Ind AS 115 116 109 "
+    "provisions employee benefits segment reporting impairment goodwill "
+    "fair value hierarchy lease liabilities borrowings crore lakh FY 2023-24"
+).split()
+
+
+def _synthetic_texts(n: int, words: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_VOCAB) for _ in range(words)) + f" ({i})"
+        for i in range(n)
+    ]
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = get_settings().model_copy(update={"EMBEDDING_CACHE_ENABLED": False})
+    service = EmbeddingService.from_settings(settings)
+
+    if args.input:
+        texts = [ln for ln in Path(args.input).read_text().splitlines() if ln.strip()]
+    else:
+        texts = _synthetic_texts(args.texts, args.words)
+    tokens = sum(_estimate_tokens(t) for t in texts)
+
+    # Warm-up (model load / connection setup) is excluded from the timing
+    await service.embed_matrix(texts[: min(len(texts), 8)])
+
+    start = time.perf_counter()
+    vectors = await service.embed_matrix(texts, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    service.close()
+
+    logger.info(
+        "backend=%s model=%s texts=%d dim=%d dtype=%s (%.1f MB)  %.2fs  "
+        "%.1f texts/s  ~%.0f tokens/s",
+        settings.EMBEDDING_BACKEND,
+        service.model,
+        vectors.shape[0],
+        vectors.shape[1],
+        vectors.dtype,
+        vectors.nbytes / 1e6,
+        elapsed,
+        len(vectors) / elapsed if elapsed else 0.0,
+        tokens / elapsed if elapsed else 0.0,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=2000, help="synthetic texts to embed")
+    parser.add_argument("--words", type=int, default=120, help="words per synthetic text")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--input", help="embed the non-blank lines of this file instead")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
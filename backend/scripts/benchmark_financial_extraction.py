@@ -0,0 +1,143 @@
+"""Compare the fused financial-data extractor with the five-pass reference.
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_financial_extraction
+    python -m scripts.benchmark_financial_extraction --elements 100000 --numeric 0.2
+
+Generates synthetic element texts (narrative paragraphs, a share of them
+with amounts / percentages / dates / XBRL tags), checks that
+``extract_financial_fields`` returns exactly what five separate regex
+passes return, and reports elements/s for both.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Ensure the backend package is on sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.financial_extract import (
+    _RE_DATE,
+    _RE_INR,
+    _RE_PERCENT,
+    _RE_USD,
+    _RE_XBRL,
+    extract_financial_fields,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
+)
+logger = logging.getLogger("benchmark_financial_extraction")
+
+_WORDS = (
+    "the company has recognised revenue in accordance with the accounting "
+    "policies and the board of directors approved the financial statements "
+    "for the year under review including related party transactions and "
+    "contingent liabilities disclosed in the notes"
+).split()
+
+_FIGURES = (
+    "₹ 1,234.56 crore", "Rs. 450 lakh", "INR 12,000", "3,200 million",
+    "$ 45.2", "USD 1,000", "12.5%", "7 %", "31/03/2024", "FY 2023-24",
+    "Q3 2024", "in-gaap:RevenueFromOperations", "(1,234)", "2,345.67",
+)
+
+
+def _five_pass(text: str) -> dict[str, Any] | None:
+    """The original per-category implementation (one ``finditer`` each)."""
+    if not text:
+        return None
+    currency_amounts: list[dict[str, Any]] = []
+    for m in _RE_INR.finditer(text):
+        val = m.group(1) or m.group(2) or ""
+        currency_amounts.append(
+            {"value": val.replace(",", ""), "currency": "INR", "raw_text": m.group(0).strip()}
+        )
+    for m in _RE_USD.finditer(text):
+        val = m.group(1) or m.group(2) or ""
+        currency_amounts.append(
+            {"value": val.replace(",", ""), "currency": "USD", "raw_text": m.group(0).strip()}
+        )
+    percentages = [
+        {"value": m.group(1), "raw_text": m.group(0).strip()} for m in _RE_PERCENT.finditer(text)
+    ]
+    dates = [m.group(0).strip() for m in _RE_DATE.finditer(text)]
+    xbrl = _RE_XBRL.findall(text)
+    if not (currency_amounts or percentages or dates or xbrl):
+        return None
+    return {
+        "currency_amounts": currency_amounts,
+        "percentages": percentages,
+        "dates": dates,
+        "xbrl_elements": xbrl,
+    }
+
+
+def _synthetic_texts(n: int, words: int, numeric: float, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        tokens = [rng.choice(_WORDS) for _ in range(words)]
+        if rng.random() < numeric:
+            for _ in range(rng.randint(1, 6)):
+                tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(_FIGURES))
+        texts.append(" ".join(tokens))
+    return texts
+
+
+def _time(fn: Callable[[str], Any], texts: list[str], repeat: int) -> tuple[float, list[Any]]:
+    best = float("inf")
+    out: list[Any] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=50_000, help="synthetic element texts")
+    parser.add_argument("--words", type=int, default=60, help="words per element")
+    parser.add_argument(
+        "--numeric", type=float, default=0.3, help="share of elements containing figures"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs (best is reported)")
+    args = parser.parse_args()
+
+    texts = _synthetic_texts(args.elements, args.words, args.numeric)
+    t_ref, ref = _time(_five_pass, texts, args.repeat)
+    t_fused, fused = _time(extract_financial_fields, texts, args.repeat)
+
+    mismatches = sum(1 for a, b in zip(ref, fused) if a != b)
+    if mismatches:
+        logger.error("fused extractor differs from the reference on %d elements", mismatches)
+        sys.exit(1)
+
+    annotated = sum(1 for r in fused if r)
+    logger.info(
+        "elements=%d annotated=%d  five-pass %.3fs (%.0f el/s)  fused %.3fs (%.0f el/s)  "
+        "speed-up %.2fx",
+        len(texts),
+        annotated,
+        t_ref,
+        len(texts) / t_ref if t_ref else 0.0,
+        t_fused,
+        len(texts) / t_fused if t_fused else 0.0,
+        t_ref / t_fused if t_fused else 0.0,
+    )
+
+
+if __name__ == "__main__":
+    main()
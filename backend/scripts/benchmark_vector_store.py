@@ -0,0 +1,206 @@
+"""Benchmark the ChromaDB and NumPy vector store backends.
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_vector_store
+    python -m scripts.benchmark_vector_store --sizes 10000,100000 --dim 3072
+    python -m scripts.benchmark_vector_store --backends numpy-flat,numpy-ivf --sizes 1000000
+    python -m scripts.benchmark_vector_store \
+        --backends numpy-flat,numpy-flat-int8,numpy-flat-pq,numpy-ivf-pq
+
+For every collection size the same synthetic, clustered, unit-normalised
+vectors are loaded into each backend (in a temporary directory) and the
+script reports ingest throughput, single-query latency / QPS, batched
+``query_many`` QPS and recall@k against exact brute-force ground truth.
+
+A ``-int8`` / ``-pq`` suffix on a NumPy backend enables quantised storage
+(exact re-rank of ``--rerank-factor * k`` candidates); the ``scan MB``
+column is the RAM scanned per query — codes instead of float32 vectors.
+
+At 1M chunks ChromaDB ingest alone takes a long time — pass ``--backends``
+to skip it.  Memory for the vectors is ``size * dim * 4`` bytes per backend.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure the backend package is on sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.numpy_vector_store import NumpyVectorStore
+from app.services.vector_store import VectorStoreService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
+)
+logger = logging.getLogger("benchmark_vector_store")
+logging.getLogger("chromadb").setLevel(logging.ERROR)
+
+_COLLECTION = "financial_documents"
+_ADD_BATCH = 5_000
+
+
+def _synthetic(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors — closer to real embeddings than pure noise."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        m = min(100_000, n - start)
+        block = centres[rng.integers(0, clusters, m)]
+        block = block + 0.6 * rng.standard_normal((m, dim)).astype(np.float32)
+        out[start : start + m] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return out
+
+
+def _ground_truth(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    best = np.empty((len(queries), 0), dtype=np.intp)
+    best_d = np.empty((len(queries), 0), dtype=np.float32)
+    for start in range(0, len(vectors), 100_000):
+        block = vectors[start : start + 100_000]
+        d = -2.0 * queries @ block.T + np.einsum("ij,ij->i", block, block)[None, :]
+        best = np.hstack([best, np.broadcast_to(np.arange(start, start + len(block)), d.shape)])
+        best_d = np.hstack([best_d, d])
+        part = np.argpartition(best_d, k - 1, axis=1)[:, :k]
+        best, best_d = np.take_along_axis(best, part, 1), np.take_along_axis(best_d, part, 1)
+    return best
+
+
+def _make_store(backend: str, path: str, args: argparse.Namespace):
+    if backend == "chroma":
+        return VectorStoreService(persist_dir=path)
+    index, _, quantization = backend.removeprefix("numpy-").partition("-")
+    options = {
+        "quantization": quantization or "none",
+        "rerank_factor": args.rerank_factor,
+        "pq_subvectors": args.pq_subvectors,
+    }
+    if index == "flat":
+        return NumpyVectorStore(persist_dir=path, ivf_threshold=2**62, **options)
+    if index == "ivf":
+        return NumpyVectorStore(
+            persist_dir=path, ivf_threshold=args.ivf_threshold, nprobe=args.nprobe, **options
+        )
+    raise ValueError(f"Unknown backend {backend!r}")
+
+
+async def _bench_backend(
+    backend: str,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    args: argparse.Namespace,
+) -> dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix=f"vs_bench_{backend}_") as tmp:
+        store = _make_store(backend, tmp, args)
+
+        t0 = time.perf_counter()
+        for start in range(0, len(vectors), _ADD_BATCH):
+            block = vectors[start : start + _ADD_BATCH]
+            chunks = [
+                {
+                    "id": str(start + i),
+                    "text": f"chunk {start + i}",
+                    "metadata": {"page_number": (start + i) % 300},
+                }
+                for i in range(len(block))
+            ]
+            await store.add_documents(_COLLECTION, chunks, embeddings=block)
+        ingest = time.perf_counter() - t0
+
+        # First query pays for lazy index / quantiser training — report it apart
+        t0 = time.perf_counter()
+        await store.query(_COLLECTION, queries[0].tolist(), n_results=args.k)
+        first = time.perf_counter() - t0
+
+        latencies = []
+        hits = []
+        for q in queries:
+            t0 = time.perf_counter()
+            raw = await store.query(_COLLECTION, q.tolist(), n_results=args.k)
+            latencies.append(time.perf_counter() - t0)
+            hits.append([int(i) for i in raw["ids"][0]])
+
+        t0 = time.perf_counter()
+        await store.query_many([_COLLECTION], queries, n_results=args.k)
+        batch = time.perf_counter() - t0
+
+        if isinstance(store, NumpyVectorStore):
+            scan_bytes = store._collection(_COLLECTION).scan_bytes
+        else:
+            scan_bytes = len(vectors) * vectors.shape[1] * 4
+
+    recall = float(np.mean([len(set(h) & set(t.tolist())) / args.k for h, t in zip(hits, truth)]))
+    lat = np.asarray(latencies)
+    return {
+        "ingest_s": ingest,
+        "ingest_rows_s": len(vectors) / ingest,
+        "first_query_s": first,
+        "p50_ms": float(np.percentile(lat, 50) * 1e3),
+        "p95_ms": float(np.percentile(lat, 95) * 1e3),
+        "qps": len(queries) / float(lat.sum()),
+        "batch_qps": len(queries) / batch,
+        "recall": recall,
+        "scan_mb": scan_bytes / 2**20,
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    sizes = [int(s) for s in args.sizes.split(",")]
+    backends = args.backends.split(",")
+    rows = []
+
+    for size in sizes:
+        logger.info("Generating %d x %d vectors...", size, args.dim)
+        vectors = _synthetic(size, args.dim, clusters=max(16, size // 2_000), seed=1)
+        queries = vectors[np.random.default_rng(2).choice(size, args.queries, replace=False)]
+        noise = np.random.default_rng(3).standard_normal(queries.shape).astype(np.float32)
+        queries = queries + 0.05 * noise
+        truth = _ground_truth(vectors, queries, args.k)
+
+        for backend in backends:
+            logger.info("Benchmarking %s at %d vectors...", backend, size)
+            result = await _bench_backend(backend, vectors, queries, truth, args)
+            rows.append((size, backend, result))
+            logger.info("%s @ %d: %s", backend, size, {k: round(v, 3) for k, v in result.items()})
+
+    header = (
+        f"{'size':>9}  {'backend':<16} {'ingest/s':>10} {'1st q s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'QPS':>8} {'batch QPS':>10} {'recall@' + str(args.k):>10} "
+        f"{'scan MB':>9}"
+    )
+    print("\n" + header + "\n" + "-" * len(header))
+    for size, backend, r in rows:
+        print(
+            f"{size:>9}  {backend:<16} {r['ingest_rows_s']:>10.0f} {r['first_query_s']:>8.2f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['qps']:>8.1f} {r['batch_qps']:>10.1f} "
+            f"{r['recall']:>10.3f} {r['scan_mb']:>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--backends", default="chroma,numpy-flat,numpy-ivf")
+    parser.add_argument("--dim", type=int, default=256, help="use 3072 for text-embedding-3-large")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--ivf-threshold", type=int, default=50_000)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--rerank-factor", type=int, default=16)
+    parser.add_argument("--pq-subvectors", type=int, default=0, help="0 = dim / 4")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
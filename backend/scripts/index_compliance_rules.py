@@ -6,7 +6,8 @@ Usage:
 
 Processes all PDFs in the compliance rules directory, extracts text/tables
 using Unstructured.io, chunks them, generates embeddings (text-embedding-3-large),
-and stores them in the appropriate ChromaDB collection.
+and stores them in the appropriate ChromaDB collection.  Files are processed
+concurrently (``INGEST_CONCURRENCY``, by default one per partition worker).
 """
 
 from __future__ import annotations
@@ -24,7 +25,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from app.config import get_settings
 from app.services.document_processor import DocumentProcessor
 from app.services.embedding_service import EmbeddingService
-from app.services.vector_store import VectorStoreService
+from app.services.vector_store import VectorStoreService, create_vector_store
 from app.utils.chunking import ComplianceChunker
 
 logging.basicConfig(
@@ -70,18 +71,24 @@ COMPLIANCE_RULES_DIR = Path(
 EMBED_BATCH = 50
 
 
-async def index_all() -> None:
+async def index_all(
+    vector_store: VectorStoreService | None = None,
+    embedder: EmbeddingService | None = None,
+) -> None:
+    """Index every compliance rule PDF.
+
+    *vector_store* / *embedder* let the running application pass in its own
+    instances (required for the in-process NumPy vector store, whose state
+    is not shared between instances); by default both are built from
+    ``Settings``.
+    """
     settings = get_settings()
 
-    processor = DocumentProcessor(
-        api_key=settings.UNSTRUCTURED_API_KEY,
-        api_url=settings.UNSTRUCTURED_API_URL,
-    )
-    embedder = EmbeddingService(
-        model=settings.EMBEDDING_MODEL,
-        api_key=settings.OPENAI_API_KEY,
-    )
-    vector_store = VectorStoreService(persist_dir=settings.CHROMA_PERSIST_DIR)
+    processor = DocumentProcessor.from_settings(settings)
+    if embedder is None:
+        embedder = EmbeddingService.from_settings(settings)
+    if vector_store is None:
+        vector_store = create_vector_store(settings)
     chunker = ComplianceChunker(chunk_size=1200, chunk_overlap=200)
 
     if not COMPLIANCE_RULES_DIR.is_dir():
@@ -92,37 +99,24 @@ async def index_all() -> None:
     total_files = 0
     t0 = time.perf_counter()
 
-    for folder_name, mapping in FOLDER_MAP.items():
-        folder_path = COMPLIANCE_RULES_DIR / folder_name
-        if not folder_path.is_dir():
-            logger.warning("Folder not found, skipping: %s", folder_path)
-            continue
-
-        framework = mapping["framework"]
-        collection_name = mapping["collection"]
-        pdf_files = sorted(folder_path.glob("*.pdf"))
-
-        if not pdf_files:
-            logger.info("No PDFs in %s", folder_path)
-            continue
+    # Files are indexed concurrently — local partitioning scales with the
+    # partition pool's worker processes
+    semaphore = asyncio.Semaphore(settings.INGEST_CONCURRENCY or processor.partition_workers)
 
-        logger.info(
-            "=== %s: %d PDFs → collection '%s' (framework=%s) ===",
-            folder_name, len(pdf_files), collection_name, framework,
-        )
+    async def _index_file(pdf_path: Path, framework: str, collection_name: str) -> None:
+        nonlocal total_chunks, total_files
+        file_start = time.perf_counter()
+        filename = pdf_path.name
 
-        for pdf_path in pdf_files:
-            file_start = time.perf_counter()
-            filename = pdf_path.name
+        async with semaphore:
             logger.info("  Processing: %s", filename)
-
             try:
                 # 1. Extract with Unstructured
                 processed = await processor.process_document(str(pdf_path))
 
                 if processed.processing_status == "failed":
                     logger.error("    FAILED: %s", filename)
-                    continue
+                    return
 
                 # 2. Derive standard name from filename
                 standard_name = (
@@ -145,21 +139,16 @@ async def index_all() -> None:
 
                 if not chunks:
                     logger.warning("    No chunks produced for %s", filename)
-                    continue
+                    return
 
-                # 4. Embed in batches
+                # 4. Embed (batched + dispatched concurrently by the service)
                 texts = [c["text"] for c in chunks]
-                all_embeddings: list[list[float]] = []
-                for i in range(0, len(texts), EMBED_BATCH):
-                    batch = texts[i:i + EMBED_BATCH]
-                    batch_embs = await embedder.embed_batch(batch)
-                    all_embeddings.extend(batch_embs)
-
-                for chunk, emb in zip(chunks, all_embeddings):
-                    chunk["embedding"] = emb
+                embeddings = await embedder.embed_matrix(texts, batch_size=EMBED_BATCH)
 
                 # 5. Store in ChromaDB
-                await vector_store.add_documents(collection_name, chunks)
+                await vector_store.add_documents(
+                    collection_name, chunks, embeddings=embeddings
+                )
 
                 elapsed = time.perf_counter() - file_start
                 total_chunks += len(chunks)
@@ -174,6 +163,32 @@ async def index_all() -> None:
             except Exception:
                 logger.exception("    EXCEPTION processing %s", filename)
 
+    jobs = []
+    for folder_name, mapping in FOLDER_MAP.items():
+        folder_path = COMPLIANCE_RULES_DIR / folder_name
+        if not folder_path.is_dir():
+            logger.warning("Folder not found, skipping: %s", folder_path)
+            continue
+
+        framework = mapping["framework"]
+        collection_name = mapping["collection"]
+        pdf_files = sorted(folder_path.glob("*.pdf"))
+
+        if not pdf_files:
+            logger.info("No PDFs in %s", folder_path)
+            continue
+
+        logger.info(
+            "=== %s: %d PDFs → collection '%s' (framework=%s) ===",
+            folder_name, len(pdf_files), collection_name, framework,
+        )
+        jobs.extend(_index_file(pdf_path, framework, collection_name) for pdf_path in pdf_files)
+
+    try:
+        await asyncio.gather(*jobs)
+    finally:
+        processor.close()
+
     total_elapsed = time.perf_counter() - t0
     logger.info("=" * 60)
     logger.info(
@@ -0,0 +1,22 @@
+"""Fixtures shared by the test modules."""
+import time
+
+import pytest
+
+
+class Clock:
+    """Stand-in for ``time.time`` that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """Freeze ``time.time`` at a ``Clock`` the test advances via ``clock.now``."""
+    clock = Clock()
+    monkeypatch.setattr(time, "time", clock)
+    return clock
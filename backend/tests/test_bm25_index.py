@@ -0,0 +1,89 @@
+"""Tests for the BM25 keyword index and its regulatory tokenizer."""
+from pathlib import Path
+
+import pytest
+
+from app.services.bm25_index import BM25Index, tokenize
+
+
+def _references(text: str) -> list[str]:
+    return [term for term in tokenize(text) if "_" in term]
+
+
+class TestTokenize:
+    """Words, section numbers and folded standard references."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("Ind AS 116", ["indas_116"]),
+            ("IndAS-116", ["indas_116"]),
+            ("ind as 116", ["indas_116"]),
+            ("IND-AS 116", ["indas_116"]),
+            ("Ind AS–116", ["indas_116"]),
+            ("AS 24", ["as_24"]),
+            ("SA 700", ["sa_700"]),
+            ("SA-700 and SRE 2410", ["sa_700", "sre_2410"]),
+            ("Schedule III", ["schedule_iii"]),
+            ("Sec. 135", ["section_135"]),
+            ("reg 33", ["regulation_33"]),
+            ("Paragraph 22", ["para_22"]),
+            ("Note 5A", ["note_5a"]),
+            ("section 4.2.1", ["section_4.2.1"]),
+        ],
+    )
+    def test_references_are_folded(self, text: str, expected: list[str]) -> None:
+        """Spellings of one reference fold to one compound term."""
+        assert _references(text) == expected
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "sail boat",
+            "ascii data",
+            "such as civil works",
+            "such as 5 items",
+            "as 5",
+            "sa 700",
+            "SA700",
+            "sections",
+            "rulebook 5",
+        ],
+    )
+    def test_ordinary_words_are_not_references(self, text: str) -> None:
+        """No separator, or lower-case bare ``as`` / ``sa``, is not a reference."""
+        assert _references(text) == []
+
+    def test_words_and_numbers(self) -> None:
+        """Stopwords drop, plurals fold and dotted numbers stay whole."""
+        assert tokenize("The provisions of 4.2.1 and leases") == [
+            "provision",
+            "4.2.1",
+            "lease",
+        ]
+
+
+class TestBM25Index:
+    """Search over an on-disk index."""
+
+    def test_exact_reference_ranks_first(self, tmp_path: Path) -> None:
+        """A standard lookup prefers the chunk citing it over shared words."""
+        index = BM25Index(str(tmp_path / "bm25.sqlite3"))
+        try:
+            index.add(
+                "rules",
+                ["c1", "c2", "c3"],
+                [
+                    "Lease accounting under Ind AS 116 for lessees.",
+                    "Lease disclosures such as 116 items of lease cost.",
+                    "Revenue from contracts with customers.",
+                ],
+            )
+            ranked = index.search("rules", "Ind AS 116 lease", k=3)
+            assert [chunk_id for chunk_id, _ in ranked][:2] == ["c1", "c2"]
+            assert index.count("rules") == 3
+
+            index.remove("rules", ["c1"])
+            assert "c1" not in [chunk_id for chunk_id, _ in index.search("rules", "IndAS-116")]
+        finally:
+            index.close()
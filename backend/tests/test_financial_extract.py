@@ -0,0 +1,113 @@
+"""Tests for single-pass financial-data extraction."""
+import random
+from typing import Any
+
+import pytest
+
+from app.utils.financial_extract import (
+    _RE_DATE,
+    _RE_INR,
+    _RE_PERCENT,
+    _RE_USD,
+    _RE_XBRL,
+    extract_financial_fields,
+    extract_financial_fields_batch,
+)
+
+
+def _five_pass(text: str) -> dict[str, Any] | None:
+    """The original per-category implementation (one ``finditer`` each)."""
+    if not text:
+        return None
+    currency_amounts: list[dict[str, Any]] = []
+    for m in _RE_INR.finditer(text):
+        val = m.group(1) or m.group(2) or ""
+        currency_amounts.append(
+            {"value": val.replace(",", ""), "currency": "INR", "raw_text": m.group(0).strip()}
+        )
+    for m in _RE_USD.finditer(text):
+        val = m.group(1) or m.group(2) or ""
+        currency_amounts.append(
+            {"value": val.replace(",", ""), "currency": "USD", "raw_text": m.group(0).strip()}
+        )
+    percentages = [
+        {"value": m.group(1), "raw_text": m.group(0).strip()} for m in _RE_PERCENT.finditer(text)
+    ]
+    dates = [m.group(0).strip() for m in _RE_DATE.finditer(text)]
+    xbrl = _RE_XBRL.findall(text)
+    if not (currency_amounts or percentages or dates or xbrl):
+        return None
+    return {
+        "currency_amounts": currency_amounts,
+        "percentages": percentages,
+        "dates": dates,
+        "xbrl_elements": xbrl,
+    }
+
+
+_EDGE_CASES = [
+    "",
+    "the board approved the financial statements",
+    "$5%",
+    "Rs 5 crore",
+    "Rs. 5 crores and rs 7 lakh",
+    "₹1,234.56 crore",
+    "INR ,",
+    "Rs. ,,, and $ ,",
+    "USD , and , million",
+    "a , lakh figure",
+    "revenue 1,2,3 , billion",
+    "fy 2023-24 and q1 2024",
+    "FY2023–24, Q4 2023 and 31/03/2024",
+    "in-gaap:RevenueFromOperations",
+    "see in-gaap:Revenue_2024 and in-gaap:Assets",
+    "IN-GAAP:Revenue",
+    "12.5% and 7 % and 100%%",
+    "$$5 USD USD 10",
+    "(1,234) 2,345.67 3,200 million",
+    "Q5 2024 FY 12",
+]
+
+_FIGURES = (
+    "₹ 1,234.56 crore", "Rs. 450 lakh", "INR 12,000", "3,200 million", "$ 45.2",
+    "USD 1,000", "12.5%", "7 %", "31/03/2024", "FY 2023-24", "fy2024", "q3 2024",
+    "in-gaap:RevenueFromOperations", "(1,234)", "2,345.67", "$5%", "Rs ,", ", crore",
+)
+
+
+class TestExtractFinancialFields:
+    """The fused pass must return exactly what five separate passes return."""
+
+    @pytest.mark.parametrize("text", _EDGE_CASES)
+    def test_edge_cases_match_five_pass(self, text: str) -> None:
+        """Overlaps, comma-only amounts, lowercase prefixes and XBRL tags."""
+        assert extract_financial_fields(text) == _five_pass(text)
+
+    def test_random_texts_match_five_pass(self) -> None:
+        """Figures spliced into narrative text, including glued to each other."""
+        rng = random.Random(7)
+        words = "revenue for the year under review as per notes".split()
+        for _ in range(2000):
+            tokens = [rng.choice(words) for _ in range(rng.randint(0, 12))]
+            for _ in range(rng.randint(0, 4)):
+                tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(_FIGURES))
+            text = rng.choice((" ", "", ",")).join(tokens)
+            assert extract_financial_fields(text) == _five_pass(text), text
+
+    def test_overlapping_categories_are_all_kept(self) -> None:
+        """``"$5%"`` is both a USD amount and a percentage."""
+        fields = extract_financial_fields("$5%")
+        assert fields is not None
+        assert fields["currency_amounts"] == [
+            {"value": "5", "currency": "USD", "raw_text": "$5"}
+        ]
+        assert fields["percentages"] == [{"value": "5", "raw_text": "5%"}]
+
+    def test_text_without_figures_is_none(self) -> None:
+        """Narrative text is rejected by the prefilter."""
+        assert extract_financial_fields("no figures in this paragraph") is None
+
+    def test_batch_preserves_order(self) -> None:
+        """The batch helper returns one result per text, in order."""
+        texts = ["Rs 5 crore", "plain", "fy 2024"]
+        assert extract_financial_fields_batch(texts) == [_five_pass(t) for t in texts]
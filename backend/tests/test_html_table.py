@@ -0,0 +1,180 @@
+"""Tests for the single-pass HTML table parser."""
+import re
+from html.parser import HTMLParser
+
+import pytest
+
+from app.utils.html_table import parse_html_table, typed_cell
+
+
+# Reference: the per-field helpers ``parse_html_table`` replaced
+class _HTMLTextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: list[str] = []
+        self._in_cell = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in {"td", "th"}:
+            self._in_cell = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in {"td", "th"}:
+            self._parts.append("\t")
+            self._in_cell = False
+        elif tag == "tr":
+            self._parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_cell:
+            self._parts.append(data.strip())
+
+
+def _html_to_plain(html: str) -> str:
+    extractor = _HTMLTextExtractor()
+    extractor.feed(html)
+    return "".join(extractor._parts).strip()
+
+
+def _extract_column_headers(html: str) -> list[str]:
+    headers: list[str] = []
+    th_pattern = re.compile(r"<th[^>]*>(.*?)</th>", re.IGNORECASE | re.DOTALL)
+    thead_match = re.search(r"<thead[^>]*>(.*?)</thead>", html, re.IGNORECASE | re.DOTALL)
+    search_area = thead_match.group(1) if thead_match else html
+    for m in th_pattern.finditer(search_area):
+        text = re.sub(r"<[^>]+>", "", m.group(1)).strip()
+        if text:
+            headers.append(text)
+    if not headers:
+        first_tr = re.search(r"<tr[^>]*>(.*?)</tr>", html, re.IGNORECASE | re.DOTALL)
+        if first_tr:
+            for m in re.finditer(
+                r"<t[dh][^>]*>(.*?)</t[dh]>", first_tr.group(1), re.IGNORECASE | re.DOTALL
+            ):
+                text = re.sub(r"<[^>]+>", "", m.group(1)).strip()
+                if text:
+                    headers.append(text)
+    return headers
+
+
+def _extract_row_labels(html: str) -> list[str]:
+    labels: list[str] = []
+    for tr_match in re.finditer(r"<tr[^>]*>(.*?)</tr>", html, re.IGNORECASE | re.DOTALL):
+        first_cell = re.search(
+            r"<t[dh][^>]*>(.*?)</t[dh]>", tr_match.group(1), re.IGNORECASE | re.DOTALL
+        )
+        if first_cell:
+            text = re.sub(r"<[^>]+>", "", first_cell.group(1)).strip()
+            if text:
+                labels.append(text)
+    return labels
+
+
+_TABLES = [
+    "<table><thead><tr><th>Particulars</th><th>2024</th><th>2023</th></tr></thead>"
+    "<tbody><tr><td>Revenue</td><td>1,234</td><td>1,100</td></tr>"
+    "<tr><td>Loss</td><td>(56)</td><td>(40)</td></tr></tbody></table>",
+    "<table><tr><th>Item</th><th>Amount</th></tr>"
+    "<tr><td>Cash</td><td>₹ 500</td></tr><tr><td></td><td>10</td></tr></table>",
+    "<table><tr><td>Item</td><td>Amount</td></tr><tr><td>Cash</td><td>500</td></tr></table>",
+    "<table><tr><td> Note 1 </td><td>\n  12.5 \n</td></tr>"
+    "<tr><td>Note <b>2</b></td><td>7</td></tr></table>",
+    "<table><thead><tr><th></th><th>FY24</th></tr></thead>"
+    "<tr><th>Assets</th><td>9</td></tr></table>",
+    "<table></table>",
+]
+
+
+class TestParseHtmlTable:
+    """Single-pass output against the helpers it replaced, and the typed grid."""
+
+    @pytest.mark.parametrize("html", _TABLES)
+    def test_text_fields_match_old_helpers(self, html: str) -> None:
+        """plain_text, column_headers and row_labels are unchanged."""
+        parsed = parse_html_table(html)
+        assert parsed["plain_text"] == _html_to_plain(html)
+        assert parsed["column_headers"] == _extract_column_headers(html)
+        assert parsed["row_labels"] == _extract_row_labels(html)
+
+    def test_colspan_and_rowspan_are_expanded(self) -> None:
+        """Spanning cells repeat across the columns and rows they cover."""
+        html = (
+            "<table><tr><th rowspan='2'>Item</th><th colspan='2'>Year</th></tr>"
+            "<tr><th>2024</th><th>2023</th></tr>"
+            "<tr><td rowspan='2'>Tax</td><td>1</td><td>2</td></tr>"
+            "<tr><td>3</td><td>4</td></tr>"
+            "<tr><td colspan='3'>Total</td></tr></table>"
+        )
+        parsed = parse_html_table(html)
+        assert parsed["header_rows"] == 2
+        assert parsed["cells"] == [
+            ["Item", "Year", "Year"],
+            ["Item", "2024", "2023"],
+            ["Tax", 1, 2],
+            ["Tax", 3, 4],
+            ["Total", "Total", "Total"],
+        ]
+
+    def test_ragged_rows_are_padded(self) -> None:
+        """The grid is rectangular; missing cells are ``None``."""
+        parsed = parse_html_table(
+            "<table><tr><td>a</td><td>1</td><td>2</td></tr><tr><td>b</td></tr></table>"
+        )
+        assert parsed["cells"] == [["a", 1, 2], ["b", None, None]]
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("(1,234)", -1234),
+            ("(1,234.50)", -1234.5),
+            ("-12", -12),
+            ("₹ 1,234", 1234),
+            ("$1,000.25", 1000.25),
+            ("1,234", 1234),
+            ("12.5", 12.5),
+            ("", None),
+            ("(1,234", "(1,234"),
+            ("Revenue", "Revenue"),
+            ("12%", "12%"),
+        ],
+    )
+    def test_typed_cell(self, text: str, expected: object) -> None:
+        """Brackets negate, currency symbols and commas are stripped."""
+        assert typed_cell(text) == expected
+
+    def test_header_rows_from_thead(self) -> None:
+        """``<thead>`` rows are headers and stay text; body cells are typed."""
+        parsed = parse_html_table(_TABLES[0])
+        assert parsed["header_rows"] == 1
+        assert parsed["cells"] == [
+            ["Particulars", "2024", "2023"],
+            ["Revenue", 1234, 1100],
+            ["Loss", -56, -40],
+        ]
+
+    def test_header_rows_without_thead(self) -> None:
+        """Without ``<thead>``, leading all-``<th>`` rows are headers."""
+        assert parse_html_table(_TABLES[1])["header_rows"] == 1
+        assert parse_html_table(_TABLES[1])["cells"][1] == ["Cash", 500]
+        assert parse_html_table(_TABLES[2])["header_rows"] == 0
+        assert parse_html_table(_TABLES[4])["header_rows"] == 1
+
+
+class TestCellsToDataframe:
+    """``AnalyticsEngine`` DataFrames built from the stored grid."""
+
+    def test_column_naming(self) -> None:
+        """Header rows join per column; empty headers and no headers are numbered."""
+        analytics = pytest.importorskip("app.services.analytics_engine")
+        parsed = parse_html_table(
+            "<table><tr><th></th><th colspan='2'>Year</th></tr>"
+            "<tr><th></th><th>2024</th><th>Year</th></tr>"
+            "<tr><td>Revenue</td><td>1,234</td><td>(5)</td></tr></table>"
+        )
+        df = analytics._cells_to_dataframe(parsed["cells"], parsed["header_rows"])
+        assert list(df.columns) == ["Unnamed: 0", "Year 2024", "Year"]
+        assert df.iloc[0].tolist() == ["Revenue", 1234, -5]
+
+        df = analytics._cells_to_dataframe([["a", 1], ["b", 2]])
+        assert list(df.columns) == [0, 1]
+        assert analytics._cells_to_dataframe([]).empty
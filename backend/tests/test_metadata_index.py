@@ -0,0 +1,53 @@
+"""Tests for the metadata value index and the shared write markers."""
+from pathlib import Path
+
+from app.services.metadata_index import ValueIndex, WriteMarkers
+
+_ROWS = [
+    {"document_id": "d1", "source_file": "annual_report_2024.pdf"},
+    {"document_id": "d1", "source_file": "annual_report_2024.pdf"},
+    {"document_id": "d2", "source_file": "balance_sheet.pdf"},
+]
+
+
+class TestValueIndex:
+    """Filter rewriting and row accounting."""
+
+    def test_rewrite_to_exact_values(self) -> None:
+        """Equality and ``$contains`` resolve to the stored values with a row bound."""
+        index = ValueIndex(("document_id", "source_file"))
+        index.add(_ROWS)
+
+        assert index.rewrite({"document_id": "d1"}) == ({"document_id": "d1"}, 2)
+        assert index.rewrite({"source_file": {"$contains": "report"}}) == (
+            {"source_file": "annual_report_2024.pdf"},
+            2,
+        )
+        assert index.rewrite({"document_id": "missing"}) == (None, 0)
+
+    def test_remove_drops_empty_values(self) -> None:
+        """A value with no rows left no longer matches."""
+        index = ValueIndex(("document_id",))
+        index.add(_ROWS)
+        index.remove(_ROWS[2:])
+        assert index.size == 2
+        assert index.rewrite({"document_id": "d2"}) == (None, 0)
+
+
+class TestWriteMarkers:
+    """Write counters shared between connections (processes)."""
+
+    def test_bump_is_seen_by_other_connection(self, tmp_path: Path) -> None:
+        """A write recorded by one worker moves the marker for every other one."""
+        path = str(tmp_path / "markers.sqlite3")
+        first = WriteMarkers(path)
+        second = WriteMarkers(path)
+        try:
+            assert first.current("rules") == 0
+            assert second.bump("rules") == 1
+            assert second.bump("rules") == 2
+            assert first.current("rules") == 2
+            assert first.current("docs") == 0
+        finally:
+            first.close()
+            second.close()
@@ -0,0 +1,176 @@
+"""Tests for the in-process NumPy vector store backend."""
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.services import numpy_vector_store  # noqa: E402
+from app.services.numpy_vector_store import NumpyVectorStore  # noqa: E402
+
+_COLLECTION = "financial_documents"
+_DIM = 16
+
+
+def _chunks(n: int, seed: int = 0) -> tuple[list[dict], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, _DIM)).astype(np.float32)
+    chunks = [
+        {
+            "id": f"c{i}",
+            "text": f"chunk {i} {'lease' if i % 2 else 'revenue'}",
+            "metadata": {
+                "document_id": f"doc{(i) % 3}",
+                "page_number": (i) % 10,
+            },
+        }
+        for i in range(n)
+    ]
+    return chunks, vectors
+
+
+def _brute_force(vectors: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    return np.argsort(distances, kind="stable")[:k].tolist()
+
+
+def _query(store: NumpyVectorStore, query: np.ndarray, k: int = 5, **kwargs) -> dict:
+    return asyncio.run(store.query(_COLLECTION, query.tolist(), n_results=k, **kwargs))
+
+
+class TestNumpyVectorStore:
+    """Exact search, filters, deletes and persistence."""
+
+    def test_add_and_query_exact(self, tmp_path: Path) -> None:
+        """Flat search returns the brute-force neighbours and squared L2 distances."""
+        store = NumpyVectorStore(str(tmp_path))
+        chunks, vectors = _chunks(200)
+        assert asyncio.run(store.add_documents(_COLLECTION, chunks, vectors)) == 200
+
+        query = vectors[7] + 0.01
+        result = _query(store, query)
+        expected = _brute_force(vectors, query, 5)
+        assert result["ids"][0] == [f"c{i}" for i in expected]
+        assert result["documents"][0][0] == "chunk 7 lease"
+        assert result["metadatas"][0][0] == {"document_id": "doc1", "page_number": 7}
+        np.testing.assert_allclose(
+            result["distances"][0],
+            ((vectors[expected] - query) ** 2).sum(axis=1),
+            rtol=1e-4,
+            atol=1e-4,
+        )
+        assert store.get_collection_stats(_COLLECTION)["count"] == 200
+
+    def test_where_filters(self, tmp_path: Path) -> None:
+        """Equality, ``$in``, range and ``$and`` filters restrict the candidates."""
+        store = NumpyVectorStore(str(tmp_path))
+        chunks, vectors = _chunks(120)
+        asyncio.run(store.add_documents(_COLLECTION, chunks, vectors))
+        meta = [c["metadata"] for c in chunks]
+        query = vectors[0]
+
+        def ids(where: dict) -> list[str]:
+            return _query(store, query, k=200, where=where)["ids"][0]
+
+        def matching(predicate) -> set[str]:
+            return {c["id"] for c, m in zip(chunks, meta) if predicate(m)}
+
+        assert set(ids({"document_id": "doc2"})) == matching(lambda m: m["document_id"] == "doc2")
+        assert set(ids({"document_id": {"$in": ["doc0", "doc1"]}})) == matching(
+            lambda m: m["document_id"] in ("doc0", "doc1")
+        )
+        assert set(ids({"page_number": {"$gte": 8}})) == matching(lambda m: m["page_number"] >= 8)
+        assert set(
+            ids({"$and": [{"document_id": "doc0"}, {"page_number": {"$lt": 3}}]})
+        ) == matching(lambda m: m["document_id"] == "doc0" and m["page_number"] < 3)
+        assert ids({"document_id": "missing"}) == []
+
+        rows = [i for i, m in enumerate(meta) if m["document_id"] == "doc2"]
+        filtered = _query(store, query, k=3, where={"document_id": "doc2"})["ids"][0]
+        assert filtered == [f"c{rows[i]}" for i in _brute_force(vectors[rows], query, 3)]
+
+    def test_delete_and_reload(self, tmp_path: Path) -> None:
+        """Deleted rows stay gone after a restart; other rows are intact."""
+        store = NumpyVectorStore(str(tmp_path))
+        chunks, vectors = _chunks(50)
+        asyncio.run(store.add_documents(_COLLECTION, chunks, vectors))
+        asyncio.run(store.delete_documents(_COLLECTION, ["c3", "c4"]))
+        assert asyncio.run(store.delete_by_metadata(_COLLECTION, {"document_id": "doc2"})) == 16
+
+        reopened = NumpyVectorStore(str(tmp_path))
+        alive = [i for i in range(50) if i not in (3, 4) and i % 3 != 2]
+        assert reopened.get_collection_stats(_COLLECTION)["count"] == len(alive)
+        result = _query(reopened, vectors[3], k=len(alive) + 10)
+        assert sorted(result["ids"][0]) == sorted(f"c{i}" for i in alive)
+        nearest = _brute_force(vectors[alive], vectors[3], 5)
+        assert result["ids"][0][:5] == [f"c{alive[i]}" for i in nearest]
+
+    def test_compaction(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Deleting enough rows rewrites the files without them."""
+        monkeypatch.setattr(numpy_vector_store, "_COMPACT_MIN", 10)
+        store = NumpyVectorStore(str(tmp_path))
+        chunks, vectors = _chunks(60)
+        asyncio.run(store.add_documents(_COLLECTION, chunks, vectors))
+        asyncio.run(store.delete_documents(_COLLECTION, [f"c{i}" for i in range(20)]))
+
+        path = tmp_path / _COLLECTION
+        assert not (path / "tombstones.txt").exists()
+        assert (path / "vectors.f32").stat().st_size == 40 * _DIM * 4
+        assert len((path / "records.jsonl").read_text().splitlines()) == 40
+
+        result = _query(store, vectors[30], k=3, where={"document_id": "doc0"})
+        rows = [i for i in range(20, 60) if i % 3 == 0]
+        assert result["ids"][0] == [
+            f"c{rows[i]}" for i in _brute_force(vectors[rows], vectors[30], 3)
+        ]
+        reopened = NumpyVectorStore(str(tmp_path))
+        assert _query(reopened, vectors[30], k=3, where={"document_id": "doc0"}) == result
+
+    def test_existing_ids_are_skipped(self, tmp_path: Path) -> None:
+        """Re-adding an ID keeps the stored row, as ChromaDB does."""
+        store = NumpyVectorStore(str(tmp_path))
+        chunks, vectors = _chunks(10)
+        asyncio.run(store.add_documents(_COLLECTION, chunks, vectors))
+        assert asyncio.run(store.add_documents(_COLLECTION, chunks[:1], vectors[5:6])) == 0
+        assert store.get_collection_stats(_COLLECTION)["count"] == 10
+        assert _query(store, vectors[0], k=1)["ids"][0] == ["c0"]
+        assert _query(store, vectors[5], k=2)["ids"][0][0] == "c5"
+
+    def test_ivf_search(self, tmp_path: Path) -> None:
+        """Above the threshold an IVF index is trained; probing every list is exact."""
+        store = NumpyVectorStore(str(tmp_path), ivf_threshold=500, nprobe=4096)
+        chunks, vectors = _chunks(800, seed=1)
+        asyncio.run(store.add_documents(_COLLECTION, chunks, vectors))
+
+        query = vectors[100] + 0.05
+        result = _query(store, query, k=10)
+        assert store.get_collection_stats(_COLLECTION)["metadata"]["index"] == "ivf"
+        assert result["ids"][0] == [f"c{i}" for i in _brute_force(vectors, query, 10)]
+
+        filtered = _query(store, query, k=5, where={"document_id": "doc1"})["ids"][0]
+        rows = [i for i in range(800) if i % 3 == 1]
+        assert filtered == [f"c{rows[i]}" for i in _brute_force(vectors[rows], query, 5)]
+
+    @pytest.mark.parametrize("quantization", ["int8", "pq"])
+    def test_quantised_scan_reranks_exactly(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, quantization: str
+    ) -> None:
+        """Code scans return exact distances and keep the true nearest neighbour."""
+        monkeypatch.setattr(numpy_vector_store, "_QUANTIZE_MIN", 256)
+        store = NumpyVectorStore(str(tmp_path), quantization=quantization)
+        chunks, vectors = _chunks(1_000, seed=2)
+        asyncio.run(store.add_documents(_COLLECTION, chunks, vectors))
+
+        query = vectors[42] + 0.01
+        result = _query(store, query, k=5)
+        assert store.get_collection_stats(_COLLECTION)["metadata"]["quantization"] == quantization
+        assert result["ids"][0][0] == "c42"
+        rows = [int(i[1:]) for i in result["ids"][0]]
+        np.testing.assert_allclose(
+            result["distances"][0],
+            ((vectors[rows] - query) ** 2).sum(axis=1),
+            rtol=1e-4,
+            atol=1e-4,
+        )
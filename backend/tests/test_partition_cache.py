@@ -0,0 +1,120 @@
+"""Tests for the on-disk partition output cache."""
+import random
+from pathlib import Path
+
+from app.services.document_processor import DocumentProcessor
+from app.services.partition_cache import (
+    PartitionCache,
+    _pack,
+    file_hash,
+    partition_key,
+)
+
+
+def _elements(seed: int) -> list[dict]:
+    """Raw partition output whose compressed size barely varies with *seed*."""
+    rng = random.Random(seed)
+    return [
+        {
+            "type": "NarrativeText",
+            "text": "".join(rng.choice("0123456789abcdef") for _ in range(2000)),
+            "metadata": {"filename": "report.pdf", "page_number": page},
+        }
+        for page in range(1, 4)
+    ]
+
+
+class TestPartitionCache:
+    """Lookups, keys and size-capped LRU eviction."""
+
+    def test_put_then_get(self, tmp_path: Path, clock) -> None:
+        """Elements round-trip through the compressed store."""
+        cache = PartitionCache(str(tmp_path / "p.sqlite3"))
+        try:
+            assert cache.get("k") is None
+            cache.put("k", "digest", _elements(0))
+            assert cache.get("k") == _elements(0)
+            stats = cache.stats()
+            assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        finally:
+            cache.close()
+
+    def test_keys_depend_on_bytes_and_params(self, tmp_path: Path) -> None:
+        """Same bytes under another name share a key; other params do not."""
+        a = tmp_path / "a.pdf"
+        b = tmp_path / "b.pdf"
+        a.write_bytes(b"%PDF-1.7 same bytes")
+        b.write_bytes(b"%PDF-1.7 same bytes")
+        assert file_hash(str(a)) == file_hash(str(b))
+        key = partition_key(file_hash(str(a)), {"strategy": "hi_res"})
+        assert key == partition_key(file_hash(str(b)), {"strategy": "hi_res"})
+        assert key != partition_key(file_hash(str(a)), {"strategy": "fast"})
+
+    def test_size_capped_eviction_order(self, tmp_path: Path, clock) -> None:
+        """Beyond the byte cap the least-recently-used documents go first."""
+        sizes = [len(_pack(_elements(i))) for i in range(4)]
+        cache = PartitionCache(str(tmp_path / "p.sqlite3"), max_bytes=sum(sizes[:3]))
+        try:
+            for i in range(3):
+                clock.now += 1
+                cache.put(f"k{i}", f"d{i}", _elements(i))
+            clock.now += 1
+            assert cache.get("k0") is not None  # refreshed: k1 is now oldest
+            assert cache.stats()["evictions"] == 0
+
+            clock.now += 1
+            cache.put("k3", "d3", _elements(3))  # over the cap: trim below 95 %
+
+            assert cache.get("k1") is None
+            assert cache.get("k2") is None
+            assert cache.get("k0") == _elements(0)
+            assert cache.get("k3") == _elements(3)
+            stats = cache.stats()
+            assert stats["evictions"] == 2
+            assert stats["entries"] == 2
+            assert stats["size_mb"] == round((sizes[0] + sizes[3]) / 2**20, 2)
+        finally:
+            cache.close()
+
+    def test_uncapped_cache_never_evicts(self, tmp_path: Path, clock) -> None:
+        """``max_bytes=0`` disables eviction."""
+        cache = PartitionCache(str(tmp_path / "p.sqlite3"), max_bytes=0)
+        try:
+            for i in range(4):
+                cache.put(f"k{i}", f"d{i}", _elements(i))
+            assert cache.stats()["entries"] == 4
+            cache.clear()
+            assert cache.stats()["entries"] == 0
+        finally:
+            cache.close()
+
+
+class TestRebindSource:
+    """Cached elements are pointed at the file being ingested now."""
+
+    def test_filename_and_directory_are_rewritten(self, tmp_path: Path) -> None:
+        """Only the location fields change; other metadata is kept."""
+        elements = [
+            {
+                "type": "Title",
+                "metadata": {
+                    "filename": "old.pdf",
+                    "file_directory": "/uploads/old",
+                    "page_number": 1,
+                },
+            },
+            {"type": "NarrativeText", "metadata": {"page_number": 2}},
+            {"type": "NarrativeText", "metadata": None},
+            {"type": "NarrativeText"},
+        ]
+        target = tmp_path / "renamed" / "new.pdf"
+        rebound = DocumentProcessor._rebind_source(elements, str(target))
+
+        assert rebound[0]["metadata"] == {
+            "filename": "new.pdf",
+            "file_directory": str(target.parent),
+            "page_number": 1,
+        }
+        assert rebound[1]["metadata"] == {"page_number": 2}
+        assert rebound[2]["metadata"] is None
+        assert "metadata" not in rebound[3]
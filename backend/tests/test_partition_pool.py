@@ -0,0 +1,83 @@
+"""Tests for stitching page ranges partitioned in parallel."""
+import asyncio
+from typing import Any
+
+from app.services.document_processor import DocumentProcessor
+from app.services.partition_pool import link_range_parents
+
+# Element types per page of a 12-page document; titles on pages 1, 5 and 6 only
+_PAGES = [
+    ["Title", "NarrativeText", "ListItem"],
+    ["NarrativeText", "Table"],
+    ["NarrativeText"],
+    ["Table", "NarrativeText"],
+    ["NarrativeText", "Title", "NarrativeText"],
+    ["Title", "Table"],
+    ["NarrativeText"],
+    ["NarrativeText", "NarrativeText"],
+    ["Table"],
+    ["NarrativeText"],
+    ["ListItem"],
+    ["NarrativeText"],
+]
+
+
+def _with_parents(elements: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Link content to the last preceding title, as one partition run does."""
+    title = None
+    for element in elements:
+        if element["type"] == "Title":
+            title = element["element_id"]
+        elif element["type"] != "PageBreak" and title is not None:
+            element["metadata"]["parent_id"] = title
+    return elements
+
+
+def _partition(first_page: int, last_page: int) -> list[dict[str, Any]]:
+    """Fake partition output for pages *first_page*..*last_page* (1-based)."""
+    elements = []
+    for page in range(first_page, last_page + 1):
+        for i, kind in enumerate(_PAGES[page - 1]):
+            elements.append(
+                {"type": kind, "element_id": f"p{page}e{i}", "metadata": {"page_number": page}}
+            )
+        elements.append(
+            {"type": "PageBreak", "element_id": f"p{page}pb", "metadata": {"page_number": page}}
+        )
+    return _with_parents(elements)
+
+
+class _FakePool:
+    """``PartitionPool`` stand-in serving the fake document by page range."""
+
+    async def partition(
+        self, filepath: str, first_page: int = 1, last_page: int = 0
+    ) -> list[dict[str, Any]]:
+        return _partition(first_page, last_page or len(_PAGES))
+
+
+class TestPageRangeStitching:
+    """Split partition output matches a single run over the whole file."""
+
+    def test_split_matches_monolithic(self) -> None:
+        """Leading elements of later ranges regain their parent titles."""
+        processor = DocumentProcessor(use_api=False, partition_pool=_FakePool())
+        ranges = [(1, 4), (5, 8), (9, 12)]
+        split = asyncio.run(processor._partition_local_pages("report.pdf", ranges))
+        assert split == _partition(1, len(_PAGES))
+
+    def test_first_range_and_page_breaks_stay_unlinked(self) -> None:
+        """Nothing before the first title, and no page break, gets a parent."""
+        part = [
+            {"type": "PageBreak", "element_id": "pb", "metadata": {}},
+            {"type": "NarrativeText", "element_id": "n1", "metadata": None},
+            {"type": "Title", "element_id": "t1", "metadata": {}},
+            {"type": "NarrativeText", "element_id": "n2", "metadata": {}},
+        ]
+        assert link_range_parents([dict(e) for e in part], None) == "t1"
+
+        linked = [dict(e) for e in part]
+        assert link_range_parents(linked, "t0") == "t1"
+        assert linked[0]["metadata"] == {}
+        assert linked[1]["metadata"] == {"parent_id": "t0"}
+        assert linked[3]["metadata"] == {}
@@ -0,0 +1,124 @@
+"""Tests for the vector search result cache (memory and SQLite backends)."""
+from pathlib import Path
+
+import pytest
+
+from app.services.retrieval_cache import (
+    MemoryRetrievalCache,
+    SQLiteRetrievalCache,
+    query_key,
+)
+
+_RESULT = {"ids": [["a", "b"]], "distances": [[0.1, 0.2]]}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request: pytest.FixtureRequest, tmp_path: Path):
+    caches = []
+
+    def make(max_entries: int = 100, ttl: float = 0.0):
+        if request.param == "memory":
+            cache = MemoryRetrievalCache(max_entries=max_entries, ttl=ttl)
+        else:
+            path = tmp_path / f"retrieval-{len(caches)}.sqlite3"
+            cache = SQLiteRetrievalCache(str(path), max_entries=max_entries, ttl=ttl)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+class TestRetrievalCache:
+    """Behaviour shared by both backends."""
+
+    def test_put_then_get(self, make_cache, clock) -> None:
+        """A stored result is served back unchanged and counted as a hit."""
+        cache = make_cache()
+        key = query_key([[0.1, 0.2]], 2)
+        assert cache.get("docs", key) is None
+        cache.put("docs", key, cache.generation("docs"), _RESULT)
+        assert cache.get("docs", key) == _RESULT
+        assert cache.get("rules", key) is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+    def test_query_key_covers_filters(self) -> None:
+        """Different n_results or filters never share a key."""
+        base = query_key([[0.1, 0.2]], 2)
+        assert base == query_key([[0.1, 0.2]], 2)
+        assert base != query_key([[0.1, 0.2]], 3)
+        assert base != query_key([[0.1, 0.2]], 2, where={"document_id": "d1"})
+        assert base != query_key([[0.1, 0.3]], 2)
+
+    def test_invalidate_makes_entries_stale(self, make_cache, clock) -> None:
+        """A write to the collection hides every result cached before it."""
+        cache = make_cache()
+        cache.put("docs", "k1", cache.generation("docs"), _RESULT)
+        cache.put("rules", "k1", cache.generation("rules"), _RESULT)
+        cache.invalidate("docs")
+        assert cache.get("docs", "k1") is None
+        assert cache.get("rules", "k1") == _RESULT
+        assert cache.stats()["invalidations"] == 1
+
+        cache.put("docs", "k1", cache.generation("docs"), {"ids": [["c"]]})
+        assert cache.get("docs", "k1") == {"ids": [["c"]]}
+
+    def test_put_after_concurrent_write_is_dropped(self, make_cache, clock) -> None:
+        """A result computed under an older generation is never stored."""
+        cache = make_cache()
+        generation = cache.generation("docs")
+        cache.invalidate("docs")  # a write lands while the search runs
+        cache.put("docs", "k1", generation, _RESULT)
+        assert cache.get("docs", "k1") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_ttl_expiry(self, make_cache, clock) -> None:
+        """Entries older than the TTL are stale."""
+        cache = make_cache(ttl=60.0)
+        cache.put("docs", "k1", 0, _RESULT)
+        clock.now += 59
+        assert cache.get("docs", "k1") == _RESULT
+        clock.now += 2
+        assert cache.get("docs", "k1") is None
+        assert cache.stats()["stale"] == 1
+
+    def test_lru_eviction(self, make_cache, clock) -> None:
+        """Beyond the cap the least-recently-used entries go first."""
+        cache = make_cache(max_entries=20)
+        for i in range(20):
+            clock.now += 1
+            cache.put("docs", f"k{i}", 0, {"i": i})
+        clock.now += 1
+        assert cache.get("docs", "k0") == {"i": 0}  # refreshed
+
+        clock.now += 1
+        cache.put("docs", "k20", 0, {"i": 20})  # 21 > 20: trim to 19
+
+        stats = cache.stats()
+        assert stats["entries"] == 19
+        assert stats["evictions"] == 2
+        assert cache.get("docs", "k0") == {"i": 0}
+        assert cache.get("docs", "k1") is None
+        assert cache.get("docs", "k2") is None
+        assert all(cache.get("docs", f"k{i}") == {"i": i} for i in range(3, 21))
+
+
+class TestSQLiteRetrievalCache:
+    """The shared backend keeps generations and entries across connections."""
+
+    def test_invalidation_seen_by_other_process(self, tmp_path: Path, clock) -> None:
+        """A second connection (another worker) sees the first one's writes."""
+        path = str(tmp_path / "shared.sqlite3")
+        first = SQLiteRetrievalCache(path)
+        second = SQLiteRetrievalCache(path)
+        try:
+            first.put("docs", "k1", first.generation("docs"), _RESULT)
+            assert second.get("docs", "k1") == _RESULT
+            second.invalidate("docs")
+            assert first.generation("docs") == 1
+            assert first.get("docs", "k1") is None
+        finally:
+            first.close()
+            second.close()
@@ -37,7 +37,7 @@ from app.pipelines.ingest_pipeline import IngestPipeline  # noqa: E402
 from app.services.document_processor import DocumentProcessor  # noqa: E402
 from app.services.embedding_service import EmbeddingService  # noqa: E402
 from app.services.mongo_service import MongoService  # noqa: E402
-from app.services.vector_store import VectorStoreService  # noqa: E402
+from app.services.vector_store import create_vector_store  # noqa: E402
 from app.utils.chunking import ComplianceChunker  # noqa: E402
 
 # ---------------------------------------------------------------------------
@@ -157,21 +157,15 @@ async def ingest_all_rules(
     print("Initialising services...")
 
     try:
-        processor = DocumentProcessor(
-            api_key=settings.UNSTRUCTURED_API_KEY,
-            api_url=settings.UNSTRUCTURED_API_URL,
-        )
-        embeddings = EmbeddingService(
-            model=settings.EMBEDDING_MODEL,
-            api_key=settings.OPENAI_API_KEY,
-        )
-        vector_store = VectorStoreService(persist_dir=settings.CHROMA_PERSIST_DIR)
+        processor = DocumentProcessor.from_settings(settings)
+        embeddings = EmbeddingService.from_settings(settings)
+        vector_store = create_vector_store(settings)
 
         # We need a Mongo connection for the pipeline
         from motor.motor_asyncio import AsyncIOMotorClient
         mongo_client = AsyncIOMotorClient(settings.MONGODB_URL)
         db = mongo_client[settings.MONGODB_DB_NAME]
-        mongo_service = MongoService(db)
+        mongo_service = MongoService(db, bulk_batch_size=settings.MONGODB_BULK_BATCH_SIZE)
 
         pipeline = IngestPipeline(
             document_processor=processor,
@@ -234,8 +228,9 @@ async def ingest_all_rules(
 
         elapsed = time.perf_counter() - t_start
 
-        # Close Mongo
+        # Close Mongo, partition workers and cache
         mongo_client.close()
+        processor.close()
 
     except Exception:
         import traceback